@@ -0,0 +1,316 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from algorithms.bounds import compute_bounds, prefilter, residual_exhausted
+from algorithms.deadline import Deadline
+from algorithms.enhanced_packing_algorithm import Box, Container, EnhancedPackingAlgorithm
+from algorithms.layer_patterns import flush_cache
+from algorithms.occupancy_grid import choose_cell_size
+from algorithms.orientations import Orientation
+from algorithms.sku_table import SkuTable, SkuType, as_sku_table
+
+_EPS = 1e-3
+
+# Một bước đặt: (chỉ số SKU, hướng xoay, x, y, z)
+Placement = Tuple[int, Orientation, float, float, float]
+# Phương án con gửi về từ worker: (bước đặt thêm hoặc None, remaining, cursor, used_volume, score, done)
+ChildDelta = Tuple[Optional[Placement], Tuple[int, ...], Tuple[float, float, float, float, float], float, float, bool]
+
+
+def _common_prefix(a: Sequence[Placement], b: Sequence[Placement]) -> int:
+    """Số bước đặt đầu tiên giống nhau của hai dãy"""
+    common = 0
+    limit = min(len(a), len(b))
+    while common < limit and a[common] == b[common]:
+        common += 1
+    return common
+
+
+class BeamState:
+    """Một phương án đóng gói dở dang của beam search.
+
+    Chỉ lưu dãy các bước đặt và con trỏ (x, y, z, chiều cao hàng, chiều sâu
+    lớp) của vòng lặp hàng/lớp như thuật toán tham lam; container tương ứng
+    được dựng lại từ dãy bước khi cần mở rộng.
+    """
+    __slots__ = ("placements", "remaining", "cursor", "used_volume", "score", "done")
+
+    def __init__(self, placements: Tuple[Placement, ...], remaining: Tuple[int, ...],
+                 cursor: Tuple[float, float, float, float, float], used_volume: float,
+                 score: float, done: bool = False):
+        self.placements = placements
+        self.remaining = remaining
+        self.cursor = cursor
+        self.used_volume = used_volume
+        self.score = score
+        self.done = done
+
+
+class _BeamWorker:
+    """Một process mở rộng phương án, kèm dãy bước của phương án vừa gửi cho nó"""
+    __slots__ = ("executor", "sent")
+
+    def __init__(self, executor: ProcessPoolExecutor):
+        self.executor = executor
+        self.sent: Tuple[Placement, ...] = ()
+
+
+class BeamExpander:
+    """Mở rộng các BeamState trên một container dùng chung.
+
+    Container luôn ở trạng thái của phương án vừa mở rộng; phương án kế tiếp
+    (thường có chung tiền tố dài) chỉ cần rollback về checkpoint ở cuối tiền tố
+    chung rồi đặt tiếp các bước còn lại.
+    """
+
+    def __init__(self, algorithm: EnhancedPackingAlgorithm, skus: List[SkuType],
+                 container_dimensions: Dict, cell_size: float):
+        self.algorithm = algorithm
+        self.skus = skus
+        self.container = Container(**container_dimensions, cell_size=cell_size)
+        self.prototypes = [Box("", sku.width, sku.height, sku.depth, sku.name, sku.label, sku.weight)
+                           for sku in skus]
+        self.sku_orientations = [prototype.orientation_table() for prototype in self.prototypes]
+        self.path: List[Placement] = []
+        self.checkpoints: List[int] = []
+        self.container.checkpoint()
+        self.slack_volume = ((container_dimensions["width"] + _EPS) * (container_dimensions["height"] + _EPS)
+                             * (container_dimensions["depth"] + _EPS))
+
+    def _make_box(self, sku_index: int, orientation: Orientation, unit: int) -> 'Box':
+        sku = self.skus[sku_index]
+        box_id, name = sku.units[unit]
+        box = Box(box_id, sku.width, sku.height, sku.depth, name, sku.label, sku.weight)
+        box.width, box.height, box.depth, box.orientation = orientation
+        return box
+
+    def sync(self, placements: Tuple[Placement, ...]) -> None:
+        """Đưa container về đúng trạng thái sau dãy bước placements"""
+        path = self.path
+        common = _common_prefix(path, placements)
+        if common < len(path):
+            self.container.rollback(self.checkpoints[common])
+            del path[common:]
+            del self.checkpoints[common:]
+        used = [0] * len(self.skus)
+        for sku_index, *_ in placements[:common]:
+            used[sku_index] += 1
+        for placement in placements[common:]:
+            sku_index, orientation, x, y, z = placement
+            self.checkpoints.append(self.container.checkpoint())
+            self.container.place_box(self._make_box(sku_index, orientation, used[sku_index]), x, y, z)
+            used[sku_index] += 1
+            path.append(placement)
+
+    def expand(self, state: BeamState, limit: int) -> List[BeamState]:
+        """Các phương án con: đặt một box tại ô kế tiếp, tối đa limit con điểm cao nhất.
+
+        Ô không đặt được box nào thì chuyển sang hàng/lớp kế tiếp như vòng lặp
+        tham lam; hết chỗ, hết hàng hoặc phần trống không chứa nổi kiện nào còn
+        lại thì trả về chính phương án đã đánh dấu xong.
+        """
+        x, y, z, row_height, layer_depth = state.cursor
+        remaining = state.remaining
+        if residual_exhausted(self.slack_volume - state.used_volume, self.skus, remaining):
+            return [BeamState(state.placements, remaining, state.cursor, state.used_volume, state.score, done=True)]
+        self.sync(state.placements)
+        container = self.container
+        while sum(remaining) and z < container.depth - _EPS:
+            if x < container.width - _EPS and y < container.height - _EPS:
+                children = self._children(state, x, y, z, row_height, layer_depth, limit)
+                if children:
+                    return children
+            # Kết thúc hàng; hàng trống hoặc hết chiều cao thì kết thúc lớp
+            if row_height >= _EPS and y + row_height < container.height - _EPS:
+                x, y, row_height = 0.0, y + row_height, 0.0
+                continue
+            if layer_depth < _EPS:
+                break
+            x, y, z, row_height, layer_depth = 0.0, 0.0, z + layer_depth, 0.0, 0.0
+        return [BeamState(state.placements, remaining, (x, y, z, row_height, layer_depth),
+                          state.used_volume, state.score, done=True)]
+
+    def _children(self, state: BeamState, x: float, y: float, z: float, row_height: float,
+                  layer_depth: float, limit: int) -> List[BeamState]:
+        container = self.container
+        slots = [(idx, orientation, x, y_pos, z_pos) for idx, orientation, y_pos, z_pos in
+                 self.algorithm._slot_candidates(self.prototypes, self.sku_orientations, state.remaining, x, z, container)]
+        # Chấm điểm mọi ứng viên của ô trong một lần gọi
+        scores = self.algorithm._calculate_position_scores(self.prototypes, slots, container).tolist()
+        candidates = sorted(((score, idx, orientation, y_pos, z_pos)
+                             for score, (idx, orientation, _, y_pos, z_pos) in zip(scores, slots)),
+                            key=lambda c: -c[0])
+        children = []
+        for score, idx, orientation, y_pos, z_pos in candidates[:limit]:
+            w, h, d, _ = orientation
+            remaining = list(state.remaining)
+            remaining[idx] -= 1
+            cursor = (x + w, y, z, max(row_height, h + (y_pos - y)), max(layer_depth, d + (z_pos - z)))
+            children.append(BeamState(state.placements + ((idx, orientation, x, y_pos, z_pos),),
+                                      tuple(remaining), cursor,
+                                      state.used_volume + w * h * d, state.score + score))
+        return children
+
+
+class BeamSearchPackingAlgorithm(EnhancedPackingAlgorithm):
+    """Beam search trên vòng lặp hàng/lớp của thuật toán nâng cao.
+
+    Thay vì chọn ngay box có ``x_gap`` nhỏ nhất, mỗi bước giữ ``beam_width``
+    phương án tốt nhất theo cận trên tỷ lệ sử dụng rồi tổng điểm
+    ``_calculate_position_score``. Kết quả tham lam là phương án ban đầu nên
+    beam search không bao giờ kém hơn; khi hết hạn chót trả về phương án tốt
+    nhất đã gặp; đạt ``target_utilization`` thì dừng sớm. Các phương án của một
+    bước được mở rộng song song khi manifest đủ lớn: mỗi worker là một process
+    riêng nhớ dãy bước của phương án vừa nhận, nên chỉ cần gửi phần khác nhau
+    và nhận về bước đặt thêm của từng phương án con thay vì cả dãy bước.
+    """
+
+    def __init__(self, beam_width: int = 4):
+        super().__init__()
+        self.beam_width = beam_width
+
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict, respect_groups: bool = True,
+             time_limit: Optional[float] = 30, deadline: Optional[Deadline] = None,
+             target_utilization: Optional[float] = None) -> Tuple[List['Box'], float]:
+        if deadline is None:
+            deadline = Deadline(time_limit)
+        self.start_time = deadline.start
+        self.time_limit = time_limit
+        table = self._order_table(as_sku_table(goods), respect_groups)
+        container_volume = container_dimensions["width"] * container_dimensions["height"] * container_dimensions["depth"]
+        self.bounds = compute_bounds(table, container_dimensions, Box.ROTATIONS)
+        prefilter(table, container_dimensions, Box.ROTATIONS)
+
+        cell_size = choose_cell_size(table, container_dimensions)
+
+        # Phương án tham lam làm mốc ban đầu
+        greedy_container = Container(**container_dimensions, cell_size=cell_size)
+        best_boxes = self._pack_with_extreme_points(table.copy(), greedy_container, deadline)
+        best_utilization = greedy_container.get_utilization()
+        deadline.checkpoint("greedy", best_utilization, best_utilization)
+        best_state = None
+        # Đạt cận trên tỷ lệ sử dụng thì không phương án nào tốt hơn được nữa; mục tiêu (nếu có) cho dừng sớm hơn
+        target = self.bounds.utilization_bound
+        if target_utilization is not None:
+            target = min(target, target_utilization)
+
+        width = max(1, int(self.beam_width))
+        beam = [BeamState((), tuple(table.remaining), (0.0, 0.0, 0.0, 0.0, 0.0), 0.0, 0.0)]
+        workers = self._create_workers(table, container_dimensions, cell_size)
+        expander = None
+        try:
+            while beam and not deadline.expired() and best_utilization < target - 1e-9:
+                if workers:
+                    try:
+                        expanded = self._expand_on_workers(workers, beam, width)
+                    except BrokenProcessPool:
+                        self._shutdown_workers(workers)
+                        workers = []
+                        continue
+                else:
+                    if expander is None:
+                        expander = BeamExpander(self, table.skus, container_dimensions, cell_size)
+                    expanded = [expander.expand(state, width) for state in beam]
+                children = [child for group in expanded for child in group]
+                for child in children:
+                    if child.used_volume / container_volume > best_utilization + 1e-12:
+                        best_utilization = child.used_volume / container_volume
+                        best_state = child
+                fit_volume = self.bounds.fit_volume
+                beam = sorted((child for child in children if not child.done),
+                              key=lambda c: (-round(self._utilization_bound(c, fit_volume, container_dimensions), 3),
+                                             -c.score))[:width]
+        finally:
+            self._shutdown_workers(workers)
+
+        deadline.checkpoint("beam", best_utilization, best_utilization)
+        self.deadline_hit = deadline.hit
+        self.checkpoints = list(deadline.checkpoints)
+        flush_cache(self.pattern_cache)
+        if best_state is None:
+            return best_boxes, best_utilization
+        return self._materialize(best_state, table, container_dimensions), best_utilization
+
+    def _utilization_bound(self, state: BeamState, total_volume: float, container_dimensions: Dict) -> float:
+        """Cận trên lạc quan: thể tích đã đặt + min(hàng còn lại, phần container phía sau lớp hiện tại)"""
+        width, height, depth = container_dimensions["width"], container_dimensions["height"], container_dimensions["depth"]
+        remaining_goods = total_volume - state.used_volume
+        z = state.cursor[2]
+        ahead = width * height * max(0.0, depth - z)
+        return (state.used_volume + min(remaining_goods, ahead)) / (width * height * depth)
+
+    def _materialize(self, state: BeamState, table: SkuTable, container_dimensions: Dict) -> List['Box']:
+        """Tạo các Box thật (id theo thứ tự lấy từng SKU) cho dãy bước của phương án"""
+        table = table.copy()
+        boxes = []
+        for sku_index, orientation, x, y, z in state.placements:
+            box = table.take(sku_index, Box)
+            box.width, box.height, box.depth, box.orientation = orientation
+            box.pos = (x, y, z)
+            box.placed = True
+            boxes.append(box)
+        return boxes
+
+    def _expand_on_workers(self, workers: List[_BeamWorker], beam: List[BeamState],
+                           width: int) -> List[List[BeamState]]:
+        """Mở rộng beam trên các worker; mỗi worker chỉ nhận các bước khác với phương án nó nhận lần trước"""
+        futures = []
+        for i, state in enumerate(beam):
+            worker = workers[i % len(workers)]
+            common = _common_prefix(worker.sent, state.placements)
+            worker.sent = state.placements
+            futures.append(worker.executor.submit(_beam_worker_expand, common, state.placements[common:],
+                                                  state.remaining, state.cursor, state.used_volume, state.score,
+                                                  width))
+        return [[_apply_delta(state, delta) for delta in future.result()] for state, future in zip(beam, futures)]
+
+    def _create_workers(self, table: SkuTable, container_dimensions: Dict, cell_size: float) -> List[_BeamWorker]:
+        """Mỗi worker một executor một process (task chạy đúng thứ tự gửi); rỗng khi mở rộng tuần tự"""
+        count = min(self.beam_width, self.max_workers or os.cpu_count() or 1)
+        if count <= 1 or table.total_units < self.parallel_min_units:
+            return []
+        workers = []
+        try:
+            for _ in range(count):
+                executor = ProcessPoolExecutor(max_workers=1, initializer=_init_beam_worker,
+                                               initargs=(self.support_threshold, table.skus, container_dimensions,
+                                                         cell_size))
+                workers.append(_BeamWorker(executor))
+        except (OSError, NotImplementedError):
+            self._shutdown_workers(workers)
+            return []
+        return workers
+
+    @staticmethod
+    def _shutdown_workers(workers: List[_BeamWorker]) -> None:
+        for worker in workers:
+            worker.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _apply_delta(parent: BeamState, delta: ChildDelta) -> BeamState:
+    """Dựng phương án con từ phương án cha và phần khác nhau worker gửi về"""
+    placement, remaining, cursor, used_volume, score, done = delta
+    placements = parent.placements if placement is None else parent.placements + (placement,)
+    return BeamState(placements, remaining, cursor, used_volume, score, done)
+
+
+# Mỗi worker giữ một BeamExpander (container riêng) và dãy bước của phương án vừa nhận cho suốt lần tìm kiếm
+_beam_worker_state: Dict = {}
+
+def _init_beam_worker(support_threshold: float, skus: List[SkuType], container_dimensions: Dict,
+                      cell_size: float) -> None:
+    algorithm = EnhancedPackingAlgorithm()
+    algorithm.support_threshold = support_threshold
+    _beam_worker_state["expander"] = BeamExpander(algorithm, skus, container_dimensions, cell_size)
+    _beam_worker_state["placements"] = ()
+
+def _beam_worker_expand(common: int, tail: Tuple[Placement, ...], remaining: Tuple[int, ...],
+                        cursor: Tuple[float, float, float, float, float], used_volume: float, score: float,
+                        limit: int) -> List[ChildDelta]:
+    placements = _beam_worker_state["placements"][:common] + tail
+    _beam_worker_state["placements"] = placements
+    state = BeamState(placements, remaining, cursor, used_volume, score)
+    return [(child.placements[-1] if len(child.placements) > len(placements) else None,
+             child.remaining, child.cursor, child.used_volume, child.score, child.done)
+            for child in _beam_worker_state["expander"].expand(state, limit)]
@@ -0,0 +1,152 @@
+import math
+import numpy as np  # type: ignore
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+from algorithms.orientations import ALL_ROTATIONS, orientation_table
+from algorithms.sku_table import SkuTable, SkuType, as_sku_table
+
+# Các cặp trục (a, b) của mặt cắt và trục còn lại c: 0 = width, 1 = height, 2 = depth
+_AXIS_PAIRS = ((0, 1, 2), (0, 2, 1), (1, 2, 0))
+_EPS = 1e-9
+# Dung sai kích thước khi xét kiện có vừa container không; dùng chung cho prefilter của các
+# thuật toán và compute_bounds để cận và phương án cùng coi một kiện là vừa hay không
+FIT_TOLERANCE = 1e-3
+
+Rotations = Tuple[Tuple[int, int, int], ...]
+
+
+@dataclass
+class PackingBounds:
+    """Các cận của một yêu cầu đóng gói, tính trước khi chạy thuật toán.
+
+    ``min_containers`` là cận dưới số container cần để chứa hết hàng (cận thể
+    tích L0 và cận L2 của Martello–Toth trên các kiện không thể nằm cạnh nhau).
+    ``utilization_bound`` là cận trên tỷ lệ sử dụng đạt được với một container,
+    nên ``utilization_bound - utilization`` là khoảng cách tối đa tới tối ưu.
+    """
+    container_volume: float
+    total_volume: float
+    fit_volume: float  # Thể tích các kiện vừa container theo ít nhất một hướng xoay
+    unfit_units: int  # Số kiện không vừa container theo hướng nào
+    min_containers: int
+    utilization_bound: float
+
+    def gap(self, utilization: float) -> float:
+        return max(0.0, self.utilization_bound - utilization)
+
+
+def _dims(container_dimensions: Dict) -> Tuple[float, float, float]:
+    return (container_dimensions["width"], container_dimensions["height"], container_dimensions["depth"])
+
+
+def fits_container(width: float, height: float, depth: float, container_dimensions: Dict,
+                   rotations: Rotations = ALL_ROTATIONS, tolerance: float = FIT_TOLERANCE) -> bool:
+    """Kiện có vừa container rỗng theo ít nhất một hướng xoay được phép không"""
+    limits = _dims(container_dimensions)
+    return any(w <= limits[0] + tolerance and h <= limits[1] + tolerance and d <= limits[2] + tolerance
+               for w, h, d, _ in orientation_table(width, height, depth, rotations))
+
+
+def prefilter(table: SkuTable, container_dimensions: Dict, rotations: Rotations = ALL_ROTATIONS,
+              tolerance: float = FIT_TOLERANCE) -> int:
+    """Bỏ (discard) các SKU không vừa container theo hướng nào; trả về số kiện bị bỏ"""
+    dropped = 0
+    for idx, sku in enumerate(table.skus):
+        if table.remaining[idx] and not fits_container(sku.width, sku.height, sku.depth,
+                                                       container_dimensions, rotations, tolerance):
+            dropped += table.discard(idx)
+    return dropped
+
+
+def smallest_remaining_volume(skus: Sequence[SkuType], remaining: Sequence[int]) -> float:
+    """Thể tích nhỏ nhất trong các SKU còn hàng (vô cực nếu đã hết)"""
+    return min((sku.volume for sku, left in zip(skus, remaining) if left), default=math.inf)
+
+
+def residual_exhausted(free_volume: float, skus: Sequence[SkuType], remaining: Sequence[int]) -> bool:
+    """Thể tích trống còn lại không đủ chứa bất kỳ kiện nào còn lại: dừng sớm được"""
+    return smallest_remaining_volume(skus, remaining) > free_volume
+
+
+def suffix_min_volumes(volumes: Union[Sequence[float], np.ndarray]) -> np.ndarray:
+    """Phần tử i là thể tích nhỏ nhất của volumes[i:] (cho các thuật toán xếp theo hoán vị từng kiện)"""
+    values = np.asarray(volumes, dtype=np.float64)
+    return np.minimum.accumulate(values[::-1])[::-1]
+
+
+def martello_toth_l2(sizes: Iterable[Tuple[float, int]], capacity: float) -> int:
+    """Cận dưới L2 của Martello–Toth cho bin packing 1D; sizes gồm (kích thước, số lượng)"""
+    items = [(size, count) for size, count in sizes if count > 0]
+    if not items:
+        return 0
+    half = capacity / 2
+    best = 0
+    for alpha in {0.0} | {size for size, _ in items if size <= half + _EPS}:
+        large = sum(count for size, count in items if size > capacity - alpha + _EPS)
+        medium = [(size, count) for size, count in items if half + _EPS < size <= capacity - alpha + _EPS]
+        small_volume = sum(size * count for size, count in items if alpha - _EPS <= size <= half + _EPS)
+        medium_count = sum(count for _, count in medium)
+        medium_slack = medium_count * capacity - sum(size * count for size, count in medium)
+        extra = max(0, math.ceil((small_volume - medium_slack) / capacity - _EPS))
+        best = max(best, large + medium_count + extra)
+    return best
+
+
+def _large_in_plane(sku: Any, limits: Tuple[float, float, float], a: int, b: int, c: int,
+                    rotations: Rotations) -> Union[float, None]:
+    """Kích thước nhỏ nhất theo trục c nếu mọi hướng xoay đều lớn hơn nửa mặt (a, b), ngược lại None.
+
+    Hai kiện như vậy luôn chồng lên nhau trên mặt (a, b) nên phải xếp nối tiếp theo trục c.
+    """
+    extents = []
+    for orientation in orientation_table(sku.width, sku.height, sku.depth, rotations):
+        if orientation[a] <= limits[a] / 2 or orientation[b] <= limits[b] / 2:
+            return None
+        if all(size <= limit + FIT_TOLERANCE for size, limit in zip(orientation[:3], limits)):
+            extents.append(orientation[c])
+    return min(extents) if extents else None
+
+
+def _knapsack_volume(items: List[Tuple[float, float, int]], capacity: float) -> float:
+    """Cận trên (nới lỏng phân số) thể tích chọn được từ items (độ dài, thể tích, số lượng) với tổng độ dài <= capacity"""
+    total = 0.0
+    room = capacity
+    for length, volume, count in sorted(items, key=lambda item: -item[1] / item[0]):
+        if room <= 0:
+            break
+        take = min(count, room / length)
+        total += take * volume
+        room -= take * length
+    return total
+
+
+def compute_bounds(goods: Union[SkuTable, Iterable[Any]], container_dimensions: Dict,
+                   rotations: Rotations = ALL_ROTATIONS) -> PackingBounds:
+    """Tính cận số container và cận trên tỷ lệ sử dụng cho một yêu cầu"""
+    table = as_sku_table(goods)
+    limits = _dims(container_dimensions)
+    container_volume = limits[0] * limits[1] * limits[2]
+    total_volume = table.total_volume
+    unfit_units = prefilter(table, container_dimensions, rotations)
+    skus = [(sku, left) for sku, left in zip(table.skus, table.remaining) if left]
+    fit_volume = sum(sku.volume * left for sku, left in skus)
+    if container_volume <= 0:
+        return PackingBounds(container_volume, total_volume, fit_volume, unfit_units, 0, 0.0)
+
+    min_containers = math.ceil(fit_volume / container_volume - _EPS) if fit_volume > 0 else 0
+    volume_bound = fit_volume
+    for a, b, c in _AXIS_PAIRS:
+        large = []
+        for sku, left in skus:
+            extent = _large_in_plane(sku, limits, a, b, c, rotations)
+            if extent is not None:
+                large.append((extent, sku.volume, left))
+        if not large:
+            continue
+        min_containers = max(min_containers, martello_toth_l2(((e, n) for e, _, n in large), limits[c]))
+        # Trong một container, các kiện này chiếm tổng độ dài theo trục c không quá limits[c]
+        large_volume = sum(volume * count for _, volume, count in large)
+        volume_bound = min(volume_bound, fit_volume - large_volume + _knapsack_volume(large, limits[c]))
+
+    utilization_bound = min(1.0, volume_bound / container_volume)
+    return PackingBounds(container_volume, total_volume, fit_volume, unfit_units, min_containers, utilization_bound)
@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional, Self, Tuple, Union
+from algorithms.orientations import ALL_ROTATIONS, Orientation, orientation_table
+
+# Vị trí/góc xoay lưu dạng tuple (x, y, z); vẫn nhận dict {"x", "y", "z"} để tương thích
+Vector = Tuple[float, float, float]
+_ORIGIN: Vector = (0, 0, 0)
+
+
+def _as_vector(value: Union[None, Dict[str, float], Tuple[float, float, float]]) -> Vector:
+    if value is None:
+        return _ORIGIN
+    if isinstance(value, dict):
+        return (value["x"], value["y"], value["z"])
+    return (value[0], value[1], value[2])
+
+
+class BoxBase:
+    """Box gọn nhẹ dùng ``__slots__``; vị trí và góc xoay là tuple bất biến.
+
+    Không có ``__dict__`` riêng cho mỗi box và ``clone`` chỉ sao chép các tham
+    chiếu (tuple dùng chung được), nên nhân bản cả manifest cho mỗi chromosome
+    gần như không tốn chi phí. ``position``/``rotation`` dạng dict vẫn đọc/gán
+    được như trước; ``to_dict`` tạo đúng cấu trúc JSON của ``PackingResponse``.
+    Lớp con đặt ``ROTATIONS`` để chọn tập hướng xoay được phép.
+    """
+    __slots__ = ("id", "width", "height", "depth", "name", "label", "weight",
+                 "volume", "pos", "rot", "placed", "orientation")
+    ROTATIONS: Tuple[Tuple[int, int, int], ...] = ALL_ROTATIONS
+
+    def __init__(self, id: str, width: float, height: float, depth: float, name: str, label: str,
+                 weight: float, position: Optional[Dict[str, float]] = None,
+                 rotation: Optional[Dict[str, float]] = None, placed: bool = False, orientation: int = 0):
+        self.id = id
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.name = name
+        self.label = label  # Dùng để nhóm các box
+        self.weight = weight
+        self.volume = width * height * depth
+        self.pos = _as_vector(position)
+        self.rot = _as_vector(rotation)
+        self.placed = False
+        self.orientation = 0  # 0: original, 1: rotated
+
+    @property
+    def x(self) -> float:
+        return self.pos[0]
+
+    @property
+    def y(self) -> float:
+        return self.pos[1]
+
+    @property
+    def z(self) -> float:
+        return self.pos[2]
+
+    @property
+    def position(self) -> Dict[str, float]:
+        x, y, z = self.pos
+        return {"x": x, "y": y, "z": z}
+
+    @position.setter
+    def position(self, value: Union[Dict[str, float], Vector]) -> None:
+        self.pos = _as_vector(value)
+
+    @property
+    def rotation(self) -> Dict[str, float]:
+        x, y, z = self.rot
+        return {"x": x, "y": y, "z": z}
+
+    @rotation.setter
+    def rotation(self, value: Union[Dict[str, float], Vector]) -> None:
+        self.rot = _as_vector(value)
+
+    def orientation_table(self) -> Tuple[Orientation, ...]:
+        """Bảng (width, height, depth, chỉ số) các hướng xoay được phép, đã bỏ hướng trùng, dùng chung theo SKU"""
+        return orientation_table(self.width, self.height, self.depth, self.ROTATIONS)
+
+    def get_orientations(self) -> List[Dict]:
+        return [{"width": w, "height": h, "depth": d, "volume": w * h * d, "orientation": i}
+                for w, h, d, i in self.orientation_table()]
+
+    def clone(self) -> Self:
+        new_box = object.__new__(type(self))
+        new_box.id = self.id
+        new_box.width = self.width
+        new_box.height = self.height
+        new_box.depth = self.depth
+        new_box.name = self.name
+        new_box.label = self.label
+        new_box.weight = self.weight
+        new_box.volume = self.volume
+        new_box.pos = self.pos
+        new_box.rot = self.rot
+        new_box.placed = self.placed
+        new_box.orientation = self.orientation
+        return new_box
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dạng dict giống ``__dict__`` của Box dataclass cũ (cấu trúc JSON của API)"""
+        return {
+            "id": self.id,
+            "width": self.width,
+            "height": self.height,
+            "depth": self.depth,
+            "name": self.name,
+            "label": self.label,
+            "weight": self.weight,
+            "position": self.position,
+            "rotation": self.rotation,
+            "placed": self.placed,
+            "orientation": self.orientation,
+            "volume": self.volume,
+        }
+
+    def _fields(self) -> tuple:
+        return (self.id, self.width, self.height, self.depth, self.name, self.label, self.weight,
+                self.pos, self.rot, self.placed, self.orientation)
+
+    def __eq__(self, other: object) -> bool:
+        # So sánh theo giá trị các trường như dataclass cũ
+        if not isinstance(other, BoxBase) or other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in BoxBase.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for slot, value in zip(BoxBase.__slots__, state):
+            setattr(self, slot, value)
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(id={self.id!r}, width={self.width!r}, height={self.height!r}, "
+                f"depth={self.depth!r}, name={self.name!r}, label={self.label!r}, weight={self.weight!r}, "
+                f"position={self.position!r}, rotation={self.rotation!r}, placed={self.placed!r}, "
+                f"orientation={self.orientation!r})")
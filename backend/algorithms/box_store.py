@@ -0,0 +1,169 @@
+import numpy as np  # type: ignore
+from typing import Optional, Tuple
+
+
+class ColumnarBoxStore:
+    """Lưu hình học các box đã đặt dưới dạng mảng NumPy liên tục để truy vấn vector hóa.
+
+    Mỗi hàng của ``_data`` là một cột dữ liệu: x, y, z, w, h, d và các tọa độ
+    đầu mút x + w, y + h, z + d (tính sẵn để không phải cộng lại mỗi lần truy vấn).
+    Dung lượng tăng gấp đôi khi đầy nên chi phí thêm box là O(1) khấu hao.
+    """
+    X, Y, Z, W, H, D, X2, Y2, Z2 = range(9)
+    # Giới hạn số phần tử của ma trận ứng viên × box trong một lần broadcast
+    CHUNK_ELEMENTS = 1 << 20
+
+    def __init__(self, capacity: int = 64):
+        self._data = np.zeros((9, max(1, capacity)), dtype=np.float64)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _grow(self) -> None:
+        new_data = np.zeros((9, self._data.shape[1] * 2), dtype=np.float64)
+        new_data[:, :self.size] = self._data[:, :self.size]
+        self._data = new_data
+
+    def append(self, x: float, y: float, z: float, w: float, h: float, d: float) -> int:
+        """Thêm một box và trả về chỉ số của nó trong store"""
+        if self.size == self._data.shape[1]:
+            self._grow()
+        i = self.size
+        self._data[:, i] = (x, y, z, w, h, d, x + w, y + h, z + d)
+        self.size += 1
+        return i
+
+    def truncate(self, size: int) -> None:
+        """Bỏ các box có chỉ số >= size (dùng khi hoàn tác việc đặt box)"""
+        self.size = max(0, min(size, self.size))
+
+    def column(self, index: int) -> np.ndarray:
+        return self._data[index, :self.size]
+
+    def columns(self) -> np.ndarray:
+        """Mảng (9, size) chỉ đọc của mọi cột, hàng theo các hằng X … Z2 (view, không sao chép)"""
+        view = self._data[:, :self.size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[self.X, :self.size]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[self.Y, :self.size]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self._data[self.Z, :self.size]
+
+    @property
+    def w(self) -> np.ndarray:
+        return self._data[self.W, :self.size]
+
+    @property
+    def h(self) -> np.ndarray:
+        return self._data[self.H, :self.size]
+
+    @property
+    def d(self) -> np.ndarray:
+        return self._data[self.D, :self.size]
+
+    def overlap_mask(self, x: float, y: float, z: float, w: float, h: float, d: float,
+                     start: int = 0) -> np.ndarray:
+        """Mặt nạ các box (từ chỉ số start) giao với hộp (x, y, z, w, h, d)"""
+        data = self._data[:, start:self.size]
+        return ((x < data[self.X2]) & (x + w > data[self.X]) &
+                (y < data[self.Y2]) & (y + h > data[self.Y]) &
+                (z < data[self.Z2]) & (z + d > data[self.Z]))
+
+    def overlaps(self, x: float, y: float, z: float, w: float, h: float, d: float,
+                 start: int = 0) -> bool:
+        """Kiểm tra hộp (x, y, z, w, h, d) có giao với box nào đã lưu không"""
+        if self.size <= start:
+            return False
+        return bool(self.overlap_mask(x, y, z, w, h, d, start).any())
+
+    def _chunk_rows(self) -> int:
+        return max(1, self.CHUNK_ELEMENTS // max(1, self.size))
+
+    def overlaps_many(self, candidates: np.ndarray) -> np.ndarray:
+        """Kiểm tra va chạm cho cả mảng ứng viên (k, 6) gồm các cột x, y, z, w, h, d"""
+        candidates = np.asarray(candidates, dtype=np.float64).reshape(-1, 6)
+        result = np.zeros(len(candidates), dtype=bool)
+        if self.size == 0 or len(candidates) == 0:
+            return result
+        data = self._data[:, :self.size]
+        step = self._chunk_rows()
+        for begin in range(0, len(candidates), step):
+            c = candidates[begin:begin + step]
+            cx, cy, cz = c[:, 0:1], c[:, 1:2], c[:, 2:3]
+            hit = ((cx < data[self.X2]) & (cx + c[:, 3:4] > data[self.X]) &
+                   (cy < data[self.Y2]) & (cy + c[:, 4:5] > data[self.Y]) &
+                   (cz < data[self.Z2]) & (cz + c[:, 5:6] > data[self.Z]))
+            result[begin:begin + step] = hit.any(axis=1)
+        return result
+
+    def contains_point(self, x: float, y: float, z: float) -> bool:
+        """Điểm có nằm trong (nửa mở) một box đã đặt không"""
+        if self.size == 0:
+            return False
+        data = self._data[:, :self.size]
+        return bool(((data[self.X] <= x) & (x < data[self.X2]) &
+                     (data[self.Y] <= y) & (y < data[self.Y2]) &
+                     (data[self.Z] <= z) & (z < data[self.Z2])).any())
+
+    def contains_points(self, points: np.ndarray, stop: Optional[int] = None) -> np.ndarray:
+        """Phiên bản vector hóa của contains_point cho mảng điểm (k, 3), chỉ xét các box trước chỉ số stop"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        result = np.zeros(len(points), dtype=bool)
+        size = self.size if stop is None else min(stop, self.size)
+        if size == 0 or len(points) == 0:
+            return result
+        data = self._data[:, :size]
+        step = self._chunk_rows()
+        for begin in range(0, len(points), step):
+            p = points[begin:begin + step]
+            px, py, pz = p[:, 0:1], p[:, 1:2], p[:, 2:3]
+            inside = ((data[self.X] <= px) & (px < data[self.X2]) &
+                      (data[self.Y] <= py) & (py < data[self.Y2]) &
+                      (data[self.Z] <= pz) & (pz < data[self.Z2]))
+            result[begin:begin + step] = inside.any(axis=1)
+        return result
+
+    def footprint_overlap_area(self, x: float, z: float, w: float, d: float) -> np.ndarray:
+        """Diện tích giao theo mặt X–Z giữa footprint và từng box (0 nếu không giao)"""
+        data = self._data[:, :self.size]
+        dx = np.minimum(x + w, data[self.X2]) - np.maximum(x, data[self.X])
+        dz = np.minimum(z + d, data[self.Z2]) - np.maximum(z, data[self.Z])
+        return np.where((dx > 0) & (dz > 0), dx * dz, 0.0)
+
+    def support_area(self, x: float, y: float, z: float, w: float, d: float,
+                     tolerance: float = 1e-3) -> float:
+        """Tổng diện tích đỡ bởi các box có mặt trên nằm đúng ở độ cao y"""
+        if self.size == 0:
+            return 0.0
+        on_level = np.abs(self._data[self.Y2, :self.size] - y) < tolerance
+        if not on_level.any():
+            return 0.0
+        return float(self.footprint_overlap_area(x, z, w, d)[on_level].sum())
+
+    def max_front_under(self, x: float, y: float, w: float, h: float, limit: float) -> float:
+        """Mặt trước xa nhất theo z (<= limit) trong số các box giao với mặt X–Y, mặc định 0"""
+        if self.size == 0:
+            return 0.0
+        data = self._data[:, :self.size]
+        mask = ((x + w > data[self.X]) & (x < data[self.X2]) &
+                (y + h > data[self.Y]) & (y < data[self.Y2]) &
+                (data[self.Z2] <= limit))
+        if not mask.any():
+            return 0.0
+        return max(0.0, float(data[self.Z2][mask].max()))
+
+    def bounds(self, index: int) -> Tuple[float, float, float, float, float, float]:
+        """Trả về (x, y, z, w, h, d) của box tại chỉ số index"""
+        col = self._data[:6, index]
+        return (float(col[0]), float(col[1]), float(col[2]),
+                float(col[3]), float(col[4]), float(col[5]))
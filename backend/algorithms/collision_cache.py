@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+
+class CollisionCache:
+    """LRU cache cho kết quả kiểm tra va chạm, vô hiệu hóa theo epoch và theo vùng.
+
+    ``epoch`` là số box đã thêm vào index tại thời điểm tính kết quả. Thêm box
+    không bao giờ làm mất một va chạm, nên kết quả "va chạm" luôn còn đúng; kết
+    quả "trống" của epoch cũ chỉ cần kiểm tra lại với các box được thêm sau đó
+    (vùng thay đổi) thay vì tính lại toàn bộ. Khi box bị gỡ (hoàn tác),
+    ``invalidate_all`` loại bỏ mọi kết quả cũ.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: Hashable, result: bool, epoch: int) -> None:
+        self._entries[key] = (result, epoch)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key: Hashable, epoch: int, compute: Callable[[], bool],
+               collides_since: Optional[Callable[[int], bool]] = None) -> bool:
+        """Trả về kết quả va chạm cho key, tính lại khi cần.
+
+        compute: tính đầy đủ kết quả va chạm.
+        collides_since(start_epoch): chỉ kiểm tra với các box thêm từ start_epoch;
+        nếu None thì kết quả "trống" cũ được tính lại bằng compute.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            result, entry_epoch = entry
+            if result or entry_epoch == epoch:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return result
+            self.revalidations += 1
+            result = collides_since(entry_epoch) if collides_since is not None else compute()
+            self._store(key, result, epoch)
+            return result
+        self.misses += 1
+        result = compute()
+        self._store(key, result, epoch)
+        return result
+
+    def invalidate_all(self) -> None:
+        """Vô hiệu hóa mọi kết quả đã cache (dùng khi box bị gỡ khỏi index)"""
+        self.invalidations += 1
+        self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,269 @@
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+from algorithms import progress
+from algorithms.bounds import compute_bounds, fits_container
+from algorithms.deadline import Deadline
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.multi_container import ContainerPlan, MultiContainerPacker, create_algorithm, run_algorithm
+from algorithms.sku_table import SkuTable, as_sku_table
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ContainerType:
+    """Một loại container trong danh mục (vd. 20ft, 40ft, 40HC) và chi phí mỗi container"""
+    name: str
+    width: float
+    height: float
+    depth: float
+    cost: float = 1.0
+
+    @property
+    def dimensions(self) -> Dict:
+        return {"width": self.width, "height": self.height, "depth": self.depth}
+
+    @property
+    def volume(self) -> float:
+        return self.width * self.height * self.depth
+
+    def contains(self, other: 'ContainerType') -> bool:
+        return self.width >= other.width and self.height >= other.height and self.depth >= other.depth
+
+
+@dataclass
+class ContainerSelection:
+    """Tổ hợp container được chọn: phương án từng container kèm loại container"""
+    containers: List[Tuple[ContainerType, ContainerPlan]]
+    unplaced: List[str]
+
+    @property
+    def cost(self) -> float:
+        return sum(container_type.cost for container_type, _ in self.containers)
+
+    @property
+    def volume(self) -> float:
+        return sum(container_type.volume for container_type, _ in self.containers)
+
+
+def prune_dominated(catalog: List[ContainerType]) -> Tuple[List[ContainerType], List[ContainerType]]:
+    """Tách các loại bị trội: có loại khác chứa được nó (mọi chiều lớn hơn hoặc bằng) mà không đắt hơn.
+
+    Mọi phương án dùng loại bị trội đều đổi được sang loại trội với chi phí không
+    cao hơn, nên không cần xếp thử. Hai loại giống hệt nhau chỉ giữ loại đầu.
+    """
+    kept, dominated = [], []
+    for i, candidate in enumerate(catalog):
+        if any(other.contains(candidate) and other.cost <= candidate.cost
+               and (j < i or not candidate.contains(other) or other.cost < candidate.cost)
+               for j, other in enumerate(catalog) if j != i):
+            dominated.append(candidate)
+        else:
+            kept.append(candidate)
+    return kept, dominated
+
+
+class ContainerSelector:
+    """Chọn tổ hợp container rẻ nhất chứa hết manifest từ một danh mục loại container.
+
+    Trước khi xếp thử, loại bị trội về kích thước và chi phí bị loại, và mỗi loại
+    còn lại có cận dưới chi phí ``min_containers × cost`` (cận số container của
+    ``bounds``). Các loại chứa được mọi kiện được xếp đồng thời bằng chế độ nhiều
+    container, theo thứ tự cận dưới chi phí; loại nào có cận dưới không rẻ hơn
+    phương án tốt nhất đã có thì bị huỷ trước khi chạy. Cuối cùng, các container
+    ít hàng của phương án tốt nhất được thử đổi sang loại rẻ hơn nếu vẫn chứa hết
+    hàng của nó (vd. 2 × 40HC + 1 × 20ft).
+    """
+
+    def __init__(self, algorithm: str = "enhanced", beam_width: int = 4, support_threshold: Optional[float] = None,
+                 max_containers: int = 50, max_workers: Optional[int] = None):
+        self.algorithm = algorithm
+        self.beam_width = beam_width
+        self.support_threshold = support_threshold
+        self.max_containers = max_containers
+        self.max_workers = max_workers  # Số tiến trình xếp thử song song các loại container (None: theo số CPU)
+        self.type_share = 0.8  # Phần thời gian dành cho việc xếp thử từng loại, phần còn lại để đổi container
+        # Báo cáo của lần chạy gần nhất: kết quả đánh giá từng loại container
+        self.candidates: List[Dict] = []
+        self.deadline_hit = False
+
+    def select(self, goods: Union[List['Box'], SkuTable], catalog: List[ContainerType], respect_groups: bool = True,
+               time_limit: Optional[float] = 30, target_utilization: Optional[float] = None) -> ContainerSelection:
+        table = as_sku_table(goods)
+        deadline = Deadline(time_limit)
+        kept, dominated = prune_dominated(catalog)
+        self.candidates = [self._report(container_type, "dominated") for container_type in dominated]
+
+        # Cận theo thể tích và kích thước của từng loại, chưa xếp thử
+        bounds = {id(container_type): compute_bounds(table, container_type.dimensions, Box.ROTATIONS)
+                  for container_type in kept}
+        min_unfit = min((bound.unfit_units for bound in bounds.values()), default=0)
+        eligible = []
+        for container_type in kept:
+            bound = bounds[id(container_type)]
+            if bound.unfit_units > min_unfit:
+                # Có kiện không vừa loại này: chỉ dùng được để đổi container ở bước cuối
+                self.candidates.append(self._report(container_type, "too_small", bound.min_containers))
+            else:
+                eligible.append((bound.min_containers * container_type.cost, container_type))
+        eligible.sort(key=lambda item: item[0])
+
+        type_limit = None if time_limit is None else time_limit * self.type_share
+        results = self._evaluate(eligible, table, respect_groups, Deadline(type_limit, deadline.start),
+                                 target_utilization)
+        selections = []
+        for (_, container_type), result in zip(eligible, results):
+            min_containers = bounds[id(container_type)].min_containers
+            if result is None:
+                self.candidates.append(self._report(container_type, "pruned", min_containers))
+                continue
+            plans, unplaced = result
+            selection = ContainerSelection([(container_type, plan) for plan in plans], unplaced)
+            self.candidates.append(self._report(container_type, "packed", min_containers, selection))
+            selections.append(selection)
+
+        # Đổi container sang loại rẻ hơn, chỉ với phương án mà kể cả khi đổi mọi container
+        # sang loại rẻ nhất vẫn có thể rẻ hơn phương án tốt nhất hiện có
+        cheapest = min(container_type.cost for container_type in kept) if kept else 0.0
+        best: Optional[ContainerSelection] = None
+        for selection in sorted(selections, key=self._key):
+            if best is not None and (len(selection.unplaced) > len(best.unplaced)
+                                     or len(selection.containers) * cheapest >= best.cost):
+                continue
+            selection = self._downsize(selection, table, kept, respect_groups, deadline, target_utilization)
+            if best is None or self._key(selection) < self._key(best):
+                best = selection
+        self.deadline_hit = deadline.expired() or deadline.hit
+        if best is None:
+            return ContainerSelection([], table.unit_ids())
+        for index, (container_type, plan) in enumerate(best.containers):
+            progress.plan(plan.boxes, plan.utilization, container=index, container_type=container_type.name)
+        return best
+
+    @staticmethod
+    def _key(selection: ContainerSelection) -> Tuple[int, float, float]:
+        """Ưu tiên xếp được nhiều kiện nhất, rồi chi phí thấp nhất, rồi tổng thể tích container nhỏ nhất"""
+        return (len(selection.unplaced), selection.cost, selection.volume)
+
+    @staticmethod
+    def _report(container_type: ContainerType, status: str, min_containers: Optional[int] = None,
+                selection: Optional[ContainerSelection] = None) -> Dict:
+        report = {"name": container_type.name, "cost": container_type.cost, "status": status,
+                  "min_containers": min_containers,
+                  "cost_bound": None if min_containers is None else min_containers * container_type.cost}
+        if selection is not None:
+            report.update(containers=len(selection.containers), total_cost=selection.cost,
+                          unplaced=len(selection.unplaced))
+        return report
+
+    def _evaluate(self, eligible: List[Tuple[float, ContainerType]], table: SkuTable, respect_groups: bool,
+                  deadline: Deadline, target_utilization: Optional[float]
+                  ) -> List[Optional[Tuple[List[ContainerPlan], List[str]]]]:
+        """Xếp thử từng loại bằng chế độ nhiều container, song song trên process pool.
+
+        Loại chưa chạy mà cận dưới chi phí không rẻ hơn phương án đầy đủ tốt nhất đã có
+        thì bị huỷ (kết quả None).
+        """
+        args = [(self.algorithm, self.beam_width, self.support_threshold, self.max_containers, table,
+                 container_type.dimensions, respect_groups, deadline, target_utilization)
+                for _, container_type in eligible]
+        results: List[Optional[Tuple[List[ContainerPlan], List[str]]]] = [None] * len(eligible)
+        best_cost = float("inf")
+
+        def accept(i: int, result: Optional[Tuple[List[ContainerPlan], List[str]]]) -> float:
+            results[i] = result
+            if result is not None:
+                container_type = eligible[i][1]
+                progress.emit("candidate", name=container_type.name, containers=len(result[0]),
+                              total_cost=len(result[0]) * container_type.cost, unplaced=len(result[1]))
+            if result is None or result[1]:
+                return best_cost  # Chưa xếp hết hàng: không dùng làm mốc cắt tỉa
+            return min(best_cost, len(result[0]) * eligible[i][1].cost)
+
+        workers = min(len(eligible), self.max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures: Dict[Future, int] = {executor.submit(_evaluate_type, *arg): i
+                                                  for i, arg in enumerate(args)}
+                    pending = set(futures)
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            if not future.cancelled():
+                                best_cost = accept(futures[future], future.result())
+                        for future in list(pending):
+                            if eligible[futures[future]][0] >= best_cost and future.cancel():
+                                pending.discard(future)
+                return results
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                logger.info(f"Không xếp thử song song được ({e}), chuyển sang chạy tuần tự")
+                results = [None] * len(eligible)
+                best_cost = float("inf")
+        for i, arg in enumerate(args):
+            if eligible[i][0] < best_cost:
+                with progress.muted():
+                    result = _evaluate_type(*arg)
+                best_cost = accept(i, result)
+        return results
+
+    def _downsize(self, selection: ContainerSelection, table: SkuTable, catalog: List[ContainerType],
+                  respect_groups: bool, deadline: Deadline,
+                  target_utilization: Optional[float]) -> ContainerSelection:
+        """Đổi các container ít hàng sang loại rẻ hơn còn chứa hết hàng của nó, container ít hàng nhất trước"""
+        containers = list(selection.containers)
+        order = sorted(range(len(containers)), key=lambda i: containers[i][1].used_volume / containers[i][0].volume)
+        for i in order:
+            if deadline.expired():
+                break
+            current, plan = containers[i]
+            share = table.subset(box.id for box in plan.boxes)
+            for container_type in sorted(catalog, key=lambda t: t.cost):
+                if container_type.cost >= current.cost:
+                    break
+                # Cận thể tích và kích thước trước khi xếp thử
+                if plan.used_volume > container_type.volume or not all(
+                        fits_container(box.width, box.height, box.depth, container_type.dimensions, Box.ROTATIONS)
+                        for box in plan.boxes):
+                    continue
+                with progress.muted():
+                    repacked = self._repack(share, container_type, respect_groups, deadline, target_utilization)
+                if repacked is not None:
+                    containers[i] = (container_type, repacked)
+                    break
+        return ContainerSelection(containers, selection.unplaced)
+
+    def _repack(self, share: SkuTable, container_type: ContainerType, respect_groups: bool, deadline: Deadline,
+                target_utilization: Optional[float]) -> Optional[ContainerPlan]:
+        """Xếp phần hàng vào một container của loại mới; None nếu không xếp hết.
+
+        Phần hàng của một container thường nhỏ nên beam search được thử thêm khi
+        thuật toán đã chọn không xếp hết.
+        """
+        names = [self.algorithm] if self.algorithm == "beam" else [self.algorithm, "beam"]
+        for name in names:
+            if deadline.expired():
+                break
+            algorithm = create_algorithm(name, self.beam_width, self.support_threshold)
+            algorithm.max_workers = 1
+            boxes, utilization = run_algorithm(algorithm, share, container_type.dimensions, respect_groups,
+                                               deadline.remaining(), target_utilization)
+            if len(boxes) == share.total_units:
+                return ContainerPlan(boxes, utilization)
+        return None
+
+
+def _evaluate_type(algorithm_name: str, beam_width: int, support_threshold: Optional[float], max_containers: int,
+                   table: SkuTable, container_dimensions: Dict, respect_groups: bool, deadline: Deadline,
+                   target_utilization: Optional[float]) -> Optional[Tuple[List[ContainerPlan], List[str]]]:
+    """Xếp manifest vào các container của một loại (hàm cấp module để chạy trong tiến trình con)"""
+    packer = MultiContainerPacker(algorithm_name, beam_width, support_threshold, max_containers, max_workers=1)
+    try:
+        return packer.pack(table, container_dimensions, respect_groups, deadline.remaining(), target_utilization)
+    except Exception as e:
+        logger.warning(f"Lỗi khi xếp thử loại container ({e})")
+        return None
@@ -0,0 +1,84 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from algorithms import progress
+
+logger = logging.getLogger(__name__)
+
+# Token huỷ của tiến trình hiện tại (vd. Event của manager do JobManager truyền vào job). Khi token
+# được set, mọi Deadline coi như đã hết giờ nên thuật toán dừng ở điểm kiểm tra kế tiếp và trả về
+# phương án dở dang. Đọc token có thể tốn một lượt IPC nên chỉ đọc lại sau CANCEL_CHECK_INTERVAL giây.
+CANCEL_CHECK_INTERVAL = 0.05
+
+_cancel_token: Any = None
+_cancel_checked_at = 0.0
+_cancel_seen = False
+
+
+def set_cancel_token(token: Any) -> None:
+    """Cài token huỷ (đối tượng có is_set()) cho tiến trình hiện tại (None để gỡ)"""
+    global _cancel_token, _cancel_checked_at, _cancel_seen
+    _cancel_token = token
+    _cancel_checked_at = 0.0
+    _cancel_seen = False
+
+
+def cancelled() -> bool:
+    """Lần đóng gói của tiến trình hiện tại đã bị huỷ chưa"""
+    global _cancel_checked_at, _cancel_seen
+    if _cancel_token is None or _cancel_seen:
+        return _cancel_seen
+    now = time.monotonic()
+    if now - _cancel_checked_at >= CANCEL_CHECK_INTERVAL:
+        _cancel_checked_at = now
+        try:
+            _cancel_seen = bool(_cancel_token.is_set())
+        except (OSError, EOFError) as e:
+            logger.warning(f"Không đọc được token huỷ ({e})")
+    return _cancel_seen
+
+
+class Deadline:
+    """Hạn chót dùng chung cho mọi pha của một lần đóng gói (chế độ anytime).
+
+    Lưu thời điểm kết thúc tuyệt đối theo ``time.time()`` nên có thể gửi sang
+    tiến trình con mà vẫn cùng một hạn chót. Mỗi pha gọi ``expired()`` và trả
+    về kết quả tốt nhất hiện có khi hết giờ; ``checkpoints`` ghi lại tỷ lệ sử
+    dụng sau mỗi pha để báo cáo trong response. Lần đóng gói bị huỷ (xem
+    ``set_cancel_token``) được coi như đã hết giờ.
+    """
+
+    def __init__(self, time_limit: Optional[float] = None, start: Optional[float] = None):
+        self.start = time.time() if start is None else start
+        self.end = None if time_limit is None else self.start + max(0.0, float(time_limit))
+        self.hit = False
+        self.checkpoints: List[Dict] = []
+
+    def elapsed(self) -> float:
+        return time.time() - self.start
+
+    def remaining(self) -> Optional[float]:
+        """Số giây còn lại (None nếu không giới hạn)"""
+        if cancelled():
+            return 0.0
+        if self.end is None:
+            return None
+        return max(0.0, self.end - time.time())
+
+    def expired(self) -> bool:
+        if cancelled() or (self.end is not None and time.time() >= self.end):
+            self.hit = True
+            return True
+        return False
+
+    def checkpoint(self, phase: str, utilization: float, best_utilization: float) -> Dict:
+        """Ghi lại kết quả của một pha"""
+        record = {
+            "phase": phase,
+            "elapsed": round(self.elapsed(), 4),
+            "utilization": utilization,
+            "best_utilization": best_utilization,
+        }
+        self.checkpoints.append(record)
+        progress.emit("checkpoint", **record)
+        return record
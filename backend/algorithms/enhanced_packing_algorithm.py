@@ -1,83 +1,106 @@
 import numpy as np  # type: ignore
-from typing import List, Dict, Tuple, Optional, Set
-from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Dict, Sequence, Tuple, Optional, Set, Union
 from collections import defaultdict
+import logging
+import multiprocessing
+import os
 import time
 import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
 from functools import lru_cache
 from itertools import groupby
+from algorithms.bounds import PackingBounds, compute_bounds, prefilter, residual_exhausted
+from algorithms.box_store import ColumnarBoxStore
+from algorithms.deadline import CANCEL_CHECK_INTERVAL, Deadline, cancelled, set_cancel_token
+from algorithms.extreme_points import ExtremePointSet
+from algorithms.heightmap import HeightMap
+from algorithms.layer_patterns import LayerPatternCache, flush_cache, layer_pattern
+from algorithms.occupancy_grid import DenseOccupancyGrid, choose_cell_size
+from algorithms import progress
+from algorithms.box import BoxBase
+from algorithms.orientations import Y_AXIS_ROTATIONS, Orientation, orientation_table
+from algorithms.sku_table import SkuTable, as_sku_table
+from algorithms.undo_log import UndoLog
 
-@dataclass
-class Box:
-    id: str
-    width: float
-    height: float
-    depth: float
-    name: str
-    label: str  # Dùng để nhóm các box
-    weight: float
-    position: Dict[str, float] = field(default_factory=lambda: {"x": 0, "y": 0, "z": 0})
-    rotation: Dict[str, float] = field(default_factory=lambda: {"x": 0, "y": 0, "z": 0})
-    placed: bool = False
-    orientation: int = 0
-    
-    def __post_init__(self):
-        self.volume = self.width * self.height * self.depth
-        self.placed = False
-        self.orientation = 0  # 0: original, 1: rotated
-    
-    def get_orientations(self) -> List[Dict]:
-        """Chỉ cho phép xoay quanh trục y (giới hạn orientation)"""
-        orientations = []
-        # Chỉ cho phép xoay quanh trục y: (width, height, depth) và (depth, height, width)
-        dimensions = [
-            (self.width, self.height, self.depth),
-            (self.depth, self.height, self.width)
-        ]
-        for i, (w, h, d) in enumerate(dimensions):
-            orientations.append({
-                "width": w, "height": h, "depth": d,
-                "volume": w * h * d,
-                "orientation": i
-            })
-        return orientations
-    
-    def clone(self) -> 'Box':
-        new_box = Box(self.id, self.width, self.height, self.depth,
-                     self.name, self.label, self.weight)
-        new_box.position = self.position.copy()
-        new_box.rotation = self.rotation.copy()
-        new_box.placed = self.placed
-        new_box.orientation = self.orientation
-        return new_box
+logger = logging.getLogger(__name__)
+
+class Box(BoxBase):
+    """Chỉ cho phép xoay quanh trục y (giới hạn orientation)"""
+    __slots__ = ()
+    ROTATIONS = Y_AXIS_ROTATIONS
 
 class OptimizedSpatialIndex:
-    """Cấu trúc dữ liệu spatial index tối ưu để kiểm tra va chạm nhanh"""
+    """Cấu trúc dữ liệu spatial index tối ưu để kiểm tra va chạm nhanh.
+
+    Hai chế độ:
+      - "dense": lưới chiếm chỗ NumPy đánh địa chỉ bằng tọa độ cell nguyên,
+        trả lời bằng phép rút gọn trên slice, trường hợp mơ hồ kiểm tra chính xác trên store
+      - "dict": lưới dict-of-sets với key chuỗi như trước (giữ lại để so sánh)
+    """
     def __init__(self, container_width: float, container_height: float,
-                 container_depth: float, cell_size: float = 50):  # Tăng cell_size để giảm số lượng cell
+                 container_depth: float, cell_size: Optional[float] = None,
+                 mode: str = "dense"):
+        if mode not in ("dense", "dict"):
+            raise ValueError(f"Unknown spatial index mode: {mode}")
+        self.mode = mode
+        if cell_size is None:
+            if mode == "dense":
+                cell_size = choose_cell_size([], {"width": container_width, "height": container_height,
+                                                  "depth": container_depth})
+            else:
+                cell_size = 50  # Tăng cell_size để giảm số lượng cell
         self.cell_size = cell_size
         self.width = max(1, int(np.ceil(container_width / cell_size)))
         self.height = max(1, int(np.ceil(container_height / cell_size)))
         self.depth = max(1, int(np.ceil(container_depth / cell_size)))
+        # Hình học chính xác của các box đã thêm (dùng cho kiểm tra chính xác)
+        self.store = ColumnarBoxStore()
+        self.occupancy = None
+        if mode == "dense":
+            self.occupancy = DenseOccupancyGrid(container_width, container_height, container_depth, cell_size)
         self.grid = defaultdict(set)  # Sử dụng set thay vì list để tìm kiếm nhanh hơn
-        # Cache cho các phép kiểm tra va chạm
-        self.collision_cache = {}
     
     def add_box(self, box: 'Box') -> None:
         """Thêm box vào spatial index"""
+        x, y, z = box.pos
+        self.store.append(x, y, z, box.width, box.height, box.depth)
+        if self.occupancy is not None:
+            self.occupancy.add(x, y, z, box.width, box.height, box.depth)
+            return
         cells = self._get_box_cells(box)
         for cell in cells:
             self.grid[cell].add(box.id)
     
+    def remove_last_box(self, box: 'Box') -> None:
+        """Gỡ box được thêm gần nhất (hoàn tác)"""
+        index = self.store.size - 1
+        x, y, z, w, h, d = self.store.bounds(index)
+        self.store.truncate(index)
+        if self.occupancy is not None:
+            self.occupancy.remove(x, y, z, w, h, d)
+        else:
+            for cell in self._get_box_cells(box):
+                self.grid[cell].discard(box.id)
+    
+    def overlaps(self, x: float, y: float, z: float, w: float, h: float, d: float) -> bool:
+        """Kiểm tra chính xác hộp (x, y, z, w, h, d) có giao với box nào không"""
+        if self.occupancy is not None:
+            hit = self.occupancy.query(x, y, z, w, h, d)
+            if hit is not None:
+                return hit
+        return self.store.overlaps(x, y, z, w, h, d)
+    
     def _get_box_cells(self, box: 'Box') -> List[str]:
         """Lấy danh sách các cell mà box chiếm"""
         cells = []
-        start_x = max(0, int(box.position['x'] / self.cell_size))
-        end_x = min(self.width - 1, int((box.position['x'] + box.width) / self.cell_size))
-        start_y = max(0, int(box.position['y'] / self.cell_size))
-        end_y = min(self.height - 1, int((box.position['y'] + box.height) / self.cell_size))
-        start_z = max(0, int(box.position['z'] / self.cell_size))
-        end_z = min(self.depth - 1, int((box.position['z'] + box.depth) / self.cell_size))
+        start_x = max(0, int(box.x / self.cell_size))
+        end_x = min(self.width - 1, int((box.x + box.width) / self.cell_size))
+        start_y = max(0, int(box.y / self.cell_size))
+        end_y = min(self.height - 1, int((box.y + box.height) / self.cell_size))
+        start_z = max(0, int(box.z / self.cell_size))
+        end_z = min(self.depth - 1, int((box.z + box.depth) / self.cell_size))
         
         for x in range(start_x, end_x + 1):
             for y in range(start_y, end_y + 1):
@@ -87,13 +110,14 @@ class OptimizedSpatialIndex:
     
     def check_collision(self, box_width: float, box_height: float, box_depth: float,
                        x: float, y: float, z: float) -> bool:
-        """Kiểm tra va chạm với caching"""
-        # Tạo key cho cache
-        cache_key = (box_width, box_height, box_depth, x, y, z)
-        if cache_key in self.collision_cache:
-            return self.collision_cache[cache_key]
-        
-        # Kiểm tra va chạm
+        """Kiểm tra va chạm theo chế độ của index (dict: bảo thủ theo cell)"""
+        if self.occupancy is not None:
+            return self.overlaps(x, y, z, box_width, box_height, box_depth)
+        return self._check_grid_collision(box_width, box_height, box_depth, x, y, z)
+    
+    def _check_grid_collision(self, box_width: float, box_height: float, box_depth: float,
+                              x: float, y: float, z: float) -> bool:
+        """Kiểm tra va chạm trên lưới dict-of-sets (bảo thủ theo cell)"""
         start_x = max(0, int(x / self.cell_size))
         end_x = min(self.width - 1, int((x + box_width) / self.cell_size))
         start_y = max(0, int(y / self.cell_size))
@@ -106,15 +130,18 @@ class OptimizedSpatialIndex:
                 for z_cell in range(start_z, end_z + 1):
                     cell = f"{x_cell},{y_cell},{z_cell}"
                     if cell in self.grid and len(self.grid[cell]) > 0:
-                        self.collision_cache[cache_key] = True
                         return True
-        
-        self.collision_cache[cache_key] = False
         return False
 
 class Container:
-    """Container để đặt các box"""
-    def __init__(self, width: float, height: float, depth: float):
+    """Container để đặt các box.
+
+    ``checkpoint``/``rollback`` hoàn tác các lần ``place_box`` theo nhật ký
+    (O(số thay đổi)): spatial index, heightmap, extreme point và các lớp đều
+    được khôi phục đúng như trước khi đặt.
+    """
+    def __init__(self, width: float, height: float, depth: float,
+                 cell_size: Optional[float] = None, index_mode: str = "dense"):
         self.width = width
         self.height = height
         self.depth = depth
@@ -122,9 +149,25 @@ class Container:
         self.used_volume = 0
         self.boxes = []
         self.box_dict = {}  # Lưu trữ box theo id để tìm kiếm nhanh
-        self.spatial_index = OptimizedSpatialIndex(width, height, depth)
-        self.extreme_points = [{"x": 0, "y": 0, "z": 0}]  # Khởi tạo với điểm gốc
+        self.spatial_index = OptimizedSpatialIndex(width, height, depth, cell_size, index_mode)
+        # Hình học các box đã đặt dạng cột (cùng thứ tự với self.boxes) để truy vấn vector hóa
+        self.store = self.spatial_index.store
+        # Bản đồ độ cao mặt trên trên sàn X–Z, cập nhật tăng dần khi đặt box
+        self.heightmap = HeightMap(width, depth)
+        # Tập extreme point đã khử trùng lặp, khởi tạo với điểm gốc
+        self.extreme_point_set = ExtremePointSet()
+        self.extreme_point_set.add(0, 0, 0)
+        # Số box đầu tiên (theo thứ tự đặt) đã được cập nhật vào extreme_point_set; phần còn lại
+        # chỉ được cập nhật khi cần đọc tập điểm
+        self._points_synced = 0
+        # Khi ghi nhật ký: (điểm thêm, điểm loại) của các box đã đặt nhưng chưa cập nhật extreme point,
+        # theo chỉ số box; lần cập nhật muộn ghi vào đúng các list nằm trong bản ghi hoàn tác của box đó
+        self._pending_point_deltas: Dict[int, Tuple[List, List]] = {}
         self.layers = []  # Các lớp theo chiều z (song song mặt trong container)
+        # Mã nhóm (label) của từng box, cùng thứ tự với self.boxes, cho các truy vấn vector hóa
+        self._label_codes: Dict[str, int] = {}
+        self._labels = np.zeros(64, dtype=np.int32)
+        self.undo_log = UndoLog()
     
     def can_place(self, box: 'Box', x: float, y: float, z: float) -> bool:
         # Kiểm tra biên container
@@ -133,108 +176,193 @@ class Container:
             z + box.depth > self.depth or
             x < 0 or y < 0 or z < 0):
             return False
-        # Kiểm tra va chạm với các box đã đặt
-        for other in self.boxes:
-            if self._is_overlap(box, x, y, z, other):
-                return False
-        return True
-    
-    def _is_overlap(self, box: 'Box', x: float, y: float, z: float, other: 'Box') -> bool:
-        # Kiểm tra va chạm giữa box (tại x,y,z) và other
-        return (
-            x < other.position['x'] + other.width and x + box.width > other.position['x'] and
-            y < other.position['y'] + other.height and y + box.height > other.position['y'] and
-            z < other.position['z'] + other.depth and z + box.depth > other.position['z']
-        )
-    
+        # Kiểm tra va chạm với các box đã đặt (lưới chiếm chỗ + store vector hóa)
+        return not self.spatial_index.overlaps(x, y, z, box.width, box.height, box.depth)
+
+    def can_place_many(self, candidates: np.ndarray) -> np.ndarray:
+        """Kiểm tra cả mảng ứng viên (k, 6) gồm x, y, z, w, h, d trong một lần gọi"""
+        candidates = np.asarray(candidates, dtype=np.float64).reshape(-1, 6)
+        x, y, z = candidates[:, 0], candidates[:, 1], candidates[:, 2]
+        in_bounds = ((x >= 0) & (y >= 0) & (z >= 0) &
+                     (x + candidates[:, 3] <= self.width) &
+                     (y + candidates[:, 4] <= self.height) &
+                     (z + candidates[:, 5] <= self.depth))
+        result = np.zeros(len(candidates), dtype=bool)
+        if in_bounds.any():
+            result[in_bounds] = ~self.store.overlaps_many(candidates[in_bounds])
+        return result
+
     def place_box(self, box: 'Box', x: float, y: float, z: float) -> None:
-        box.position = {"x": x, "y": y, "z": z}
+        recording = self.undo_log.recording
+        previous = (box.pos, box.placed, self.used_volume, self.box_dict.get(box.id)) if recording else None
+        box.pos = (x, y, z)
         box.placed = True
         self.boxes.append(box)
         self.box_dict[box.id] = box
         self.used_volume += box.volume
+        self._append_label(box.label)
         self.spatial_index.add_box(box)
-        self._update_extreme_points(box)
-        self._update_layers(box)
-    
-    def _update_extreme_points(self, box: 'Box') -> None:
-        # Sinh các extreme point mới dựa trên box vừa đặt
-        new_points = [
-            {"x": box.position["x"] + box.width, "y": box.position["y"], "z": box.position["z"]},
-            {"x": box.position["x"], "y": box.position["y"] + box.height, "z": box.position["z"]},
-            {"x": box.position["x"], "y": box.position["y"], "z": box.position["z"] + box.depth},
-            # Bổ sung: điểm cực ở cạnh bên (theo trục z) của box vừa đặt
-            {"x": box.position["x"], "y": box.position["y"], "z": box.position["z"] + box.depth}
+        heightmap_state = self.heightmap.place(x, z, box.width, box.depth, y + box.height)
+        if recording:
+            # Extreme point vẫn cập nhật muộn; bản ghi giữ chỗ cho phần thay đổi của riêng box này
+            point_delta: Tuple[List, List] = ([], [])
+            self._pending_point_deltas[len(self.boxes) - 1] = point_delta
+            layer_state = self._update_layers(box)
+            self.undo_log.record((box, previous, heightmap_state, point_delta, layer_state))
+        else:
+            self._update_layers(box)
+    
+    def label_code(self, label: str) -> int:
+        """Mã số nguyên của một nhóm (cấp mới nếu chưa gặp)"""
+        return self._label_codes.setdefault(label, len(self._label_codes))
+    
+    def _append_label(self, label: str) -> None:
+        # Box vừa thêm nằm ở cuối self.boxes; khi hoàn tác chỉ cần self.boxes ngắn lại
+        index = len(self.boxes) - 1
+        if index >= len(self._labels):
+            self._labels = np.concatenate([self._labels, np.zeros_like(self._labels)])
+        self._labels[index] = self.label_code(label)
+    
+    @property
+    def labels(self) -> np.ndarray:
+        """Mã nhóm của các box đã đặt (cùng thứ tự với self.boxes và self.store)"""
+        return self._labels[:len(self.boxes)]
+    
+    def checkpoint(self) -> int:
+        """Đánh dấu trạng thái hiện tại (bật ghi nhật ký); trả về mã dùng cho rollback"""
+        return self.undo_log.checkpoint()
+    
+    def rollback(self, checkpoint: int) -> List['Box']:
+        """Gỡ các box đặt sau checkpoint; trả về các box đã gỡ (mới nhất trước)"""
+        removed = []
+        for box, previous, heightmap_state, point_delta, layer_state in self.undo_log.pop_to(checkpoint):
+            self._revert_layers(layer_state)
+            index = len(self.boxes) - 1
+            if index < self._points_synced:
+                # Các box sau đã được hoàn tác trước nên phần thay đổi của box này nằm trên cùng tập điểm
+                self.extreme_point_set.restore(*point_delta)
+                self._points_synced = index
+            else:
+                self._pending_point_deltas.pop(index, None)
+            self.heightmap.restore(heightmap_state)
+            self.spatial_index.remove_last_box(box)
+            box.pos, box.placed, self.used_volume, replaced = previous
+            if replaced is None:
+                del self.box_dict[box.id]
+            else:
+                self.box_dict[box.id] = replaced
+            self.boxes.pop()
+            removed.append(box)
+        return removed
+    
+    def undo_last(self) -> 'Box':
+        """Gỡ box đặt gần nhất (phải được đặt sau một checkpoint)"""
+        if not len(self.undo_log):
+            raise ValueError("No placement to undo")
+        return self.rollback(len(self.undo_log) - 1)[0]
+    
+    def release_checkpoints(self) -> None:
+        """Tắt ghi nhật ký; các checkpoint cũ không dùng được nữa"""
+        self.undo_log.release()
+        self._pending_point_deltas.clear()
+    
+    @property
+    def extreme_points(self) -> List[Dict]:
+        self._sync_extreme_points()
+        return self.extreme_point_set.points()
+    
+    def _sync_extreme_points(self, count: Optional[int] = None) -> None:
+        """Cập nhật extreme_point_set cho các box chưa xử lý (tới box thứ count).
+
+        Việc cập nhật tốn O(số box đã đặt) mỗi box nên được hoãn tới khi thật sự
+        cần tập điểm: các chiến lược xếp theo hàng/lớp không đọc nó. Mỗi box chỉ
+        được xét với các box đặt trước nó nên xử lý muộn cho đúng kết quả (và thứ
+        tự) như cập nhật ngay; khi đang ghi nhật ký, phần thay đổi của từng box
+        được ghi vào bản ghi hoàn tác của box đó.
+        """
+        count = len(self.boxes) if count is None else count
+        for index in range(self._points_synced, count):
+            added, removed = self._pending_point_deltas.pop(index, (None, None))
+            self._update_extreme_points(self.boxes[index], index, added, removed)
+        self._points_synced = max(self._points_synced, count)
+    
+    def _update_extreme_points(self, box: 'Box', index: int, added: Optional[List] = None,
+                               removed: Optional[List] = None) -> None:
+        """Cập nhật tăng dần tập extreme point với box thứ index (theo thứ tự đặt).
+
+        Chỉ sinh các điểm mới liên quan đến box này: điểm của các box trước đã
+        được sinh khi chúng được xử lý và chỉ mất hiệu lực khi bị che phủ.
+        """
+        x, y, z = box.pos
+        # Loại bỏ các điểm bị che phủ bởi box này
+        self.extreme_point_set.prune_inside(x, y, z, box.width, box.height, box.depth, removed)
+        # Các điểm cực của box này: cạnh phải, phía trên, phía sau
+        candidates = [
+            (x + box.width, y, z),
+            (x, y + box.height, z),
+            (x, y, z + box.depth)
         ]
-        # Loại bỏ các điểm bị che phủ bởi box vừa đặt
-        self.extreme_points = [p for p in self.extreme_points if not self._is_point_inside_box(p, box)]
-        # Thêm các điểm mới nếu hợp lệ
-        for p in new_points:
-            if self._is_point_valid(p):
-                self.extreme_points.append(p)
-        
-        # Đảm bảo luôn sinh điểm cực phía trên (cùng x, z) cho mọi box đã đặt
-        for b in self.boxes:
-            top_point = {"x": b.position["x"], "y": b.position["y"] + b.height, "z": b.position["z"]}
-            if self._is_point_valid(top_point):
-                self.extreme_points.append(top_point)
-        # --- BỔ SUNG: Sinh điểm cực ở các giao điểm giữa các box đã đặt (ở y=0) ---
-        for other in self.boxes:
-            if other is not box:
-                # Giao điểm cạnh phải box này với cạnh trước box kia (ở y=0)
-                new_point1 = {"x": box.position["x"] + box.width, "y": 0, "z": other.position["z"] + other.depth}
-                if self._is_point_valid(new_point1):
-                    self.extreme_points.append(new_point1)
-                # Giao điểm cạnh trước box này với cạnh phải box kia (ở y=0)
-                new_point2 = {"x": other.position["x"] + other.width, "y": 0, "z": box.position["z"] + box.depth}
-                if self._is_point_valid(new_point2):
-                    self.extreme_points.append(new_point2)
-        # --- HẾT BỔ SUNG ---
-        # Sinh điểm cực ở cạnh phải và cạnh sau của mọi box đã đặt trên cùng lớp (cùng y)
-        for b in self.boxes:
-            if abs(b.position["y"] - box.position["y"]) < 1e-3:
-                right_point = {"x": b.position["x"] + b.width, "y": b.position["y"], "z": b.position["z"]}
-                if self._is_point_valid(right_point):
-                    self.extreme_points.append(right_point)
-                back_point = {"x": b.position["x"], "y": b.position["y"], "z": b.position["z"] + b.depth}
-                if self._is_point_valid(back_point):
-                    self.extreme_points.append(back_point)
-    
-    def _is_point_inside_box(self, point: Dict, box: 'Box') -> bool:
-        return (
-            box.position["x"] <= point["x"] < box.position["x"] + box.width and
-            box.position["y"] <= point["y"] < box.position["y"] + box.height and
-            box.position["z"] <= point["z"] < box.position["z"] + box.depth
-        )
-    
-    def _is_point_valid(self, point: Dict) -> bool:
-        # Điểm phải nằm trong container và không bị che phủ bởi box nào
-        if not (0 <= point["x"] <= self.width and 0 <= point["y"] <= self.height and 0 <= point["z"] <= self.depth):
-            return False
-        for box in self.boxes:
-            if self._is_point_inside_box(point, box):
-                return False
-        return True
+        # Giao điểm giữa box này và các box đặt trước nó (ở y=0)
+        others = index
+        if others > 0:
+            other_x2 = self.store.column(ColumnarBoxStore.X2)[:others]
+            other_z2 = self.store.column(ColumnarBoxStore.Z2)[:others]
+            zeros = np.zeros(others)
+            cross = np.concatenate([
+                np.column_stack([np.full(others, x + box.width), zeros, other_z2]),
+                np.column_stack([other_x2, zeros, np.full(others, z + box.depth)])
+            ])
+            points = np.vstack([np.array(candidates, dtype=np.float64), cross])
+        else:
+            points = np.array(candidates, dtype=np.float64)
+        self.extreme_point_set.add_many(points, self._points_valid(points, index + 1), added)
+    
+    def _points_valid(self, points: np.ndarray, count: Optional[int] = None) -> np.ndarray:
+        """Điểm nào (mảng (k, 3)) nằm trong container và không bị box nào (trong count box đầu) che phủ"""
+        in_bounds = ((points[:, 0] >= 0) & (points[:, 0] <= self.width) &
+                     (points[:, 1] >= 0) & (points[:, 1] <= self.height) &
+                     (points[:, 2] >= 0) & (points[:, 2] <= self.depth))
+        valid = np.zeros(len(points), dtype=bool)
+        if in_bounds.any():
+            valid[in_bounds] = ~self.store.contains_points(points[in_bounds], count)
+        return valid
     
-    def _update_layers(self, box: 'Box') -> None:
-        z = box.position["z"]
-        found = False
+    def _update_layers(self, box: 'Box') -> Tuple[Dict, Optional[float]]:
+        """Thêm box vào lớp theo z; trả về (lớp, depth cũ hoặc None nếu lớp mới) để hoàn tác"""
+        z = box.z
         for layer in self.layers:
             if abs(layer["z"] - z) < 1e-3:
-                found = True
+                previous_depth = layer["depth"]
                 layer["boxes"].append(box.id)
                 layer["depth"] = max(layer["depth"], box.depth)
-                break
-        if not found:
-            self.layers.append({
-                "z": z,
-                "depth": box.depth,
-                "boxes": [box.id]
-            })
-            self.layers.sort(key=lambda l: l["z"])
+                return layer, previous_depth
+        layer = {
+            "z": z,
+            "depth": box.depth,
+            "boxes": [box.id]
+        }
+        self.layers.append(layer)
+        self.layers.sort(key=lambda l: l["z"])
+        return layer, None
+    
+    def _revert_layers(self, layer_state: Tuple[Dict, Optional[float]]) -> None:
+        layer, previous_depth = layer_state
+        if previous_depth is None:
+            # Lớp được tạo bởi box này (so sánh theo đối tượng, không theo giá trị)
+            for i, other in enumerate(self.layers):
+                if other is layer:
+                    del self.layers[i]
+                    break
+        else:
+            layer["boxes"].pop()
+            layer["depth"] = previous_depth
     
     def get_utilization(self) -> float:
         return self.used_volume / self.volume if self.volume > 0 else 0
+
+    def free_volume(self) -> float:
+        """Thể tích còn trống, tính cả dung sai 1e-3 của phép kiểm tra biên (dùng để dừng sớm)"""
+        return (self.width + 1e-3) * (self.height + 1e-3) * (self.depth + 1e-3) - self.used_volume
     
     def get_layer_boxes(self, layer_index: int) -> List['Box']:
         if 0 <= layer_index < len(self.layers):
@@ -248,48 +376,27 @@ class Container:
         if abs(y) < 1e-3:
             return True
         
-        # Tính diện tích đáy của box
-        box_base_area = box.width * box.depth
-        
-        # Tính diện tích được hỗ trợ bởi các box khác
-        supported_area = 0
-        
-        # Tính tọa độ đáy của box
-        box_bottom_y = y
-        box_min_x, box_max_x = x, x + box.width
-        box_min_z, box_max_z = z, z + box.depth
-        
-        # Kiểm tra từng box đã đặt
-        for other in self.boxes:
-            other_top_y = other.position["y"] + other.height
-            
-            # Nếu box nằm ngay trên other (chênh lệch y nhỏ)
-            if abs(box_bottom_y - other_top_y) < 1e-3:
-                # Tính phần giao nhau theo x và z
-                overlap_min_x = max(box_min_x, other.position["x"])
-                overlap_max_x = min(box_max_x, other.position["x"] + other.width)
-                
-                overlap_min_z = max(box_min_z, other.position["z"])
-                overlap_max_z = min(box_max_z, other.position["z"] + other.depth)
-                
-                # Nếu có phần giao nhau
-                if overlap_min_x < overlap_max_x and overlap_min_z < overlap_max_z:
-                    overlap_area = (overlap_max_x - overlap_min_x) * (overlap_max_z - overlap_min_z)
-                    supported_area += overlap_area
+        # Footprint đang nằm trên mặt trên hiện tại: tra trực tiếp trên heightmap
+        if self.heightmap.resting_height(x, z, box.width, box.depth) <= y + 1e-3:
+            support_ratio = self.heightmap.support_ratio(x, z, box.width, box.depth, y)
+        else:
+            # Đã có box nằm cao hơn đáy (ví dụ khi kiểm tra lại box đã đặt): tính trên store
+            box_base_area = box.width * box.depth
+            supported_area = self.store.support_area(x, y, z, box.width, box.depth)
+            support_ratio = supported_area / box_base_area if box_base_area > 0 else 0
         
         # Box được coi là có hỗ trợ nếu tỷ lệ diện tích được hỗ trợ đạt ngưỡng
-        support_ratio = supported_area / box_base_area if box_base_area > 0 else 0
         return support_ratio >= support_threshold
     
     def check_stability(self, placed_boxes: List['Box']) -> bool:
         """Kiểm tra tính ổn định của toàn bộ cấu trúc đã đặt"""
         # Sắp xếp box theo chiều cao y tăng dần
-        sorted_boxes = sorted(placed_boxes, key=lambda b: b.position["y"])
+        sorted_boxes = sorted(placed_boxes, key=lambda b: b.y)
         
         # Kiểm tra từng box trừ những box nằm trên mặt đất
         for box in sorted_boxes:
-            if box.position["y"] > 1e-3:  # Box không nằm trên mặt đất
-                if not self.has_support(box, box.position["x"], box.position["y"], box.position["z"]):
+            if box.y > 1e-3:  # Box không nằm trên mặt đất
+                if not self.has_support(box, box.x, box.y, box.z):
                     return False
         
         return True
@@ -300,101 +407,108 @@ class EnhancedPackingAlgorithm:
         self.start_time = 0
         self.time_limit = 30
         self.support_threshold = 0.6  # Ngưỡng tỷ lệ diện tích hỗ trợ tối thiểu
+        self.max_workers: Optional[int] = None  # Số tiến trình chạy song song các chiến lược (None: theo số CPU)
+        self.parallel_min_units = 200  # Manifest nhỏ hơn ngưỡng này chạy tuần tự (chi phí tạo tiến trình lớn hơn)
+        self.target_utilization = 0.8  # Dừng sớm khi đạt tỷ lệ sử dụng này
+        # Lớp mới được đặt nguyên theo mẫu lớp có sẵn khi mẫu lấp đầy ít nhất tỷ lệ này (None: tắt)
+        self.layer_pattern_min_fill: Optional[float] = 0.9
+        self.pattern_cache: Optional[LayerPatternCache] = None  # None: cache mẫu lớp dùng chung (ghi file nếu đặt LAYER_PATTERN_CACHE)
+        # Báo cáo của lần chạy gần nhất
+        self.deadline_hit = False
+        self.checkpoints: List[Dict] = []
+        self.bounds: Optional[PackingBounds] = None
     
-    def pack(self, goods: List['Box'], container_dimensions: Dict, respect_groups: bool = True, time_limit: int = 30) -> Tuple[List['Box'], float]:
-        self.start_time = time.time()
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict, respect_groups: bool = True,
+             time_limit: float = 30, deadline: Optional[Deadline] = None) -> Tuple[List['Box'], float]:
+        """Đóng gói một lượt; khi hết hạn chót trả về các box đã đặt được (luôn hợp lệ)"""
+        if deadline is None:
+            deadline = Deadline(time_limit)
+        self.start_time = deadline.start
         self.time_limit = time_limit
-        container = Container(**container_dimensions)
-        sorted_goods = sorted(goods, key=lambda x: -x.volume)
+        table = as_sku_table(goods)
+        container = Container(**container_dimensions, cell_size=choose_cell_size(table, container_dimensions))
+        table = self._order_table(table, respect_groups)
+        placed_boxes = self._pack_with_extreme_points(table, container, deadline)
+        self.deadline_hit = deadline.hit
+        return placed_boxes, container.get_utilization()
+    
+    def _order_table(self, table: SkuTable, respect_groups: bool) -> SkuTable:
+        """Thứ tự xét SKU: thể tích giảm dần, hoặc theo nhóm (nhóm lớn trước) nếu respect_groups"""
+        table = table.sorted(key=lambda x: -x.volume)
         if respect_groups:
             groups = defaultdict(list)
-            for box in sorted_goods:
-                groups[box.label].append(box)
-            sorted_groups = sorted(groups.items(), key=lambda x: -sum(box.volume for box in x[1]))
-            sorted_goods = []
-            for _, group_boxes in sorted_groups:
-                group_boxes.sort(key=lambda x: -x.volume)
-                sorted_goods.extend(group_boxes)
-        placed_boxes = self._pack_with_extreme_points(sorted_goods, container)
-        return placed_boxes, container.get_utilization()
+            for sku in table:
+                groups[sku.label].append(sku)
+            sorted_groups = sorted(groups.items(), key=lambda x: -sum(sku.volume * sku.quantity for sku in x[1]))
+            ordered_skus = []
+            for _, group_skus in sorted_groups:
+                group_skus.sort(key=lambda x: -x.volume)
+                ordered_skus.extend(group_skus)
+            table = SkuTable(ordered_skus)
+        return table
     
-    def _find_lowest_y(self, box: 'Box', x: float, z: float, container: Container) -> float:
-        """Tìm y thấp nhất có thể đặt box tại (x, z) mà không bị treo lơ lửng"""
-        max_y = 0.0
-        for other in container.boxes:
-            # Kiểm tra nếu box nằm ngay trên other (theo x, z)
-            if (x + box.width > other.position["x"] and x < other.position["x"] + other.width and
-                z + box.depth > other.position["z"] and z < other.position["z"] + other.depth):
-                top_y = other.position["y"] + other.height
-                if top_y > max_y and top_y + box.height <= container.height + 1e-3:
-                    max_y = top_y
-        return max_y
-
-    def _find_lowest_z(self, box: 'Box', x: float, y: float, container: Container) -> float:
+    def _find_lowest_y(self, box: 'Box', x: float, z: float, container: Container,
+                       orientation: Optional[Orientation] = None) -> float:
+        """Tìm y thấp nhất có thể đặt box tại (x, z) mà không bị treo lơ lửng (tra heightmap)"""
+        width, _, depth = orientation[:3] if orientation else (box.width, box.height, box.depth)
+        return container.heightmap.resting_height(x, z, width, depth)
+
+    def _find_lowest_z(self, box: 'Box', x: float, y: float, container: Container,
+                       orientation: Optional[Orientation] = None) -> float:
         """Tìm z thấp nhất có thể đặt box tại (x, y) mà không bị treo lơ lửng"""
-        max_z = 0.0
-        for other in container.boxes:
-            # Kiểm tra nếu box nằm ngay trên other (theo x, y)
-            if (x + box.width > other.position["x"] and x < other.position["x"] + other.width and
-                y + box.height > other.position["y"] and y < other.position["y"] + other.height):
-                front_z = other.position["z"] + other.depth
-                if front_z > max_z and front_z + box.depth <= container.depth + 1e-3:
-                    max_z = front_z
-        return max_z
-    
-    def _pack_with_extreme_points(self, sorted_goods: List['Box'], container: Container) -> List['Box']:
+        width, height, depth = orientation[:3] if orientation else (box.width, box.height, box.depth)
+        limit = container.depth + 1e-3 - depth
+        return container.store.max_front_under(x, y, width, height, limit)
+    
+    def _pack_with_extreme_points(self, table: SkuTable, container: Container,
+                                  deadline: Optional[Deadline] = None, start_z: float = 0.0) -> List['Box']:
+        """Xếp theo hàng/lớp, mỗi vị trí chỉ duyệt các SKU còn hàng thay vì từng kiện.
+
+        start_z > 0 bắt đầu lớp đầu tiên phía sau phần đã xếp sẵn trong container.
+        """
         placed_boxes = []
-        remaining_goods = sorted_goods.copy()
-        z = 0.0
-        while z < container.depth - 1e-3 and remaining_goods:
+        skus = table.skus
+        dimensions = {"width": container.width, "height": container.height, "depth": container.depth}
+        # SKU không vừa container theo hướng nào thì không bao giờ có ứng viên: bỏ ngay từ đầu
+        prefilter(table, dimensions, Box.ROTATIONS)
+        # Box mẫu và bảng hướng xoay của mỗi SKU, tính một lần (Box thật chỉ tạo khi đặt)
+        prototypes = [Box("", sku.width, sku.height, sku.depth, sku.name, sku.label, sku.weight) for sku in skus]
+        sku_orientations = [prototype.orientation_table() for prototype in prototypes]
+        z = start_z
+        while z < container.depth - 1e-3 and table.remaining_units:
+            if deadline is not None and deadline.expired():
+                return placed_boxes  # Kiểm tra cả giữa các lớp đặt theo mẫu (không qua vòng lặp từng ô)
+            # Lớp mới (luôn trống) của SKU đủ hàng cho cả lớp: đặt theo mẫu lớp có sẵn thay vì tìm từng ô
+            pattern_depth = self._place_pattern_layer(table, container, z, placed_boxes)
+            if pattern_depth:
+                z += pattern_depth
+                continue
             max_layer_depth = 0.0
+            layer_start = len(placed_boxes)
             y = 0.0
-            while y < container.height - 1e-3 and remaining_goods:
+            while y < container.height - 1e-3 and table.remaining_units:
                 row_boxes = []
-                used_indices = set()
                 x = 0.0
                 max_row_height = 0.0
                 min_x_gap = float('inf')
-                while x < container.width - 1e-3 and remaining_goods:
-                    best_box = None
-                    best_orientation = None
-                    best_idx = -1
+                while x < container.width - 1e-3 and table.remaining_units:
+                    if deadline is not None and deadline.expired():
+                        return placed_boxes  # Hết giờ: các box đã đặt vẫn là một phương án hợp lệ
+                    best = None
                     min_x_gap = float('inf')
-                    best_y = None
-                    best_z = None
-                    # Tìm box phù hợp nhất để đặt tại vị trí (x, y, z)
-                    for idx, box in enumerate(remaining_goods):
-                        for orientation in box.get_orientations():
-                            w, h, d = orientation["width"], orientation["height"], orientation["depth"]
-                            # Tìm y thấp nhất có thể đặt box tại (x, z)
-                            y_pos = self._find_lowest_y(box, x, z, container)
-                            # Tìm z thấp nhất có thể đặt box tại (x, y)
-                            z_pos = self._find_lowest_z(box, x, y_pos, container)
-                            if x + w <= container.width + 1e-3 and y_pos + h <= container.height + 1e-3 and z_pos + d <= container.depth + 1e-3:
-                                # Kiểm tra va chạm với các box đã đặt trong hàng này
-                                collision = False
-                                for b in row_boxes:
-                                    if not (x + w <= b.position["x"] or x >= b.position["x"] + b.width or
-                                            y_pos + h <= b.position["y"] or y_pos >= b.position["y"] + b.height or
-                                            z_pos + d <= b.position["z"] or z_pos >= b.position["z"] + b.depth):
-                                        collision = True
-                                        break
-                                if not collision:
-                                    x_gap = abs(container.width - (x + w))
-                                    if x_gap < min_x_gap:
-                                        min_x_gap = x_gap
-                                        best_box = box
-                                        best_orientation = orientation
-                                        best_idx = idx
-                                        best_y = y_pos
-                                        best_z = z_pos
-                    if best_box is not None:
-                        # Đặt box vào vị trí (x, best_y, best_z) với orientation tốt nhất
-                        best_box.width = best_orientation["width"]
-                        best_box.height = best_orientation["height"]
-                        best_box.depth = best_orientation["depth"]
-                        best_box.orientation = best_orientation["orientation"]
-                        best_box.position = {"x": x, "y": best_y, "z": best_z}
+                    # Tìm loại hàng phù hợp nhất để đặt tại vị trí (x, y, z)
+                    for idx, orientation, y_pos, z_pos in self._slot_candidates(
+                            prototypes, sku_orientations, table.remaining, x, z, container):
+                        x_gap = abs(container.width - (x + orientation[0]))
+                        if x_gap < min_x_gap:
+                            min_x_gap = x_gap
+                            best = (idx, orientation, y_pos, z_pos)
+                    if best is not None:
+                        best_idx, best_orientation, best_y, best_z = best
+                        # Lấy đơn vị kế tiếp của SKU và đặt tại (x, best_y, best_z) với orientation tốt nhất
+                        best_box = table.take(best_idx, Box)
+                        best_box.width, best_box.height, best_box.depth, best_box.orientation = best_orientation
+                        best_box.pos = (x, best_y, best_z)
                         best_box.placed = True
                         row_boxes.append(best_box)
                         placed_boxes.append(best_box)
@@ -402,23 +516,72 @@ class EnhancedPackingAlgorithm:
                         max_row_height = max(max_row_height, best_box.height + (best_y - y))
                         max_layer_depth = max(max_layer_depth, best_box.depth + (best_z - z))
                         x += best_box.width
-                        used_indices.add(best_idx)
+                        if residual_exhausted(container.free_volume(), skus, table.remaining):
+                            return placed_boxes  # Phần trống còn lại không chứa nổi kiện nào
                     else:
                         # Không còn box nào phù hợp để lấp đầy x, kết thúc hàng này
                         break
-                # Xóa các box đã dùng khỏi remaining_goods
-                for idx in sorted(used_indices, reverse=True):
-                    del remaining_goods[idx]
-                if max_row_height < 1e-3:
+                if not row_boxes:
                     # Không đặt được box nào ở hàng này, dừng lấp y
                     break
+                # Hàng kế tiếp bắt đầu ở mặt trên cao nhất của hàng này; box lấp khe thấp hơn y chỉ tính phần nhô lên trên y
                 y += max_row_height
-            if max_layer_depth < 1e-3:
+            if len(placed_boxes) == layer_start:
                 # Không đặt được box nào ở lớp này, dừng lấp z
                 break
             z += max_layer_depth
         return placed_boxes
     
+    def _place_pattern_layer(self, table: SkuTable, container: Container, z: float,
+                             placed_boxes: List['Box']) -> float:
+        """Đặt cả lớp tại z theo mẫu lớp của SKU kế tiếp; trả về chiều sâu lớp (0 nếu không dùng mẫu)"""
+        if self.layer_pattern_min_fill is None:
+            return 0.0
+        idx = next((i for i, left in enumerate(table.remaining) if left), None)
+        if idx is None:
+            return 0.0
+        sku = table.skus[idx]
+        best = None
+        for depth in sorted({d for _, _, d, _ in orientation_table(sku.width, sku.height, sku.depth, Box.ROTATIONS)}):
+            if z + depth > container.depth + 1e-3:
+                continue
+            pattern = layer_pattern(container.width, container.height, sku.width, sku.height, sku.depth,
+                                    Box.ROTATIONS, depth, self.pattern_cache)
+            if not pattern or len(pattern) > table.remaining[idx]:
+                continue
+            fill = len(pattern) * sku.volume / (container.width * container.height * depth)
+            if fill >= self.layer_pattern_min_fill and (best is None or fill > best[0]):
+                best = (fill, depth, pattern)
+        if best is None:
+            return 0.0
+        _, depth, pattern = best
+        for x, y, w, h, d, index in pattern:
+            box = table.take(idx, Box)
+            box.width, box.height, box.depth, box.orientation = w, h, d, index
+            box.pos = (x, y, z)
+            box.placed = True
+            placed_boxes.append(box)
+            container.place_box(box, x, y, z)
+        return depth
+
+    def _slot_candidates(self, prototypes: List['Box'], sku_orientations: List[Tuple[Orientation, ...]],
+                         remaining: Sequence[int], x: float, z: float,
+                         container: Container) -> Iterator[Tuple[int, Orientation, float, float]]:
+        """Các (SKU, hướng xoay, y, z) đặt được tại ô x của hàng/lớp hiện tại, theo thứ tự SKU"""
+        for idx, prototype in enumerate(prototypes):
+            if not remaining[idx]:
+                continue  # SKU đã hết hàng
+            for orientation in sku_orientations[idx]:
+                w, h, d, _ = orientation
+                # Tìm y thấp nhất có thể đặt box tại (x, z)
+                y_pos = self._find_lowest_y(prototype, x, z, container, orientation)
+                # Tìm z thấp nhất có thể đặt box tại (x, y)
+                z_pos = self._find_lowest_z(prototype, x, y_pos, container, orientation)
+                if x + w <= container.width + 1e-3 and y_pos + h <= container.height + 1e-3 and z_pos + d <= container.depth + 1e-3:
+                    # Kiểm tra va chạm với mọi box đã đặt (lưới chiếm chỗ + store)
+                    if not container.spatial_index.overlaps(x, y_pos, z_pos, w, h, d):
+                        yield idx, orientation, y_pos, z_pos
+    
     def _calculate_position_score(self, box: 'Box', x: float, y: float, z: float, container: Container) -> float:
         """Tính điểm cho vị trí đặt box"""
         score = 0
@@ -440,18 +603,18 @@ class EnhancedPackingAlgorithm:
             score += 400  # Điểm thưởng lớn cho góc container
         # Ưu tiên đặt sát với box khác
         for other_box in container.boxes:
-            if (abs(x - (other_box.position['x'] + other_box.width)) < 1e-3 or
-                abs(other_box.position['x'] - (x + box.width)) < 1e-3 or
-                abs(z - (other_box.position['z'] + other_box.depth)) < 1e-3 or
-                abs(other_box.position['z'] - (z + box.depth)) < 1e-3 or
-                abs(y - (other_box.position['y'] + other_box.height)) < 1e-3 or
-                abs(other_box.position['y'] - (y + box.height)) < 1e-3):
+            if (abs(x - (other_box.x + other_box.width)) < 1e-3 or
+                abs(other_box.x - (x + box.width)) < 1e-3 or
+                abs(z - (other_box.z + other_box.depth)) < 1e-3 or
+                abs(other_box.z - (z + box.depth)) < 1e-3 or
+                abs(y - (other_box.y + other_box.height)) < 1e-3 or
+                abs(other_box.y - (y + box.height)) < 1e-3):
                 score += 80  # Tăng điểm cho việc đặt sát với box khác
             # Ưu tiên đặt box cùng nhóm gần nhau
             if box.label == other_box.label:
-                distance = ((x - other_box.position['x'])**2 + 
-                           (y - other_box.position['y'])**2 + 
-                           (z - other_box.position['z'])**2)**0.5
+                distance = ((x - other_box.x)**2 + 
+                           (y - other_box.y)**2 + 
+                           (z - other_box.z)**2)**0.5
                 if distance < box.width + box.depth:
                     score += 50
         # Ưu tiên đặt trên cùng một lớp (theo z)
@@ -462,21 +625,11 @@ class EnhancedPackingAlgorithm:
                 if any(b.label == box.label for b in layer_boxes):
                     score += 70
                 break
-        # Ưu tiên cao: đặt box trên một box khác (có đế chịu lực)
-        support_ratio = 0
+        # Ưu tiên cao: đặt box trên một box khác (có đế chịu lực), tra trên heightmap
         box_base_area = box.width * box.depth
         supported_area = 0
-        for other_box in container.boxes:
-            if abs(y - (other_box.position['y'] + other_box.height)) < 1e-3:
-                # Tính phần giao nhau theo x và z
-                overlap_min_x = max(x, other_box.position["x"])
-                overlap_max_x = min(x + box.width, other_box.position["x"] + other_box.width)
-                overlap_min_z = max(z, other_box.position["z"])
-                overlap_max_z = min(z + box.depth, other_box.position["z"] + other_box.depth)
-                # Nếu có phần giao nhau
-                if overlap_min_x < overlap_max_x and overlap_min_z < overlap_max_z:
-                    overlap_area = (overlap_max_x - overlap_min_x) * (overlap_max_z - overlap_min_z)
-                    supported_area += overlap_area
+        if abs(y) >= 1e-3:
+            supported_area = container.heightmap.support_area(x, z, box.width, box.depth, y)
         support_ratio = supported_area / box_base_area if box_base_area > 0 else 0
         # Điểm cho tỷ lệ hỗ trợ
         if support_ratio >= self.support_threshold:
@@ -501,88 +654,305 @@ class EnhancedPackingAlgorithm:
             score += 250  # Tăng điểm cho vị trí sát phía trong container
         # Ưu tiên đặt sát bên cạnh box cùng lớp (x hoặc y liền kề, cùng z)
         for other_box in container.boxes:
-            if abs(z - other_box.position['z']) < 1e-3:
-                if abs(x - (other_box.position['x'] + other_box.width)) < 1e-3 or abs(y - (other_box.position['y'] + other_box.height)) < 1e-3:
+            if abs(z - other_box.z) < 1e-3:
+                if abs(x - (other_box.x + other_box.width)) < 1e-3 or abs(y - (other_box.y + other_box.height)) < 1e-3:
                     score += 200  # Tăng điểm cho việc đặt sát bên cạnh box cùng lớp
         return score
     
-    def optimize_packing(self, goods: List['Box'], container_dimensions: Dict, respect_groups: bool = True, time_limit: int = 30) -> Tuple[List['Box'], float]:
+    def _calculate_position_scores(self, prototypes: List['Box'],
+                                   candidates: Sequence[Tuple[int, Orientation, float, float, float]],
+                                   container: Container) -> np.ndarray:
+        """Phiên bản theo lô của ``_calculate_position_score``.
+
+        candidates: các (chỉ số box mẫu, hướng xoay, x, y, z). Các vòng lặp trên
+        box đã đặt được thay bằng phép so sánh ma trận ứng viên × box trên store
+        dạng cột, nhóm của lớp chỉ tính một lần cho mỗi lớp. Kết quả khớp bản vô
+        hướng (chỉ có thể lệch ở sai số làm tròn do thứ tự cộng).
+        """
+        k = len(candidates)
+        if k == 0:
+            return np.zeros(0, dtype=np.float64)
+        rows = np.array([(x, y, z, o[0], o[1], o[2]) for _, o, x, y, z in candidates], dtype=np.float64)
+        x, y, z, w, h, d = (rows[:, i] for i in range(6))
+        labels = np.array([container.label_code(prototypes[i].label) for i, *_ in candidates], dtype=np.int32)
+        volumes = np.array([prototypes[i].volume for i, *_ in candidates], dtype=np.float64)
+        eps = 1e-3
+        container_volume = container.width * container.height * container.depth
+
+        # Các điểm nguyên (tường, góc, box kề, cùng nhóm, cùng lớp) cộng chính xác trên số nguyên
+        is_z0 = np.abs(z) < eps
+        is_x_wall = (np.abs(x) < eps) | (np.abs(x + w - container.width) < eps)
+        is_y0 = np.abs(y) < eps
+        is_zw = np.abs(z + d - container.depth) < eps
+        points = (300 * is_z0 + 150 * is_x_wall + 150 * (is_y0 | is_zw) +
+                  400 * (is_x_wall & is_y0 & (is_z0 | is_zw))).astype(np.int64)
+        same_layer = np.zeros(k, dtype=np.int64)
+        data = container.store.columns()
+        n = data.shape[1]
+        if n:
+            ox, oy, oz = data[ColumnarBoxStore.X], data[ColumnarBoxStore.Y], data[ColumnarBoxStore.Z]
+            ox2, oy2, oz2 = data[ColumnarBoxStore.X2], data[ColumnarBoxStore.Y2], data[ColumnarBoxStore.Z2]
+            other_labels = container.labels
+            step = max(1, ColumnarBoxStore.CHUNK_ELEMENTS // n)
+            for begin in range(0, k, step):
+                part = slice(begin, begin + step)
+                cx, cy, cz = x[part, None], y[part, None], z[part, None]
+                cw, ch, cd = w[part, None], h[part, None], d[part, None]
+                touch_x = np.abs(cx - ox2) < eps
+                touch_y = np.abs(cy - oy2) < eps
+                adjacent = (touch_x | (np.abs(ox - (cx + cw)) < eps) |
+                            (np.abs(cz - oz2) < eps) | (np.abs(oz - (cz + cd)) < eps) |
+                            touch_y | (np.abs(oy - (cy + ch)) < eps))
+                distance = np.sqrt((cx - ox) ** 2 + (cy - oy) ** 2 + (cz - oz) ** 2)
+                near_group = (other_labels == labels[part, None]) & (distance < cw + cd)
+                points[part] += 80 * adjacent.sum(axis=1) + 50 * near_group.sum(axis=1)
+                same_layer[part] = ((np.abs(cz - oz) < eps) & (touch_x | touch_y)).sum(axis=1)
+        if container.layers:
+            layer_z = np.array([layer["z"] for layer in container.layers])
+            match = np.abs(z[:, None] - layer_z) < eps
+            has_layer = match.any(axis=1)
+            first_layer = match.argmax(axis=1)
+            layer_labels: Dict[int, Set[int]] = {}
+            for i in np.flatnonzero(has_layer).tolist():
+                index = int(first_layer[i])
+                if index not in layer_labels:
+                    layer_labels[index] = {container.label_code(b.label) for b in container.get_layer_boxes(index)}
+                points[i] += 100 + (70 if int(labels[i]) in layer_labels[index] else 0)
+
+        # Các điểm thực theo đúng thứ tự cộng của bản vô hướng
+        scores = points.astype(np.float64)
+        for i in range(k):
+            base_area = w[i] * d[i]
+            supported_area = 0
+            if abs(y[i]) >= eps:
+                supported_area = container.heightmap.support_area(x[i], z[i], w[i], d[i], y[i])
+            support_ratio = supported_area / base_area if base_area > 0 else 0
+            if support_ratio >= self.support_threshold:
+                scores[i] += 250 + (support_ratio - self.support_threshold) * 200
+            elif y[i] > eps:
+                scores[i] -= 800
+        empty_space_behind = np.where(z + d < container.depth, (container.depth - (z + d)) * w * h, 0.0)
+        scores -= np.where(empty_space_behind > 0, empty_space_behind / container_volume * 100, 0.0)
+        scores += volumes / container_volume * 500
+        scores += 250 * is_z0
+        scores += 200 * same_layer
+        return scores
+    
+    def _build_strategies(self, goods: SkuTable, respect_groups: bool) -> List[Tuple[str, SkuTable, bool]]:
+        """Danh sách chiến lược (mô tả, bảng SKU đã sắp xếp, respect_groups)"""
+        strategies = [
+            ("Chiến lược 1: Sắp xếp theo thể tích giảm dần", goods, respect_groups),
+            ("Chiến lược 2: Sắp xếp theo kích thước lớn nhất giảm dần",
+             goods.sorted(key=lambda x: -max(x.width, x.height, x.depth)), respect_groups),
+            ("Chiến lược 3: Sắp xếp theo footprint giảm dần",
+             goods.sorted(key=lambda x: -(x.width * x.depth)), respect_groups),
+            ("Chiến lược 4: Sắp xếp theo chiều cao giảm dần",
+             goods.sorted(key=lambda x: -x.height), respect_groups),
+        ]
+        # Chiến lược 5: sắp xếp theo nhóm trước, sau đó theo thể tích trong mỗi nhóm
+        sorted_by_label = sorted(goods, key=lambda x: x.label)
+        grouped_skus = []
+        for _, group in groupby(sorted_by_label, key=lambda x: x.label):
+            grouped_skus.extend(sorted(list(group), key=lambda x: -x.volume))
+        strategies.append(("Chiến lược 5: Kết hợp sắp xếp theo thể tích và nhóm", SkuTable(grouped_skus), True))
+        return strategies
+
+    def _run_strategies(self, strategies: List[Tuple[str, SkuTable, bool]], container_dimensions: Dict,
+                        deadline: Deadline) -> Iterator[Tuple[int, Tuple[List['Box'], float]]]:
+        """Chạy các chiến lược, trả về (chỉ số, kết quả) theo thứ tự hoàn thành.
+
+        Song song trên process pool dùng chung (xem ``_strategy_executor``) nếu có
+        nhiều worker: mỗi tiến trình nhận bản sao riêng của bảng SKU và tạo Box mới
+        nên các chiến lược không ảnh hưởng nhau. Người gọi có thể dừng vòng lặp bất
+        cứ lúc nào (đạt mục tiêu, hết giờ, job bị huỷ): chiến lược chưa chạy bị hủy,
+        chiến lược đang chạy nhận event huỷ và dừng ở điểm kiểm tra hạn chót kế tiếp.
+        """
+        total_units = strategies[0][1].total_units if strategies else 0
+        workers = min(len(strategies), self.max_workers or os.cpu_count() or 1)
+        done = set()
+        if workers > 1 and total_units >= self.parallel_min_units:
+            try:
+                executor, manager = _strategy_executor(workers)
+                cancel_event = manager.Event()
+            except (OSError, NotImplementedError, EOFError) as e:
+                logger.info(f"Không chạy song song được ({e}), chuyển sang chạy tuần tự")
+            else:
+                futures: Dict[Future, int] = {}
+                try:
+                    for index, (_, table, groups) in enumerate(strategies):
+                        futures[executor.submit(_run_strategy, table, container_dimensions, groups,
+                                                self.support_threshold, deadline, cancel_event)] = index
+                    for description, _, _ in strategies:
+                        progress.emit("phase_started", phase=description)
+                    # Worker tự dừng tại hạn chót và trả về phương án dở dang; chờ thêm một chút để nhận kết quả đó
+                    wait_until = None if deadline.end is None else deadline.end + 1.0
+                    pending = set(futures)
+                    while pending:
+                        finished, pending = wait(pending, timeout=CANCEL_CHECK_INTERVAL * 2,
+                                                 return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            result, utilization, hit = future.result()
+                            deadline.hit = deadline.hit or hit
+                            done.add(futures[future])
+                            yield futures[future], (result, utilization)
+                        if pending and (cancelled() or (wait_until is not None and time.time() >= wait_until)):
+                            deadline.hit = True
+                            return
+                    return
+                except BrokenProcessPool as e:
+                    logger.warning(f"Process pool bị lỗi ({e}), chạy tuần tự các chiến lược còn lại")
+                    _shutdown_strategy_pool()
+                finally:
+                    # Pool được dùng lại: hủy các chiến lược chưa chạy, báo các chiến lược đang chạy dừng lại
+                    for future in futures:
+                        future.cancel()
+                    try:
+                        cancel_event.set()
+                    except (OSError, EOFError):
+                        pass
+        for index, (_, table, groups) in enumerate(strategies):
+            if index in done:
+                continue
+            if deadline.expired():
+                return
+            progress.emit("phase_started", phase=strategies[index][0])
+            yield index, self.pack(table, container_dimensions, groups, deadline=deadline)
+
+    def _is_valid_plan(self, placed_boxes: List['Box'], container_dimensions: Dict) -> bool:
+        """Kết quả hợp lệ khi mọi box nằm trong container và không giao nhau"""
+        container = Container(**container_dimensions, cell_size=choose_cell_size(placed_boxes, container_dimensions))
+        for box in placed_boxes:
+            x, y, z = box.pos
+            if (x < -1e-3 or y < -1e-3 or z < -1e-3 or
+                    x + box.width > container.width + 1e-3 or
+                    y + box.height > container.height + 1e-3 or
+                    z + box.depth > container.depth + 1e-3):
+                return False
+            if container.spatial_index.overlaps(x, y, z, box.width, box.height, box.depth):
+                return False
+            container.place_box(box, x, y, z)
+        return True
+
+    def optimize_packing(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict, respect_groups: bool = True,
+                         time_limit: Optional[float] = 30,
+                         target_utilization: Optional[float] = None) -> Tuple[List['Box'], float]:
+        """Chạy danh mục chiến lược trong giới hạn time_limit (anytime).
+
+        Trả về phương án hợp lệ tốt nhất tìm được trước hạn chót, dừng sớm khi đạt
+        target_utilization. Sau khi chạy, ``deadline_hit`` và ``checkpoints`` mô tả
+        quá trình tìm kiếm.
+        """
+        # Các chiến lược chạy trên bảng SKU; mỗi lần pack tạo Box mới nên kết quả không ảnh hưởng nhau
+        goods = as_sku_table(goods)
+        deadline = Deadline(time_limit)
+        if target_utilization is None:
+            target_utilization = self.target_utilization
         best_result = None
         best_utilization = 0
-        target_utilization = 0.8  # Mục tiêu tỷ lệ sử dụng > 80%
-        
-        print("Chiến lược 1: Sắp xếp theo thể tích giảm dần")
-        result1, util1 = self.pack(goods, container_dimensions, respect_groups, time_limit)
-        if util1 > best_utilization:
-            best_utilization = util1
-            best_result = result1
-            
-        print("Chiến lược 2: Sắp xếp theo kích thước lớn nhất giảm dần")
-        sorted_goods = sorted(goods, key=lambda x: -max(x.width, x.height, x.depth))
-        result2, util2 = self.pack(sorted_goods, container_dimensions, respect_groups, time_limit)
-        if util2 > best_utilization:
-            best_utilization = util2
-            best_result = result2
-            
-        print("Chiến lược 3: Sắp xếp theo footprint giảm dần")
-        sorted_goods = sorted(goods, key=lambda x: -(x.width * x.depth))
-        result3, util3 = self.pack(sorted_goods, container_dimensions, respect_groups, time_limit)
-        if util3 > best_utilization:
-            best_utilization = util3
-            best_result = result3
-            
-        print("Chiến lược 4: Sắp xếp theo chiều cao giảm dần")
-        sorted_goods = sorted(goods, key=lambda x: -x.height)
-        result4, util4 = self.pack(sorted_goods, container_dimensions, respect_groups, time_limit)
-        if util4 > best_utilization:
-            best_utilization = util4
-            best_result = result4
+        self.bounds = compute_bounds(goods, container_dimensions, Box.ROTATIONS)
         
-        # Nếu tỷ lệ sử dụng chưa đạt mục tiêu, thử thêm các chiến lược khác
-        if best_utilization < target_utilization:
-            print(f"Tỷ lệ sử dụng {best_utilization:.2%} chưa đạt mục tiêu {target_utilization:.2%}, thử chiến lược bổ sung")
-            
-            # Chiến lược 5: Kết hợp sắp xếp theo thể tích và nhóm
-            print("Chiến lược 5: Kết hợp sắp xếp theo thể tích và nhóm")
-            # Sắp xếp theo nhóm trước, sau đó theo thể tích trong mỗi nhóm
-            sorted_by_label = sorted(goods, key=lambda x: x.label)
-            grouped_goods = []
-            
-            for _, group in groupby(sorted_by_label, key=lambda x: x.label):
-                # Sắp xếp theo thể tích giảm dần trong mỗi nhóm
-                sorted_group = sorted(list(group), key=lambda x: -x.volume)
-                grouped_goods.extend(sorted_group)
-                
-            result5, util5 = self.pack(grouped_goods, container_dimensions, respect_groups=True, time_limit=time_limit)
-            if util5 > best_utilization:
-                best_utilization = util5
-                best_result = result5
-            
-            # Chiến lược 6: Tăng thời gian tìm kiếm nếu vẫn chưa đạt mục tiêu
-            if best_utilization < target_utilization and time_limit < 120:
-                extended_time = min(120, time_limit * 2)  # Tối đa 120 giây
-                print(f"Chiến lược 6: Tăng thời gian tìm kiếm lên {extended_time}s")
-                result6, util6 = self.pack(goods, container_dimensions, respect_groups, extended_time)
-                if util6 > best_utilization:
-                    best_utilization = util6
-                    best_result = result6
+        strategies = self._build_strategies(goods, respect_groups)
+        best_index = len(strategies)
+        for index, (result, utilization) in self._run_strategies(strategies, container_dimensions, deadline):
+            description = strategies[index][0]
+            logger.debug(f"{description}: {utilization:.2%}")
+            # Bằng nhau thì giữ chiến lược đứng trước để kết quả không phụ thuộc thứ tự hoàn thành
+            better = utilization > best_utilization or (utilization == best_utilization and index < best_index)
+            if better and self._is_valid_plan(result, container_dimensions):
+                best_utilization = utilization
+                best_result = result
+                best_index = index
+                progress.plan(best_result, best_utilization, phase=description)
+            deadline.checkpoint(description, utilization, best_utilization)
+            if best_utilization >= target_utilization:
+                logger.info(f"Đạt mục tiêu {target_utilization:.2%}, dừng sớm")
+                break
+            if best_utilization >= self.bounds.utilization_bound - 1e-9:
+                logger.info(f"Đạt cận trên {self.bounds.utilization_bound:.2%}, không thể tốt hơn, dừng sớm")
+                break
+        if best_result is None:
+            best_result = []
         
         # Kiểm tra tính ổn định của kết quả tốt nhất
-        container = Container(**container_dimensions)
+        container = Container(**container_dimensions, cell_size=choose_cell_size(goods, container_dimensions))
         for box in best_result:
-            container.place_box(box, box.position["x"], box.position["y"], box.position["z"])
+            container.place_box(box, box.x, box.y, box.z)
         
-        if not container.check_stability(best_result):
-            print("Cảnh báo: Kết quả tốt nhất có box không ổn định, thử lại với ngưỡng hỗ trợ cao hơn")
+        if not container.check_stability(best_result) and not deadline.expired():
+            logger.info("Kết quả tốt nhất có box không ổn định, thử lại với ngưỡng hỗ trợ cao hơn")
             # Tăng ngưỡng hỗ trợ và thử lại
             self.support_threshold = 0.8
-            result_stable, util_stable = self.pack(goods, container_dimensions, respect_groups, time_limit)
+            result_stable, util_stable = self.pack(goods, container_dimensions, respect_groups, deadline=deadline)
             if container.check_stability(result_stable):
-                print("Đã tìm được kết quả ổn định với ngưỡng hỗ trợ cao hơn")
+                logger.info("Đã tìm được kết quả ổn định với ngưỡng hỗ trợ cao hơn")
                 best_result = result_stable
                 best_utilization = util_stable
-                
-        print(f"Kết quả tối ưu: Tỷ lệ sử dụng {best_utilization:.2%}" + 
-              (", ĐẠT MỤC TIÊU ✓" if best_utilization >= target_utilization else ", CHƯA ĐẠT MỤC TIÊU ✗"))
+                progress.plan(best_result, best_utilization, phase="Kiểm tra ổn định")
+            deadline.checkpoint("Kiểm tra ổn định", util_stable, best_utilization)
         
-        return best_result, best_utilization 
\ No newline at end of file
+        if deadline.hit:
+            logger.info(f"Hết thời gian ({time_limit}s), trả về phương án tốt nhất hiện có")
+        self.deadline_hit = deadline.hit
+        self.checkpoints = deadline.checkpoints
+
+        logger.info(f"Kết quả tối ưu: Tỷ lệ sử dụng {best_utilization:.2%}" +
+                    (", ĐẠT MỤC TIÊU ✓" if best_utilization >= target_utilization else ", CHƯA ĐẠT MỤC TIÊU ✗"))
+        logger.debug(f"Cận trên {self.bounds.utilization_bound:.2%}, khoảng cách tới tối ưu "
+                     f"≤ {self.bounds.gap(best_utilization):.2%}")
+        flush_cache(self.pattern_cache)
+        
+        return best_result, best_utilization
+
+
+# Process pool chạy chiến lược của tiến trình hiện tại, dùng lại giữa các lần optimize_packing (tạo tiến
+# trình con tốn hơn cả một lượt chiến lược nhỏ), kèm manager tạo event huỷ gửi được sang pool:
+# (pid, số worker, pool, manager)
+_strategy_pool: Optional[Tuple[int, int, ProcessPoolExecutor, SyncManager]] = None
+
+
+def _strategy_executor(workers: int) -> Tuple[ProcessPoolExecutor, SyncManager]:
+    """Pool dùng chung cho các lần chạy chiến lược; tạo lại khi đổi số worker.
+
+    Pool kế thừa qua fork (vd. trong worker của JobManager) thuộc về tiến trình cha nên không được dùng lại.
+    """
+    global _strategy_pool
+    if _strategy_pool is not None:
+        pid, size, executor, manager = _strategy_pool
+        if pid == os.getpid() and size == workers:
+            return executor, manager
+        _shutdown_strategy_pool()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        manager = multiprocessing.Manager()
+    except BaseException:
+        executor.shutdown(wait=False)
+        raise
+    _strategy_pool = (os.getpid(), workers, executor, manager)
+    return executor, manager
+
+
+def _shutdown_strategy_pool() -> None:
+    global _strategy_pool
+    if _strategy_pool is not None and _strategy_pool[0] == os.getpid():
+        _, _, executor, manager = _strategy_pool
+        executor.shutdown(wait=False, cancel_futures=True)
+        manager.shutdown()
+    _strategy_pool = None
+
+
+def _run_strategy(goods: SkuTable, container_dimensions: Dict, respect_groups: bool,
+                  support_threshold: float, deadline: Deadline,
+                  cancel_event: Any = None) -> Tuple[List[Box], float, bool]:
+    """Chạy một chiến lược trong tiến trình con (hàm cấp module để pickle được).
+
+    Trả về thêm ``deadline.hit`` của tiến trình con, vì deadline chỉ là bản sao của hạn chót của người gọi.
+    """
+    algorithm = EnhancedPackingAlgorithm()
+    algorithm.support_threshold = support_threshold
+    set_cancel_token(cancel_event)
+    try:
+        result, utilization = algorithm.pack(goods, container_dimensions, respect_groups, deadline=deadline)
+        return result, utilization, deadline.hit
+    finally:
+        set_cancel_token(None)  # Worker được dùng lại cho lần chạy sau
+        flush_cache()  # Mẫu lớp mới của tiến trình con
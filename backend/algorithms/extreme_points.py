@@ -0,0 +1,117 @@
+import numpy as np  # type: ignore
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class ExtremePointSet:
+    """Tập extreme point khử trùng lặp theo tọa độ lượng tử hóa.
+
+    Mỗi điểm được băm theo (x, y, z) đã làm tròn về bội số của ``quantum`` nên
+    các điểm trùng nhau chỉ được lưu một lần. Khi đặt box mới, chỉ các điểm
+    nằm trong box đó bị loại bỏ (tăng dần, không dựng lại toàn bộ danh sách).
+    ``add_many``/``prune_inside`` có thể ghi lại các thay đổi để ``restore``
+    hoàn tác đúng cả tập điểm lẫn thứ tự duyệt.
+    """
+
+    def __init__(self, quantum: float = 1e-3):
+        self.quantum = quantum
+        self._points: Dict[Tuple[int, int, int], Dict[str, float]] = {}
+        # Thứ tự thêm của từng điểm, để khôi phục đúng thứ tự duyệt khi hoàn tác
+        self._order: Dict[Tuple[int, int, int], int] = {}
+        self._counter = 0
+        # Bộ đếm để theo dõi kích thước và hiệu quả khử trùng lặp
+        self.generated = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.pruned = 0
+
+    def _key(self, x: float, y: float, z: float) -> Tuple[int, int, int]:
+        return (int(round(x / self.quantum)), int(round(y / self.quantum)), int(round(z / self.quantum)))
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        return iter(self._points.values())
+
+    def __contains__(self, point: Dict[str, float]) -> bool:
+        return self._key(point["x"], point["y"], point["z"]) in self._points
+
+    def points(self) -> List[Dict[str, float]]:
+        return list(self._points.values())
+
+    def add(self, x: float, y: float, z: float) -> bool:
+        """Thêm một điểm; trả về False nếu điểm đã tồn tại"""
+        self.generated += 1
+        key = self._key(x, y, z)
+        if key in self._points:
+            self.duplicates += 1
+            return False
+        self._points[key] = {"x": x, "y": y, "z": z}
+        self._order[key] = self._counter
+        self._counter += 1
+        return True
+
+    def add_many(self, points: np.ndarray, valid: np.ndarray,
+                 added_keys: Optional[List[Tuple[int, int, int]]] = None) -> int:
+        """Thêm các điểm (k, 3) có valid[i] = True; trả về số điểm mới thực sự được thêm.
+
+        added_keys: nếu có, nhận key của các điểm mới (để hoàn tác).
+        """
+        added = 0
+        self.rejected += int(len(points) - np.count_nonzero(valid))
+        for x, y, z in points[valid].tolist():
+            if self.add(x, y, z):
+                added += 1
+                if added_keys is not None:
+                    added_keys.append(self._key(x, y, z))
+        return added
+
+    def prune_inside(self, x: float, y: float, z: float, w: float, h: float, d: float,
+                     removed: Optional[List[tuple]] = None) -> int:
+        """Loại các điểm nằm trong (nửa mở) hộp vừa đặt; trả về số điểm bị loại.
+
+        removed: nếu có, nhận (key, điểm, thứ tự) của các điểm bị loại (để hoàn tác).
+        """
+        if not self._points:
+            return 0
+        keys = list(self._points.keys())
+        coords = np.array([[p["x"], p["y"], p["z"]] for p in self._points.values()])
+        inside = ((x <= coords[:, 0]) & (coords[:, 0] < x + w) &
+                  (y <= coords[:, 1]) & (coords[:, 1] < y + h) &
+                  (z <= coords[:, 2]) & (coords[:, 2] < z + d))
+        count = 0
+        for i in np.flatnonzero(inside):
+            key = keys[i]
+            point = self._points.pop(key)
+            order = self._order.pop(key)
+            if removed is not None:
+                removed.append((key, point, order))
+            count += 1
+        self.pruned += count
+        return count
+
+    def restore(self, added_keys: List[Tuple[int, int, int]], removed: List[tuple]) -> None:
+        """Hoàn tác một lần cập nhật: bỏ các điểm đã thêm, trả lại các điểm đã loại.
+
+        Điểm mới luôn nằm cuối dict nên bỏ đi không đổi thứ tự; chỉ khi có điểm
+        được trả lại mới phải sắp xếp lại theo thứ tự thêm ban đầu.
+        """
+        for key in added_keys:
+            del self._points[key]
+            del self._order[key]
+        if not removed:
+            return
+        for key, point, order in removed:
+            self._points[key] = point
+            self._order[key] = order
+        ordered = sorted(self._points, key=self._order.__getitem__)
+        self._points = {key: self._points[key] for key in ordered}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "points": len(self._points),
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "pruned": self.pruned,
+        }
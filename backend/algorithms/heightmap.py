@@ -0,0 +1,100 @@
+import numpy as np  # type: ignore
+from typing import Optional, Tuple
+
+# Hai breakpoint gần nhau hơn ngưỡng này được coi là trùng nhau
+_EDGE_EPS = 1e-9
+
+
+class HeightMap:
+    """Bản đồ độ cao mặt trên (elevation map) trên mặt sàn X–Z của container.
+
+    Dùng lưới tọa độ nén: các breakpoint theo x và z là cạnh của những box đã
+    đặt, nên mỗi ô có độ cao đồng nhất và kết quả là chính xác (không sai số
+    rời rạc hóa). Truy vấn một footprint chỉ duyệt các ô nằm trong footprint
+    thay vì toàn bộ box đã đặt.
+    """
+
+    def __init__(self, width: float, depth: float):
+        self.width = width
+        self.depth = depth
+        self.xs = np.array([0.0, float(width)])
+        self.zs = np.array([0.0, float(depth)])
+        self.heights = np.zeros((1, 1), dtype=np.float64)
+
+    def _split(self, axis: int, value: float) -> None:
+        """Thêm breakpoint tại value (nhân đôi hàng/cột chứa nó) nếu chưa có"""
+        edges = self.xs if axis == 0 else self.zs
+        if value <= edges[0] + _EDGE_EPS or value >= edges[-1] - _EDGE_EPS:
+            return
+        i = int(np.searchsorted(edges, value))
+        if abs(edges[i] - value) <= _EDGE_EPS or abs(edges[i - 1] - value) <= _EDGE_EPS:
+            return
+        self.heights = np.insert(self.heights, i - 1, self.heights.take(i - 1, axis=axis), axis=axis)
+        if axis == 0:
+            self.xs = np.insert(self.xs, i, value)
+        else:
+            self.zs = np.insert(self.zs, i, value)
+
+    def _cells(self, x: float, z: float, w: float, d: float) -> Tuple[int, int, int, int]:
+        """Chỉ số [i0, i1) × [k0, k1) của các ô giao với footprint (diện tích dương)"""
+        i0 = max(0, int(np.searchsorted(self.xs, x + _EDGE_EPS, side="right")) - 1)
+        i1 = min(len(self.xs) - 1, int(np.searchsorted(self.xs, x + w - _EDGE_EPS, side="left")))
+        k0 = max(0, int(np.searchsorted(self.zs, z + _EDGE_EPS, side="right")) - 1)
+        k1 = min(len(self.zs) - 1, int(np.searchsorted(self.zs, z + d - _EDGE_EPS, side="left")))
+        return i0, i1, k0, k1
+
+    def place(self, x: float, z: float, w: float, d: float, top: float) -> tuple:
+        """Cập nhật tăng dần sau khi đặt box có footprint (x, z, w, d) và mặt trên top.
+
+        Trả về trạng thái để ``restore`` hoàn tác: tham chiếu tới các mảng cũ
+        (``_split`` tạo mảng mới) và bản sao vùng bị nâng nếu sửa tại chỗ.
+        """
+        state = (self.xs, self.zs, self.heights)
+        for value in (x, x + w):
+            self._split(0, value)
+        for value in (z, z + d):
+            self._split(1, value)
+        i0, i1, k0, k1 = self._cells(x, z, w, d)
+        saved: Optional[tuple] = None
+        if i1 > i0 and k1 > k0:
+            region = self.heights[i0:i1, k0:k1]
+            if self.heights is state[2]:
+                saved = (i0, i1, k0, k1, region.copy())
+            np.maximum(region, top, out=region)
+        return state + (saved,)
+
+    def restore(self, state: tuple) -> None:
+        """Hoàn tác một lần ``place`` (theo thứ tự ngược lại)"""
+        xs, zs, heights, saved = state
+        if saved is not None:
+            i0, i1, k0, k1, region = saved
+            heights[i0:i1, k0:k1] = region
+        self.xs, self.zs, self.heights = xs, zs, heights
+
+    def resting_height(self, x: float, z: float, w: float, d: float) -> float:
+        """Độ cao thấp nhất mà footprint có thể nằm lên (mặt trên cao nhất bên dưới)"""
+        i0, i1, k0, k1 = self._cells(x, z, w, d)
+        if i1 <= i0 or k1 <= k0:
+            return 0.0
+        return float(self.heights[i0:i1, k0:k1].max())
+
+    def support_area(self, x: float, z: float, w: float, d: float, y: float,
+                     tolerance: float = 1e-3) -> float:
+        """Diện tích footprint nằm trên mặt có độ cao đúng bằng y"""
+        i0, i1, k0, k1 = self._cells(x, z, w, d)
+        if i1 <= i0 or k1 <= k0:
+            return 0.0
+        dx = np.minimum(self.xs[i0 + 1:i1 + 1], x + w) - np.maximum(self.xs[i0:i1], x)
+        dz = np.minimum(self.zs[k0 + 1:k1 + 1], z + d) - np.maximum(self.zs[k0:k1], z)
+        on_level = np.abs(self.heights[i0:i1, k0:k1] - y) < tolerance
+        return float((np.outer(dx, dz) * on_level).sum())
+
+    def support_ratio(self, x: float, z: float, w: float, d: float, y: float,
+                      tolerance: float = 1e-3) -> float:
+        """Tỷ lệ diện tích đáy được đỡ; nằm trên sàn (y = 0) luôn là 1"""
+        if abs(y) < tolerance:
+            return 1.0
+        base_area = w * d
+        if base_area <= 0:
+            return 0.0
+        return self.support_area(x, z, w, d, y, tolerance) / base_area
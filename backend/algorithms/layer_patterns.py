@@ -0,0 +1,233 @@
+import json
+import math
+import os
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from algorithms.orientations import ALL_ROTATIONS, orientation_table
+
+_EPS = 1e-3
+
+# Một box của mẫu lớp: (x, y, width, height, depth, chỉ số hướng xoay trong rotations)
+PatternBox = Tuple[float, float, float, float, float, int]
+LayerPattern = Tuple[PatternBox, ...]
+# Khoá cache: (kích thước mặt lớp, kích thước SKU, các hướng xoay được phép)
+PatternKey = Tuple[float, float, float, float, float, Tuple[Tuple[int, int, int], ...]]
+
+# File lưu cache (không đặt: chỉ giữ trong bộ nhớ) và số mẫu tối đa
+DEFAULT_CACHE_PATH = os.path.expanduser(os.getenv("LAYER_PATTERN_CACHE", "")) or None
+DEFAULT_CACHE_SIZE = int(os.getenv("LAYER_PATTERN_CACHE_SIZE", "4096"))
+# Khoá file khi ghi: chờ tối đa LOCK_TIMEOUT giây, khoá cũ hơn LOCK_STALE giây coi như bị bỏ lại
+LOCK_TIMEOUT = 2.0
+LOCK_STALE = 30.0
+
+
+class LayerPatternCache:
+    """LRU các mẫu lớp đã giải; có path thì lưu xuống file JSON để dùng lại giữa các lần chạy.
+
+    File được đọc một lần khi dùng lần đầu. Mẫu mới chỉ nằm trong bộ nhớ cho
+    tới khi ``flush`` (gọi một lần cuối mỗi lần chạy): giữ khoá file, gộp với
+    nội dung hiện có của file (các tiến trình khác có thể đã ghi thêm) rồi
+    thay nguyên file bằng file tạm, nên nhiều worker dùng chung một file không
+    ghi đè mẫu của nhau.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.path = path or None
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, LayerPattern]' = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self.stats = {"hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._entries)
+
+    @staticmethod
+    def _encode(key: PatternKey) -> str:
+        return json.dumps(key)
+
+    def get(self, key: PatternKey) -> Optional[LayerPattern]:
+        self._load()
+        encoded = self._encode(key)
+        pattern = self._entries.get(encoded)
+        if pattern is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(encoded)
+        self.stats["hits"] += 1
+        return pattern
+
+    def put(self, key: PatternKey, pattern: LayerPattern) -> None:
+        self._load()
+        self._entries[self._encode(key)] = pattern
+        self._trim()
+        self._dirty = True
+
+    def clear(self) -> None:
+        """Xoá mọi mẫu trong bộ nhớ (file, nếu có, giữ nguyên)"""
+        self._entries.clear()
+        self._loaded = True
+        self._dirty = False
+
+    def flush(self) -> bool:
+        """Ghi các mẫu mới xuống file; trả về False nếu không có gì để ghi hoặc không ghi được"""
+        if not self.path or not self._dirty:
+            return False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if not self._lock():
+                return False  # Tiến trình khác đang ghi: giữ mẫu mới tới lần flush sau
+            try:
+                # Mẫu trên file (có thể của tiến trình khác) trước, mẫu trong bộ nhớ sau (mới dùng hơn)
+                merged = self._read()
+                merged.update(self._entries)
+                self._entries = merged
+                self._trim()
+                temporary = f"{self.path}.{os.getpid()}.tmp"
+                with open(temporary, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(temporary, self.path)
+            finally:
+                os.remove(self._lock_path)
+        except OSError:
+            return False  # Không ghi được (quyền, đĩa đầy): vẫn dùng cache trong bộ nhớ
+        self._dirty = False
+        return True
+
+    @property
+    def _lock_path(self) -> str:
+        return f"{self.path}.lock"
+
+    def _lock(self) -> bool:
+        """Tạo file khoá (O_EXCL, dùng được trên mọi hệ điều hành); bỏ khoá cũ của tiến trình đã chết"""
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                os.close(os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self._lock_path) > LOCK_STALE:
+                        os.remove(self._lock_path)
+                        continue
+                except OSError:
+                    continue  # Khoá vừa được nhả
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+
+    def _read(self) -> 'OrderedDict[str, LayerPattern]':
+        entries: 'OrderedDict[str, LayerPattern]' = OrderedDict()
+        if not self.path or not os.path.exists(self.path):
+            return entries
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return entries  # File hỏng hoặc không đọc được: coi như cache rỗng
+        for encoded, pattern in data.items():
+            entries[encoded] = tuple(tuple(box) for box in pattern)
+        return entries
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._entries = self._read()
+        self._trim()
+
+
+_default_cache: Optional[LayerPatternCache] = None
+
+def default_cache() -> LayerPatternCache:
+    """Cache dùng chung của tiến trình (theo LAYER_PATTERN_CACHE)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LayerPatternCache(DEFAULT_CACHE_PATH)
+    return _default_cache
+
+
+def flush_cache(cache: Optional[LayerPatternCache] = None) -> None:
+    """Ghi các mẫu mới của cache (mặc định: cache dùng chung) xuống file, gọi một lần cuối mỗi lần chạy"""
+    (default_cache() if cache is None else cache).flush()
+
+
+def _normal_widths(limit: float, sizes: List[float]) -> List[float]:
+    """Các tổng không âm của sizes không vượt quá limit (điểm cắt đủ để xét mọi mẫu)"""
+    values = {0.0}
+    for size in sorted(set(sizes)):
+        frontier = sorted(values)
+        for value in frontier:
+            total = value + size
+            while total <= limit + _EPS:
+                values.add(round(total, 6))
+                total += size
+    return sorted(values)
+
+
+def solve_layer(face_width: float, face_height: float, width: float, height: float, depth: float,
+                rotations: Tuple[Tuple[int, int, int], ...] = ALL_ROTATIONS) -> LayerPattern:
+    """Mẫu lớp nhiều box nhất của một SKU trên mặt face_width × face_height.
+
+    Quy hoạch động guillotine hai tầng: mặt lớp được cắt thành các dải dọc,
+    mỗi dải là một cột lưới của một hướng xoay xếp từ sàn lên, nên mọi box đều
+    được box cùng hướng bên dưới đỡ toàn bộ. Khi mọi hướng xoay có cùng chiều
+    cao (chỉ xoay quanh trục y) mẫu này là tối ưu cho mặt lớp.
+    """
+    columns = []  # (chiều rộng dải, số box của dải, hướng xoay)
+    for orientation in orientation_table(width, height, depth, rotations):
+        w, h, _, _ = orientation
+        rows = int((face_height + _EPS) // h)
+        if w <= face_width + _EPS and rows > 0:
+            columns.append((w, rows, orientation))
+    if not columns:
+        return ()
+    widths = _normal_widths(face_width, [w for w, _, _ in columns])
+    best = [0] * len(widths)
+    choice: List[Optional[int]] = [None] * len(widths)
+    for i, total in enumerate(widths):
+        for c, (w, rows, _) in enumerate(columns):
+            if w > total + _EPS:
+                continue
+            rest = bisect_right(widths, total - w + _EPS) - 1
+            if best[rest] + rows > best[i]:
+                best[i] = best[rest] + rows
+                choice[i] = c
+    # Dựng lại các dải từ trái sang phải
+    pattern = []
+    x = 0.0
+    i = len(widths) - 1
+    c = choice[i]
+    while c is not None:
+        w, rows, (ow, oh, od, index) = columns[c]
+        pattern.extend((x, row * oh, ow, oh, od, index) for row in range(rows))
+        x += w
+        i = bisect_right(widths, widths[i] - w + _EPS) - 1
+        c = choice[i]
+    return tuple(pattern)
+
+
+def layer_pattern(face_width: float, face_height: float, width: float, height: float, depth: float,
+                  rotations: Tuple[Tuple[int, int, int], ...] = ALL_ROTATIONS, depth_limit: float = math.inf,
+                  cache: Optional[LayerPatternCache] = None) -> LayerPattern:
+    """Mẫu lớp của SKU, chỉ dùng các hướng xoay có depth <= depth_limit; tra cache trước khi giải"""
+    allowed = tuple(rotations[index] for _, _, d, index in orientation_table(width, height, depth, rotations)
+                    if d <= depth_limit + _EPS)
+    if not allowed:
+        return ()
+    if cache is None:
+        cache = default_cache()
+    key = (float(face_width), float(face_height), float(width), float(height), float(depth), allowed)
+    pattern = cache.get(key)
+    if pattern is None:
+        pattern = solve_layer(face_width, face_height, width, height, depth, allowed)
+        cache.put(key, pattern)
+    # Mẫu lưu chỉ số hướng xoay trong allowed; đổi về chỉ số trong rotations của người gọi
+    return tuple((x, y, w, h, d, rotations.index(allowed[index])) for x, y, w, h, d, index in pattern)
@@ -0,0 +1,131 @@
+import numpy as np  # type: ignore
+from typing import Dict, Iterable, List, Sequence
+
+
+class MaximalSpaceManager:
+    """Quản lý các không gian trống cực đại (Empty Maximal Spaces).
+
+    Mỗi không gian là một hộp [x1, x2) × [y1, y2) × [z1, z2) lưu trong mảng
+    NumPy (n, 6). Khi đặt box, chỉ các không gian giao với box bị chia lại
+    (tối đa 6 không gian con mỗi cái), các không gian bị chứa trong không gian
+    khác và các mảnh nhỏ hơn ``min_dimension`` bị loại bỏ ngay.
+    """
+
+    def __init__(self, width: float, height: float, depth: float, min_dimension: float = 0.0):
+        self.min_dimension = min_dimension
+        self._spaces = np.array([[0.0, 0.0, 0.0, width, height, depth]], dtype=np.float64)
+        # Bộ đếm để theo dõi số không gian được tạo và bị loại
+        self.created = 1
+        self.split = 0
+        self.dominated = 0
+        self.too_small = 0
+
+    def __len__(self) -> int:
+        return len(self._spaces)
+
+    def copy(self) -> 'MaximalSpaceManager':
+        clone = MaximalSpaceManager.__new__(MaximalSpaceManager)
+        clone.__dict__.update(self.__dict__)
+        clone._spaces = self._spaces.copy()
+        return clone
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._spaces
+
+    def restore(self, spaces: np.ndarray) -> None:
+        """Khôi phục tập không gian đã lấy từ ``array`` (dùng khi hoàn tác).
+
+        ``place`` luôn tạo mảng mới thay vì sửa tại chỗ nên giữ tham chiếu là đủ.
+        """
+        self._spaces = spaces
+
+    def place(self, x: float, y: float, z: float, w: float, h: float, d: float) -> None:
+        """Cập nhật tập không gian sau khi đặt box (x, y, z, w, h, d)"""
+        spaces = self._spaces
+        lo = np.array([x, y, z])
+        hi = lo + np.array([w, h, d])
+        hit = ((spaces[:, 0] < hi[0]) & (spaces[:, 3] > lo[0]) &
+               (spaces[:, 1] < hi[1]) & (spaces[:, 4] > lo[1]) &
+               (spaces[:, 2] < hi[2]) & (spaces[:, 5] > lo[2]))
+        if not hit.any():
+            return
+        parents = spaces[hit]
+        kept = spaces[~hit]
+        self.split += len(parents)
+
+        # Mỗi không gian bị giao sinh ra tối đa 6 không gian con (hai phía theo mỗi trục)
+        children = []
+        for axis in range(3):
+            below = parents[parents[:, axis] < lo[axis]].copy()
+            below[:, axis + 3] = lo[axis]
+            above = parents[parents[:, axis + 3] > hi[axis]].copy()
+            above[:, axis] = hi[axis]
+            children.extend([below, above])
+        children = np.vstack(children)
+        self.created += len(children)
+
+        sizes = children[:, 3:] - children[:, :3]
+        large_enough = (sizes > 0).all(axis=1) & (sizes >= self.min_dimension).all(axis=1)
+        self.too_small += int(len(children) - np.count_nonzero(large_enough))
+        children = children[large_enough]
+
+        if len(children):
+            children = children[~self._dominated(children, kept)]
+        self._spaces = np.vstack([kept, children]) if len(children) else kept
+
+    def _dominated(self, children: np.ndarray, kept: np.ndarray) -> np.ndarray:
+        """Mặt nạ các không gian con bị chứa trong không gian khác (giữ lại một bản nếu trùng)"""
+        # Không gian cũ không bị giao vẫn là cực đại nên chỉ cần kiểm tra các không gian con
+        contained = np.zeros(len(children), dtype=bool)
+        if len(kept):
+            inside_kept = np.asarray((kept[None, :, :3] <= children[:, None, :3]).all(axis=2) &
+                                     (kept[None, :, 3:] >= children[:, None, 3:]).all(axis=2))
+            contained |= inside_kept.any(axis=1)
+        inside = ((children[None, :, :3] <= children[:, None, :3]).all(axis=2) &
+                  (children[None, :, 3:] >= children[:, None, 3:]).all(axis=2))
+        identical = (children[None, :, :] == children[:, None, :]).all(axis=2)
+        index = np.arange(len(children))
+        # Chứa thực sự, hoặc trùng hệt nhưng đã có bản đứng trước
+        by_other = inside & (~identical | (index[None, :] < index[:, None]))
+        np.fill_diagonal(by_other, False)
+        contained |= by_other.any(axis=1)
+        self.dominated += int(np.count_nonzero(contained))
+        return contained
+
+    def _fit_mask(self, dimensions: Iterable[Sequence[float]]) -> np.ndarray:
+        sizes = self._spaces[:, 3:] - self._spaces[:, :3]
+        mask = np.zeros(len(self._spaces), dtype=bool)
+        for w, h, d in dimensions:
+            mask |= (sizes[:, 0] >= w) & (sizes[:, 1] >= h) & (sizes[:, 2] >= d)
+        return mask
+
+    def _as_dicts(self, mask: np.ndarray) -> List[Dict[str, float]]:
+        selected = self._spaces[mask]
+        sizes = selected[:, 3:] - selected[:, :3]
+        volumes = sizes.prod(axis=1)
+        order = np.argsort(-volumes, kind="stable")
+        return [
+            {"x": s[0], "y": s[1], "z": s[2], "width": sz[0], "height": sz[1], "depth": sz[2], "volume": v}
+            for s, sz, v in zip(selected[order].tolist(), sizes[order].tolist(), volumes[order].tolist())
+        ]
+
+    def fitting(self, width: float, height: float, depth: float) -> List[Dict[str, float]]:
+        """Các không gian chứa được hộp width × height × depth, thể tích giảm dần"""
+        return self._as_dicts(self._fit_mask([(width, height, depth)]))
+
+    def fitting_any(self, dimensions: Iterable[Sequence[float]]) -> List[Dict[str, float]]:
+        """Các không gian chứa được ít nhất một trong các bộ kích thước (ví dụ các hướng xoay)"""
+        return self._as_dicts(self._fit_mask(dimensions))
+
+    def all_spaces(self) -> List[Dict[str, float]]:
+        return self._as_dicts(np.ones(len(self._spaces), dtype=bool))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "spaces": len(self._spaces),
+            "created": self.created,
+            "split": self.split,
+            "dominated": self.dominated,
+            "too_small": self.too_small,
+        }
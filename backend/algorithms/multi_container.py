@@ -0,0 +1,180 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+from algorithms import progress
+from algorithms.beam_search import BeamSearchPackingAlgorithm
+from algorithms.bounds import PackingBounds, compute_bounds
+from algorithms.deadline import Deadline
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.sku_table import SkuTable, as_sku_table
+from algorithms.wall_building import WallBuildingPackingAlgorithm
+
+logger = logging.getLogger(__name__)
+
+
+def create_algorithm(name: str, beam_width: int = 4, support_threshold: Optional[float] = None,
+                     max_workers: Optional[int] = None) -> EnhancedPackingAlgorithm:
+    """Thuật toán một container theo tên của API: "beam", "wall", còn lại là thuật toán nâng cao.
+
+    max_workers giới hạn số tiến trình thuật toán được mở (None: theo số CPU).
+    """
+    if name == "beam":
+        algorithm = BeamSearchPackingAlgorithm(beam_width=beam_width)
+    elif name == "wall":
+        algorithm = WallBuildingPackingAlgorithm()
+    else:
+        algorithm = EnhancedPackingAlgorithm()
+    if support_threshold is not None:
+        algorithm.support_threshold = support_threshold
+    if max_workers is not None:
+        algorithm.max_workers = max_workers
+    return algorithm
+
+
+def run_algorithm(algorithm: EnhancedPackingAlgorithm, goods: Union[List['Box'], SkuTable], container_dimensions: Dict,
+                  respect_groups: bool = True, time_limit: Optional[float] = 30,
+                  target_utilization: Optional[float] = None) -> Tuple[List['Box'], float]:
+    """Đóng gói một container: beam search và xếp tường tự chạy tới hạn chót, thuật toán nâng cao chạy danh mục chiến lược.
+
+    Beam search và thuật toán nâng cao dừng sớm khi đạt target_utilization; xếp
+    tường chỉ chạy một lượt nên không có gì để dừng sớm.
+    """
+    if isinstance(algorithm, BeamSearchPackingAlgorithm):
+        return algorithm.pack(goods, container_dimensions, respect_groups=respect_groups, time_limit=time_limit,
+                              target_utilization=target_utilization)
+    if isinstance(algorithm, WallBuildingPackingAlgorithm):
+        return algorithm.pack(goods, container_dimensions, respect_groups=respect_groups, time_limit=time_limit)
+    return algorithm.optimize_packing(goods, container_dimensions, respect_groups=respect_groups,
+                                      time_limit=time_limit, target_utilization=target_utilization)
+
+
+@dataclass
+class ContainerPlan:
+    """Phương án của một container trong chế độ nhiều container"""
+    boxes: List['Box']
+    utilization: float
+
+    @property
+    def used_volume(self) -> float:
+        return sum(box.volume for box in self.boxes)
+
+
+class MultiContainerPacker:
+    """Xếp một manifest vào nhiều container giống nhau cho tới khi hết hàng.
+
+    Container đầu tiên được xếp bằng thuật toán đầy đủ trên cả manifest. Phần
+    còn lại được chia bằng các lượt tham lam nhanh (mỗi lượt lấp một container
+    rỗng); khi đã biết mỗi container nhận những kiện nào, các container sau
+    được xếp lại song song bằng thuật toán đầy đủ. Nếu thuật toán đầy đủ không
+    xếp hết phần được chia, giữ phương án tham lam (luôn chứa đủ phần đó).
+    Các lượt chia dùng chung hạn chót của cả lần chạy; hết giờ thì dừng chia,
+    hàng chưa chia được báo là không xếp được.
+    """
+
+    def __init__(self, algorithm: str = "enhanced", beam_width: int = 4, support_threshold: Optional[float] = None,
+                 max_containers: int = 50, max_workers: Optional[int] = None):
+        self.algorithm = algorithm
+        self.beam_width = beam_width
+        self.support_threshold = support_threshold
+        self.max_containers = max_containers
+        self.max_workers = max_workers  # Số tiến trình dùng cho container đầu và các container sau (None: theo số CPU)
+        self.first_share = 0.5  # Phần thời gian dành cho container đầu tiên
+        # Báo cáo của lần chạy gần nhất
+        self.bounds: Optional[PackingBounds] = None
+        self.deadline_hit = False
+        self.checkpoints: List[Dict] = []
+
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict, respect_groups: bool = True,
+             time_limit: Optional[float] = 30,
+             target_utilization: Optional[float] = None) -> Tuple[List[ContainerPlan], List[str]]:
+        """Trả về phương án từng container và id các kiện không xếp được (lớn hơn container, hoặc vượt max_containers)"""
+        table = as_sku_table(goods)
+        deadline = Deadline(time_limit)
+        self.bounds = compute_bounds(table, container_dimensions, Box.ROTATIONS)
+
+        # Container đầu tiên: thuật toán đầy đủ trên cả manifest
+        first_limit = None if time_limit is None else time_limit * self.first_share
+        algorithm = create_algorithm(self.algorithm, self.beam_width, self.support_threshold, self.max_workers)
+        with progress.context(container=0):
+            boxes, utilization = run_algorithm(algorithm, table, container_dimensions, respect_groups,
+                                               first_limit, target_utilization)
+        plans = [ContainerPlan(boxes, utilization)]
+        progress.plan(boxes, utilization, container=0)
+        deadline.checkpoint("container 1", utilization, utilization)
+
+        # Chia phần còn lại bằng các lượt tham lam nhanh (lượt dở dang khi hết giờ vẫn là phương án hợp lệ)
+        rest = table.without(box.id for box in boxes)
+        splits: List[Tuple[SkuTable, ContainerPlan]] = []
+        while rest.total_units and len(plans) + len(splits) < self.max_containers and not deadline.expired():
+            greedy = create_algorithm("enhanced", support_threshold=self.support_threshold)
+            boxes, utilization = greedy.pack(rest, container_dimensions, respect_groups, deadline=deadline)
+            if not boxes:
+                break  # Không kiện nào còn lại vừa container rỗng
+            placed_ids = [box.id for box in boxes]
+            splits.append((rest.subset(placed_ids), ContainerPlan(boxes, utilization)))
+            rest = rest.without(placed_ids)
+            progress.plan(boxes, utilization, container=len(splits))
+
+        # Xếp lại song song từng container sau theo phần đã chia; hết giờ thì giữ các phương án tham lam
+        if deadline.expired():
+            results: List[Optional[ContainerPlan]] = [None] * len(splits)
+        else:
+            results = self._pack_splits([share for share, _ in splits], container_dimensions, respect_groups,
+                                        deadline, target_utilization)
+        for (share, split_plan), result in zip(splits, results):
+            if result is not None and len(result.boxes) == share.total_units:
+                plans.append(result)
+                progress.plan(result.boxes, result.utilization, container=len(plans) - 1)
+            else:
+                plans.append(split_plan)
+            deadline.checkpoint(f"container {len(plans)}", plans[-1].utilization, plans[-1].utilization)
+
+        self.deadline_hit = deadline.expired() or deadline.hit
+        self.checkpoints = list(deadline.checkpoints)
+        return plans, rest.unit_ids()
+
+    def _pack_splits(self, shares: List[SkuTable], container_dimensions: Dict, respect_groups: bool,
+                     deadline: Deadline, target_utilization: Optional[float]) -> List[Optional[ContainerPlan]]:
+        """Xếp mỗi phần bằng thuật toán đầy đủ, song song trên process pool khi có nhiều phần.
+
+        Khi số phần lớn hơn số tiến trình, phần xếp hàng chờ chỉ nhận thời gian
+        còn lại của hạn chót chung lúc bắt đầu chạy, nên cả lần chạy không vượt hạn chót.
+        """
+        args = [(self.algorithm, self.beam_width, self.support_threshold, share, container_dimensions,
+                 respect_groups, deadline, target_utilization) for share in shares]
+        workers = min(len(shares), self.max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(_pack_share, *zip(*args)))
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                logger.info(f"Không xếp song song được ({e}), chuyển sang chạy tuần tự")
+        # Tuần tự: chia đều thời gian còn lại cho các phần chưa xếp
+        results = []
+        for i, arg in enumerate(args):
+            remaining = deadline.remaining()
+            share_limit = None if remaining is None else remaining / (len(args) - i)
+            with progress.muted():  # Chỉ báo phương án sau khi biết có xếp hết phần được chia không
+                results.append(_pack_share(*arg[:6], Deadline(share_limit), arg[7]))
+        return results
+
+
+def _pack_share(algorithm_name: str, beam_width: int, support_threshold: Optional[float], share: SkuTable,
+                container_dimensions: Dict, respect_groups: bool, deadline: Deadline,
+                target_utilization: Optional[float]) -> Optional[ContainerPlan]:
+    """Xếp một phần đã chia vào một container (hàm cấp module để chạy trong tiến trình con).
+
+    Phần nhận thời gian còn lại của deadline lúc bắt đầu chạy, không phải lúc được gửi đi.
+    """
+    algorithm = create_algorithm(algorithm_name, beam_width, support_threshold)
+    algorithm.max_workers = 1  # Đã song song theo container, không mở thêm process pool lồng nhau
+    try:
+        boxes, utilization = run_algorithm(algorithm, share, container_dimensions, respect_groups,
+                                           deadline.remaining(), target_utilization)
+    except Exception as e:
+        logger.warning(f"Lỗi khi xếp lại container ({e}), giữ phương án tham lam")
+        return None
+    return ContainerPlan(boxes, utilization)
@@ -0,0 +1,91 @@
+import math
+import numpy as np  # type: ignore
+from typing import Dict, Iterable, Optional, Tuple
+
+# Số cell tối đa của lưới dày đặc; vượt quá thì tự tăng cell_size
+MAX_GRID_CELLS = 4_000_000
+# Sai số làm tròn (theo đơn vị cell) khi xác định các cell bị phủ kín: box nằm đúng trên
+# đường lưới (tính toán số thực lệch vài ulp) vẫn phủ kín các cell bên trong nó
+_CELL_EPS = 1e-9
+
+
+def choose_cell_size(goods: Iterable, container_dimensions: Dict,
+                     max_cells: int = MAX_GRID_CELLS) -> float:
+    """Chọn cell_size từ kích thước nhỏ nhất của các SKU.
+
+    Lấy một nửa cạnh nhỏ nhất để mỗi box phủ kín ít nhất một cell theo mọi trục,
+    nhờ đó phần lớn truy vấn được trả lời ngay trên lưới mà không cần kiểm tra chính xác.
+    """
+    container_width = container_dimensions["width"]
+    container_height = container_dimensions["height"]
+    container_depth = container_dimensions["depth"]
+    min_dim = min((min(box.width, box.height, box.depth) for box in goods), default=0)
+    if min_dim <= 0:
+        min_dim = min(container_width, container_height, container_depth) / 16
+    cell_size = max(min_dim / 2, 1e-6)
+    # Giới hạn bộ nhớ: tăng cell_size cho đến khi số cell nằm trong ngưỡng
+    while (math.ceil(container_width / cell_size) * math.ceil(container_height / cell_size) *
+           math.ceil(container_depth / cell_size)) > max_cells:
+        cell_size *= 2
+    return float(cell_size)
+
+
+class DenseOccupancyGrid:
+    """Lưới chiếm chỗ dày đặc (mảng NumPy) đánh địa chỉ bằng tọa độ cell nguyên.
+
+    Mỗi cell giữ hai bộ đếm:
+      - ``touched``: số box có giao (dù chỉ một phần) với cell
+      - ``full``: số box phủ kín toàn bộ cell
+    Truy vấn một vùng chỉ cần hai phép rút gọn trên slice: nếu có cell ``full``
+    nằm trọn trong vùng thì chắc chắn va chạm, nếu không có cell ``touched`` nào
+    giao với vùng thì chắc chắn trống. Các trường hợp còn lại trả về None để
+    bên gọi kiểm tra chính xác.
+    """
+
+    def __init__(self, container_width: float, container_height: float,
+                 container_depth: float, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.shape = (
+            max(1, math.ceil(container_width / self.cell_size)),
+            max(1, math.ceil(container_height / self.cell_size)),
+            max(1, math.ceil(container_depth / self.cell_size))
+        )
+        self.touched = np.zeros(self.shape, dtype=np.uint16)
+        self.full = np.zeros(self.shape, dtype=np.uint16)
+
+    def _outer(self, start: float, size: float, axis: int) -> Tuple[int, int]:
+        """Khoảng cell [lo, hi) có giao với đoạn [start, start + size)"""
+        lo = math.floor(start / self.cell_size)
+        hi = math.ceil((start + size) / self.cell_size)
+        return max(0, lo), min(self.shape[axis], hi)
+
+    def _inner(self, start: float, size: float, axis: int) -> Tuple[int, int]:
+        """Khoảng cell [lo, hi) nằm trọn trong đoạn [start, start + size)"""
+        lo = math.ceil(start / self.cell_size - _CELL_EPS)
+        hi = math.floor((start + size) / self.cell_size + _CELL_EPS)
+        return max(0, lo), min(self.shape[axis], hi)
+
+    def _slices(self, x: float, y: float, z: float, w: float, h: float, d: float,
+                inner: bool) -> Tuple[slice, slice, slice]:
+        bound = self._inner if inner else self._outer
+        (x0, x1), (y0, y1), (z0, z1) = bound(x, w, 0), bound(y, h, 1), bound(z, d, 2)
+        return slice(x0, max(x0, x1)), slice(y0, max(y0, y1)), slice(z0, max(z0, z1))
+
+    def add(self, x: float, y: float, z: float, w: float, h: float, d: float) -> None:
+        self.touched[self._slices(x, y, z, w, h, d, inner=False)] += 1
+        self.full[self._slices(x, y, z, w, h, d, inner=True)] += 1
+
+    def remove(self, x: float, y: float, z: float, w: float, h: float, d: float) -> None:
+        """Gỡ một box đã thêm trước đó (dùng khi hoàn tác)"""
+        self.touched[self._slices(x, y, z, w, h, d, inner=False)] -= 1
+        self.full[self._slices(x, y, z, w, h, d, inner=True)] -= 1
+
+    def query(self, x: float, y: float, z: float, w: float, h: float, d: float) -> Optional[bool]:
+        """True: chắc chắn va chạm, False: chắc chắn trống, None: cần kiểm tra chính xác"""
+        inner = self.full[self._slices(x, y, z, w, h, d, inner=True)]
+        if inner.size and inner.any():
+            return True
+        outer = self.touched[self._slices(x, y, z, w, h, d, inner=False)]
+        if not outer.size or not outer.any():
+            return False
+        return None
@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Tuple
+
+# Hoán vị (chỉ số trục của width, height, depth) cho từng hướng xoay
+# Thuật toán nâng cao chỉ cho xoay quanh trục y: (w, h, d) và (d, h, w)
+Y_AXIS_ROTATIONS = ((0, 1, 2), (2, 1, 0))
+# Thuật toán cũ cho phép cả 6 hướng xoay
+ALL_ROTATIONS = ((0, 1, 2), (2, 1, 0), (0, 2, 1), (1, 0, 2), (2, 0, 1), (1, 2, 0))
+
+# Một hướng xoay: (width, height, depth, chỉ số hướng trong danh sách rotations)
+Orientation = Tuple[float, float, float, int]
+
+
+@lru_cache(maxsize=4096)
+def orientation_table(width: float, height: float, depth: float,
+                      rotations: Tuple[Tuple[int, int, int], ...] = ALL_ROTATIONS) -> Tuple[Orientation, ...]:
+    """Bảng hướng xoay của một SKU, tính một lần cho mỗi bộ kích thước.
+
+    Các hướng trùng kích thước (box lập phương, box có mặt vuông) chỉ giữ bản
+    đầu tiên nên các thuật toán không phải thử lại cùng một hình dạng.
+    """
+    dims = (width, height, depth)
+    seen = set()
+    table = []
+    for index, (i, j, k) in enumerate(rotations):
+        oriented = (dims[i], dims[j], dims[k])
+        if oriented in seen:
+            continue
+        seen.add(oriented)
+        table.append((oriented[0], oriented[1], oriented[2], index))
+    return tuple(table)
@@ -1,82 +1,89 @@
 import numpy as np
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional, Sequence, Union
 from copy import deepcopy
 import random
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+import os
 import time
-from functools import lru_cache
 import heapq
+from concurrent.futures import ProcessPoolExecutor
+from algorithms.bounds import prefilter, residual_exhausted, suffix_min_volumes
+from algorithms.box_store import ColumnarBoxStore
+from algorithms.collision_cache import CollisionCache
+from algorithms.maximal_spaces import MaximalSpaceManager
+from algorithms.occupancy_grid import DenseOccupancyGrid, choose_cell_size
+from algorithms.box import BoxBase
+from algorithms.orientations import ALL_ROTATIONS, Orientation
+from algorithms.sku_table import SkuTable, as_box_list, as_sku_table, sku_indices
+from algorithms.undo_log import UndoLog
+from algorithms.wall_building import WallBuildingPackingAlgorithm
 
-@dataclass
-class Box:
-    id: str
-    width: float
-    height: float
-    depth: float
-    name: str
-    label: str
-    weight: float
-    position: Dict[str, float] = field(default_factory=lambda: {"x": 0, "y": 0, "z": 0})
-    rotation: Dict[str, float] = field(default_factory=lambda: {"x": 0, "y": 0, "z": 0})
-    placed: bool = False
-    orientation: int = 0
-    
-    def __post_init__(self):
-        self.volume = self.width * self.height * self.depth
-        self.placed = False
-        self.orientation = 0  # 0: original, 1: rotated
-    
-    def get_orientations(self) -> List[Dict]:
-        orientations = []
-        # Thêm tất cả 6 hướng xoay có thể
-        dimensions = [
-            (self.width, self.height, self.depth),
-            (self.depth, self.height, self.width),
-            (self.width, self.depth, self.height),
-            (self.height, self.width, self.depth),
-            (self.depth, self.width, self.height),
-            (self.height, self.depth, self.width)
-        ]
-        
-        for w, h, d in dimensions:
-            orientations.append({
-                "width": w, "height": h, "depth": d,
-                "volume": w * h * d
-            })
-        return orientations
-    
-    def clone(self) -> 'Box':
-        new_box = Box(self.id, self.width, self.height, self.depth,
-                     self.name, self.label, self.weight)
-        new_box.position = self.position.copy()
-        new_box.rotation = self.rotation.copy()
-        new_box.placed = self.placed
-        new_box.orientation = self.orientation
-        return new_box
+class Box(BoxBase):
+    """Cho phép cả 6 hướng xoay"""
+    __slots__ = ()
+    ROTATIONS = ALL_ROTATIONS
 
 class OptimizedSpatialIndex:
+    """Spatial index kiểm tra va chạm.
+
+    Chế độ "dense" dùng lưới chiếm chỗ NumPy đánh địa chỉ bằng tọa độ cell nguyên
+    (kèm kiểm tra chính xác khi lưới không đủ để kết luận); chế độ "dict" giữ
+    lưới dict-of-sets với key chuỗi như trước.
+    """
     def __init__(self, container_width: float, container_height: float,
-                 container_depth: float, cell_size: float = 5):
+                 container_depth: float, cell_size: Optional[float] = None,
+                 mode: str = "dense", cache_size: int = 4096):
+        if mode not in ("dense", "dict"):
+            raise ValueError(f"Unknown spatial index mode: {mode}")
+        self.mode = mode
+        if cell_size is None:
+            if mode == "dense":
+                cell_size = choose_cell_size([], {"width": container_width, "height": container_height,
+                                                  "depth": container_depth})
+            else:
+                cell_size = 5
         self.cell_size = cell_size
         self.width = int(np.ceil(container_width / cell_size))
         self.height = int(np.ceil(container_height / cell_size))
         self.depth = int(np.ceil(container_depth / cell_size))
+        self.store = ColumnarBoxStore()
+        self.occupancy = None
+        if mode == "dense":
+            self.occupancy = DenseOccupancyGrid(container_width, container_height, container_depth, cell_size)
         self.grid = defaultdict(set)  # Sử dụng set thay vì list để tìm kiếm nhanh hơn
+        # Cache LRU có giới hạn, vô hiệu hóa theo epoch/vùng khi thêm box
+        self.collision_cache = CollisionCache(cache_size)
     
     def add_box(self, box: 'Box') -> None:
+        x, y, z = box.pos
+        self.store.append(x, y, z, box.width, box.height, box.depth)
+        if self.occupancy is not None:
+            self.occupancy.add(x, y, z, box.width, box.height, box.depth)
+            return
         cells = self.get_box_cells(box)
         for cell in cells:
             self.grid[cell].add(box.id)
     
+    def remove_last_box(self, box: 'Box') -> None:
+        """Gỡ box được thêm gần nhất (hoàn tác); mọi kết quả va chạm đã cache bị vô hiệu hóa"""
+        index = self.store.size - 1
+        x, y, z, w, h, d = self.store.bounds(index)
+        self.store.truncate(index)
+        if self.occupancy is not None:
+            self.occupancy.remove(x, y, z, w, h, d)
+        else:
+            for cell in self.get_box_cells(box):
+                self.grid[cell].discard(box.id)
+        self.collision_cache.invalidate_all()
+    
     def get_box_cells(self, box: 'Box') -> List[str]:
         cells = []
-        start_x = max(0, int(box.position['x'] / self.cell_size))
-        end_x = min(self.width - 1, int((box.position['x'] + box.width) / self.cell_size))
-        start_y = max(0, int(box.position['y'] / self.cell_size))
-        end_y = min(self.height - 1, int((box.position['y'] + box.height) / self.cell_size))
-        start_z = max(0, int(box.position['z'] / self.cell_size))
-        end_z = min(self.depth - 1, int((box.position['z'] + box.depth) / self.cell_size))
+        start_x = max(0, int(box.x / self.cell_size))
+        end_x = min(self.width - 1, int((box.x + box.width) / self.cell_size))
+        start_y = max(0, int(box.y / self.cell_size))
+        end_y = min(self.height - 1, int((box.y + box.height) / self.cell_size))
+        start_z = max(0, int(box.z / self.cell_size))
+        end_z = min(self.depth - 1, int((box.z + box.depth) / self.cell_size))
         
         for x in range(start_x, end_x + 1):
             for y in range(start_y, end_y + 1):
@@ -84,10 +91,30 @@ class OptimizedSpatialIndex:
                     cells.append(f"{x},{y},{z}")
         return cells
     
-    @lru_cache(maxsize=1000)
     def check_collision_fast(self, box_width: float, box_height: float, box_depth: float,
                            x: float, y: float, z: float) -> bool:
         """Tối ưu hóa kiểm tra va chạm với caching"""
+        cache_key = (box_width, box_height, box_depth, x, y, z)
+        if self.occupancy is not None:
+            return self.collision_cache.lookup(
+                cache_key, self.store.size,
+                lambda: self._check_dense_collision(box_width, box_height, box_depth, x, y, z),
+                lambda start: self.store.overlaps(x, y, z, box_width, box_height, box_depth, start)
+            )
+        return self.collision_cache.lookup(
+            cache_key, self.store.size,
+            lambda: self._check_grid_collision(box_width, box_height, box_depth, x, y, z)
+        )
+    
+    def _check_dense_collision(self, box_width: float, box_height: float, box_depth: float,
+                               x: float, y: float, z: float) -> bool:
+        hit = None if self.occupancy is None else self.occupancy.query(x, y, z, box_width, box_height, box_depth)
+        if hit is None:
+            hit = self.store.overlaps(x, y, z, box_width, box_height, box_depth)
+        return hit
+    
+    def _check_grid_collision(self, box_width: float, box_height: float, box_depth: float,
+                              x: float, y: float, z: float) -> bool:
         start_x = max(0, int(x / self.cell_size))
         end_x = min(self.width - 1, int((x + box_width) / self.cell_size))
         start_y = max(0, int(y / self.cell_size))
@@ -104,25 +131,39 @@ class OptimizedSpatialIndex:
         return False
 
 class Container:
-    def __init__(self, width: float, height: float, depth: float):
+    """Container đặt box với spatial index và tập không gian trống cực đại.
+
+    ``checkpoint``/``rollback`` hoàn tác các lần ``place_box`` theo nhật ký
+    (O(số thay đổi)), rẻ hơn nhiều so với ``clone`` khi cần thử rồi bỏ.
+    """
+    def __init__(self, width: float, height: float, depth: float,
+                 cell_size: Optional[float] = None, index_mode: str = "dense",
+                 min_space_dimension: float = 0.0):
         self.width = width
         self.height = height
         self.depth = depth
         self.volume = width * height * depth
         self.used_volume = 0
         self.boxes = []
-        self.spatial_index = OptimizedSpatialIndex(width, height, depth)
-        self.space_heap = []  # Sử dụng heap để tối ưu tìm kiếm không gian
-        self._initialize_space_heap()
-    
-    def _initialize_space_heap(self):
-        """Khởi tạo heap với không gian ban đầu"""
-        initial_space = {
-            "x": 0, "y": 0, "z": 0,
-            "width": self.width, "height": self.height, "depth": self.depth,
-            "volume": self.volume
-        }
-        heapq.heappush(self.space_heap, (-self.volume, 0, initial_space))
+        self.cell_size = cell_size
+        self.index_mode = index_mode
+        self.spatial_index = OptimizedSpatialIndex(width, height, depth, cell_size, index_mode)
+        # Các không gian trống cực đại, cập nhật tăng dần khi đặt box
+        self.spaces = MaximalSpaceManager(width, height, depth, min_space_dimension)
+        self.undo_log = UndoLog()
+    
+    @property
+    def space_heap(self) -> List[Tuple[float, int, Dict]]:
+        """Danh sách (-volume, index, space) theo thể tích giảm dần, giữ tương thích với code cũ"""
+        return [(-space['volume'], i, space) for i, space in enumerate(self.spaces.all_spaces())]
+    
+    def spaces_fitting(self, width: float, height: float, depth: float) -> List[Dict]:
+        """Các không gian trống chứa được hộp width × height × depth"""
+        return self.spaces.fitting(width, height, depth)
+    
+    def spaces_fitting_any(self, orientations: Sequence[Orientation]) -> List[Dict]:
+        """Các không gian trống chứa được box theo ít nhất một hướng xoay"""
+        return self.spaces.fitting_any([orientation[:3] for orientation in orientations])
     
     def can_place(self, box: 'Box', x: float, y: float, z: float) -> bool:
         # Kiểm tra biên container
@@ -137,117 +178,65 @@ class Container:
         )
     
     def place_box(self, box: 'Box', x: float, y: float, z: float) -> None:
-        box.position = {"x": x, "y": y, "z": z}
+        if self.undo_log.recording:
+            self.undo_log.record((box, box.pos, box.placed, self.used_volume, self.spaces.array))
+        box.pos = (x, y, z)
         box.placed = True
         self.boxes.append(box)
         self.used_volume += box.volume
         self.spatial_index.add_box(box)
-        self._update_space_heap(box, x, y, z)
-    
-    def _update_space_heap(self, box: 'Box', x: float, y: float, z: float):
-        """Cập nhật heap không gian sau khi đặt box"""
-        new_spaces = []
-        
-        # Tạo không gian mới từ việc chia không gian hiện tại
-        for _, _, space in self.space_heap:
-            if self._space_contains_box(space, box, x, y, z):
-                # Chia không gian thành các phần nhỏ hơn
-                divided_spaces = self._divide_space(space, box, x, y, z)
-                new_spaces.extend(divided_spaces)
-            else:
-                new_spaces.append(space)
-        
-        # Cập nhật heap
-        self.space_heap = []
-        for i, space in enumerate(new_spaces):
-            if space['volume'] > 0:
-                heapq.heappush(self.space_heap, (-space['volume'], i, space))
-    
-    def _space_contains_box(self, space: Dict, box: 'Box', x: float, y: float, z: float) -> bool:
-        """Kiểm tra xem không gian có chứa box không"""
-        return (space['x'] <= x and x + box.width <= space['x'] + space['width'] and
-                space['y'] <= y and y + box.height <= space['y'] + space['height'] and
-                space['z'] <= z and z + box.depth <= space['z'] + space['depth'])
-    
-    def _divide_space(self, space: Dict, box: 'Box', x: float, y: float, z: float) -> List[Dict]:
-        """Chia không gian thành các phần nhỏ hơn"""
-        spaces = []
-        min_size = 1
-        
-        # Không gian phía trên
-        if y + box.height < space['y'] + space['height']:
-            top_space = {
-                "x": space['x'], "y": y + box.height, "z": space['z'],
-                "width": space['width'], "height": space['y'] + space['height'] - (y + box.height),
-                "depth": space['depth'], "volume": space['width'] * (space['y'] + space['height'] - (y + box.height)) * space['depth']
-            }
-            if top_space['volume'] > min_size:
-                spaces.append(top_space)
-        
-        # Không gian phía dưới
-        if y > space['y']:
-            bottom_space = {
-                "x": space['x'], "y": space['y'], "z": space['z'],
-                "width": space['width'], "height": y - space['y'],
-                "depth": space['depth'], "volume": space['width'] * (y - space['y']) * space['depth']
-            }
-            if bottom_space['volume'] > min_size:
-                spaces.append(bottom_space)
-        
-        # Không gian bên trái
-        if x > space['x']:
-            left_space = {
-                "x": space['x'], "y": y, "z": space['z'],
-                "width": x - space['x'], "height": box.height,
-                "depth": space['depth'], "volume": (x - space['x']) * box.height * space['depth']
-            }
-            if left_space['volume'] > min_size:
-                spaces.append(left_space)
-        
-        # Không gian bên phải
-        if x + box.width < space['x'] + space['width']:
-            right_space = {
-                "x": x + box.width, "y": y, "z": space['z'],
-                "width": space['x'] + space['width'] - (x + box.width), "height": box.height,
-                "depth": space['depth'], "volume": (space['x'] + space['width'] - (x + box.width)) * box.height * space['depth']
-            }
-            if right_space['volume'] > min_size:
-                spaces.append(right_space)
-        
-        # Không gian phía trước
-        if z > space['z']:
-            front_space = {
-                "x": x, "y": y, "z": space['z'],
-                "width": box.width, "height": box.height,
-                "depth": z - space['z'], "volume": box.width * box.height * (z - space['z'])
-            }
-            if front_space['volume'] > min_size:
-                spaces.append(front_space)
-        
-        # Không gian phía sau
-        if z + box.depth < space['z'] + space['depth']:
-            back_space = {
-                "x": x, "y": y, "z": z + box.depth,
-                "width": box.width, "height": box.height,
-                "depth": space['z'] + space['depth'] - (z + box.depth),
-                "volume": box.width * box.height * (space['z'] + space['depth'] - (z + box.depth))
-            }
-            if back_space['volume'] > min_size:
-                spaces.append(back_space)
-        
-        return spaces
+        self.spaces.place(x, y, z, box.width, box.height, box.depth)
+    
+    def checkpoint(self) -> int:
+        """Đánh dấu trạng thái hiện tại (bật ghi nhật ký); trả về mã dùng cho rollback"""
+        return self.undo_log.checkpoint()
+    
+    def rollback(self, checkpoint: int) -> List['Box']:
+        """Gỡ các box đặt sau checkpoint; trả về các box đã gỡ (mới nhất trước)"""
+        removed = []
+        for box, pos, placed, used_volume, spaces in self.undo_log.pop_to(checkpoint):
+            self.boxes.pop()
+            self.spatial_index.remove_last_box(box)
+            self.spaces.restore(spaces)
+            self.used_volume = used_volume
+            box.pos = pos
+            box.placed = placed
+            removed.append(box)
+        return removed
+    
+    def undo_last(self) -> 'Box':
+        """Gỡ box đặt gần nhất (phải được đặt sau một checkpoint)"""
+        if not len(self.undo_log):
+            raise ValueError("No placement to undo")
+        return self.rollback(len(self.undo_log) - 1)[0]
+    
+    def release_checkpoints(self) -> None:
+        """Tắt ghi nhật ký; các checkpoint cũ không dùng được nữa"""
+        self.undo_log.release()
     
     def get_utilization(self) -> float:
         return self.used_volume / self.volume if self.volume > 0 else 0
     
+    def free_volume(self) -> float:
+        """Thể tích còn trống (cộng sai số làm tròn của used_volume, dùng để dừng sớm)"""
+        return self.volume * (1 + 1e-9) - self.used_volume
+    
     def clone(self) -> 'Container':
-        new_container = Container(self.width, self.height, self.depth)
+        new_container = Container(self.width, self.height, self.depth, self.cell_size, self.index_mode,
+                                  self.spaces.min_dimension)
         new_container.used_volume = self.used_volume
         new_container.boxes = [box.clone() for box in self.boxes]
         new_container.spatial_index = deepcopy(self.spatial_index)
-        new_container.space_heap = deepcopy(self.space_heap)
+        new_container.spaces = self.spaces.copy()
         return new_container
 
+def create_container(goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Container:
+    """Tạo container với cell_size và ngưỡng loại không gian nhỏ suy ra từ danh sách hàng"""
+    min_dimension = min((min(box.width, box.height, box.depth) for box in goods), default=0.0)
+    return Container(**container_dimensions,
+                     cell_size=choose_cell_size(goods, container_dimensions),
+                     min_space_dimension=min_dimension)
+
 class BestFitPackingOptimizer:
     """Thuật toán Best Fit tối ưu hóa"""
     
@@ -258,42 +247,51 @@ class BestFitPackingOptimizer:
             self._center_placement
         ]
     
-    def pack(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
-        container = Container(**container_dimensions)
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+        # Sắp xếp theo thể tích giảm dần và ưu tiên box lớn (trên bảng SKU)
+        table = as_sku_table(goods).sorted(key=lambda x: (-x.volume, -x.width, -x.height, -x.depth))
+        container = create_container(table, container_dimensions)
+        prefilter(table, container_dimensions)
         placed_boxes = []
         
-        # Sắp xếp theo thể tích giảm dần và ưu tiên box lớn
-        sorted_goods = sorted(goods, key=lambda x: (-x.volume, -x.width, -x.height, -x.depth))
-        
-        for box in sorted_goods:
-            best_position = self._find_best_fit_position(container, box)
-            if best_position:
+        for idx in range(len(table)):
+            while table.remaining[idx]:
+                box = table.take(idx, Box)
+                best_position = self._find_best_fit_position(container, box)
+                if not best_position:
+                    # Không gian trống chỉ thu hẹp dần nên các đơn vị giống hệt còn lại cũng không vừa
+                    table.discard(idx)
+                    break
                 x, y, z = best_position
                 container.place_box(box, x, y, z)
                 placed_boxes.append(box)
+                if residual_exhausted(container.free_volume(), table.skus, table.remaining):
+                    return placed_boxes, container.get_utilization()
         
         return placed_boxes, container.get_utilization()
     
     def _find_best_fit_position(self, container: Container, box: 'Box') -> Optional[Tuple[float, float, float]]:
         best_score = -1
         best_position = None
+        best_orientation = None
         
-        for orientation in box.get_orientations():
-            box.width, box.height, box.depth = orientation['width'], orientation['height'], orientation['depth']
+        for orientation in box.orientation_table():
+            box.width, box.height, box.depth = orientation[:3]
             
-            for _, _, space in container.space_heap:
-                if (space['width'] >= box.width and
-                    space['height'] >= box.height and
-                    space['depth'] >= box.depth):
-                    
-                    for strategy in self.placement_strategies:
-                        x, y, z = strategy(space, box)
-                        if container.can_place(box, x, y, z):
-                            score = self._calculate_fit_score(space, box, x, y, z)
-                            if score > best_score:
-                                best_score = score
-                                best_position = (x, y, z)
+            # Chỉ duyệt các không gian cực đại đủ chứa box theo hướng này
+            for space in container.spaces_fitting(box.width, box.height, box.depth):
+                for strategy in self.placement_strategies:
+                    x, y, z = strategy(space, box)
+                    if container.can_place(box, x, y, z):
+                        score = self._calculate_fit_score(space, box, x, y, z)
+                        if score > best_score:
+                            best_score = score
+                            best_position = (x, y, z)
+                            best_orientation = orientation
         
+        # Trả box về đúng hướng xoay của vị trí tốt nhất trước khi đặt
+        if best_orientation is not None:
+            box.width, box.height, box.depth = best_orientation[:3]
         return best_position
     
     def _corner_placement(self, space: Dict, box: 'Box') -> Tuple[float, float, float]:
@@ -331,29 +329,148 @@ class BestFitPackingOptimizer:
         return space_utilization + corner_bonus
 
 class ImprovedGeneticPackingOptimizer:
-    """Genetic Algorithm cải tiến với adaptive parameters"""
+    """Genetic Algorithm cải tiến với adaptive parameters.
+
+    Chromosome là hoán vị chỉ số kiện hàng (mảng NumPy int32) thay vì danh sách
+    Box, nên gửi sang worker rất gọn. Fitness của mỗi thế hệ được tính song song
+    trên một process pool dùng suốt quá trình tối ưu; mọi lựa chọn ngẫu nhiên
+    dùng ``random.Random(seed)`` riêng nên cùng seed cho cùng kết quả.
+
+    Hai kiện cùng SKU hoán đổi cho nhau không làm đổi kết quả giải mã, nên
+    fitness được nhớ theo dãy SKU của hoán vị (``canonical_key``): elite và cá
+    thể sao chép từ cha mẹ không phải giải mã lại. Khi giải mã, bản ghi vị trí
+    đặt của các tiền tố đã gặp được lưu lại; hoán vị mới có chung tiền tố (con
+    sinh ra từ OX thường vậy) chỉ cần đặt lại các box theo bản ghi rồi tìm vị
+    trí cho phần còn lại.
+    """
     
-    def __init__(self, population_size: int = 100, generations: int = 200):
+    def __init__(self, population_size: int = 100, generations: int = 200,
+                 seed: Optional[int] = None, max_workers: Optional[int] = None):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = 0.1
         self.crossover_rate = 0.8
         self.elite_size = 5
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.max_workers = max_workers  # None: theo số CPU; 1: tính tuần tự
+        self._workers = 1
+        self.fitness_cache_size = 50000  # Số fitness nhớ tối đa (LRU)
+        self.prefix_cache_size = 20000  # Số tiền tố nhớ tối đa (LRU)
+        self.prefix_stride = 4  # Lưu bản ghi tiền tố sau mỗi prefix_stride gen
+        self.set_goods([])
     
-    def create_chromosome(self, goods: List['Box']) -> List['Box']:
-        chromosome = [box.clone() for box in goods]
-        random.shuffle(chromosome)
-        return chromosome
+    def set_goods(self, goods: List['Box']) -> None:
+        """Đặt manifest gốc cho các hoán vị và xoá các cache phụ thuộc vào nó"""
+        self.goods = goods
+        sku_of = sku_indices(goods)
+        dtype = np.uint8 if len(set(sku_of)) <= 256 else np.int32
+        self._sku_of = np.array(sku_of, dtype=dtype)
+        self._volumes = np.array([box.volume for box in goods], dtype=np.float64)
+        self._fitness_cache: 'OrderedDict[bytes, float]' = OrderedDict()
+        self._prefix_cache: 'OrderedDict[bytes, tuple]' = OrderedDict()
+        self.cache_stats = {"fitness_hits": 0, "fitness_misses": 0,
+                            "genes_replayed": 0, "genes_decoded": 0}
     
-    def evaluate_fitness(self, chromosome: List['Box'], container_dimensions: Dict) -> float:
-        container = Container(**container_dimensions)
-        placed_boxes = self.pack_chromosome(chromosome, container)
+    def canonical_key(self, chromosome: np.ndarray) -> bytes:
+        """Khoá của hoán vị theo dãy SKU: các hoán vị chỉ khác nhau ở kiện cùng SKU cho cùng khoá"""
+        return self._sku_of[chromosome].tobytes()
+    
+    def create_chromosome(self, size: int) -> np.ndarray:
+        chromosome = list(range(size))
+        self.rng.shuffle(chromosome)
+        return np.array(chromosome, dtype=np.int32)
+    
+    def decode(self, chromosome: np.ndarray, container_dimensions: Dict) -> Tuple[Container, List['Box']]:
+        """Đóng gói các kiện theo thứ tự hoán vị; Box được nhân bản từ manifest gốc.
+
+        Bắt đầu từ tiền tố chung dài nhất đã có bản ghi: các box của tiền tố được
+        đặt lại đúng vị trí cũ (không tìm kiếm), cho cùng trạng thái container
+        như khi giải mã từ đầu.
+        """
+        goods = self.goods
+        order = chromosome.tolist()
+        sku_seq = self._sku_of[chromosome]
+        container = create_container(goods, container_dimensions)
+        placed_boxes = []
+        start, log = self._longest_cached_prefix(sku_seq)
+        for i in range(start):
+            record = log[i]
+            if record is not None:
+                x, y, z = record
+                box = goods[order[i]].clone()
+                container.place_box(box, x, y, z)
+                placed_boxes.append(box)
+        log = list(log[:start])
+        # Thể tích nhỏ nhất của các kiện từ gen i trở đi: phần trống nhỏ hơn thì dừng sớm
+        suffix_min = suffix_min_volumes(self._volumes[chromosome])
+        for i in range(start, len(order)):
+            if container.free_volume() < suffix_min[i]:
+                log.extend([None] * (len(order) - i))
+                break
+            box = goods[order[i]].clone()
+            position = self.find_best_position(container, box)
+            if position:
+                x, y, z = position
+                container.place_box(box, x, y, z)
+                placed_boxes.append(box)
+            log.append(position)
+        self.cache_stats["genes_replayed"] += start
+        self.cache_stats["genes_decoded"] += len(order) - start
+        self._store_prefixes(sku_seq, tuple(log), start)
+        return container, placed_boxes
+    
+    def _longest_cached_prefix(self, sku_seq: np.ndarray) -> Tuple[int, tuple]:
+        """Độ dài và bản ghi vị trí của tiền tố SKU dài nhất đã có trong cache"""
+        stride = self.prefix_stride
+        cache = self._prefix_cache
+        for length in range(len(sku_seq) // stride * stride, 0, -stride):
+            key = sku_seq[:length].tobytes()
+            log = cache.get(key)
+            if log is not None:
+                cache.move_to_end(key)
+                return length, log
+        return 0, ()
+    
+    def _store_prefixes(self, sku_seq: np.ndarray, log: tuple, start: int) -> None:
+        # Các tiền tố dài hơn start dùng chung một bản ghi (mỗi khoá chỉ đọc log[:length])
+        stride = self.prefix_stride
+        cache = self._prefix_cache
+        for length in range(start + stride, len(sku_seq) + 1, stride):
+            cache[sku_seq[:length].tobytes()] = log
+        while len(cache) > self.prefix_cache_size:
+            cache.popitem(last=False)
+    
+    def _compute_fitness(self, chromosome: np.ndarray, container_dimensions: Dict) -> float:
+        container, placed_boxes = self.decode(chromosome, container_dimensions)
         utilization = container.get_utilization()
         
         # Thêm penalty cho việc không đặt được box
         penalty = (len(chromosome) - len(placed_boxes)) * 0.1
         return max(0, utilization - penalty)
     
+    def evaluate_fitness(self, chromosome: np.ndarray, container_dimensions: Dict) -> float:
+        key = self.canonical_key(chromosome)
+        fitness = self._lookup_fitness(key)
+        if fitness is None:
+            fitness = self._compute_fitness(chromosome, container_dimensions)
+            self._remember_fitness(key, fitness)
+        return fitness
+    
+    def _lookup_fitness(self, key: bytes) -> Optional[float]:
+        fitness = self._fitness_cache.get(key)
+        if fitness is None:
+            self.cache_stats["fitness_misses"] += 1
+        else:
+            self._fitness_cache.move_to_end(key)
+            self.cache_stats["fitness_hits"] += 1
+        return fitness
+    
+    def _remember_fitness(self, key: bytes, fitness: float) -> None:
+        self._fitness_cache[key] = fitness
+        if len(self._fitness_cache) > self.fitness_cache_size:
+            self._fitness_cache.popitem(last=False)
+    
     def pack_chromosome(self, chromosome: List['Box'], container: Container) -> List['Box']:
         placed_boxes = []
         for box in chromosome:
@@ -368,16 +485,12 @@ class ImprovedGeneticPackingOptimizer:
         best_score = -1
         best_position = None
         
-        for _, _, space in container.space_heap:
-            for orientation in box.get_orientations():
-                if (space['width'] >= orientation['width'] and
-                    space['height'] >= orientation['height'] and
-                    space['depth'] >= orientation['depth']):
-                    
-                    score = self.calculate_placement_score(container, box, space['x'], space['y'], space['z'])
-                    if score > best_score:
-                        best_score = score
-                        best_position = (space['x'], space['y'], space['z'])
+        # Các không gian cực đại chứa được box theo ít nhất một hướng xoay
+        for space in container.spaces_fitting_any(box.orientation_table()):
+            score = self.calculate_placement_score(container, box, space['x'], space['y'], space['z'])
+            if score > best_score:
+                best_score = score
+                best_position = (space['x'], space['y'], space['z'])
         
         return best_position
     
@@ -398,19 +511,19 @@ class ImprovedGeneticPackingOptimizer:
         
         # Điểm cho việc sát với box khác
         for other_box in container.boxes:
-            if (abs(x - (other_box.position['x'] + other_box.width)) < 1 or
-                abs(other_box.position['x'] - (x + box.width)) < 1):
+            if (abs(x - (other_box.x + other_box.width)) < 1 or
+                abs(other_box.x - (x + box.width)) < 1):
                 score += 10
-            if (abs(y - (other_box.position['y'] + other_box.height)) < 1 or
-                abs(other_box.position['y'] - (y + box.height)) < 1):
+            if (abs(y - (other_box.y + other_box.height)) < 1 or
+                abs(other_box.y - (y + box.height)) < 1):
                 score += 10
-            if (abs(z - (other_box.position['z'] + other_box.depth)) < 1 or
-                abs(other_box.position['z'] - (z + box.depth)) < 1):
+            if (abs(z - (other_box.z + other_box.depth)) < 1 or
+                abs(other_box.z - (z + box.depth)) < 1):
                 score += 10
         
         return score
     
-    def crossover(self, parent1: List['Box'], parent2: List['Box']) -> List['Box']:
+    def crossover(self, parent1: np.ndarray, parent2: np.ndarray) -> np.ndarray:
         if len(parent1) != len(parent2):
             return parent1
         
@@ -419,119 +532,181 @@ class ImprovedGeneticPackingOptimizer:
         if size <= 1:
             return parent1.copy()
         
-        start = random.randint(0, max(0, size // 3))
-        end = random.randint(start + 1, max(start + 1, size * 2 // 3))
+        start = self.rng.randint(0, max(0, size // 3))
+        end = self.rng.randint(start + 1, max(start + 1, size * 2 // 3))
         
-        child: List[Optional[Box]] = [None] * size
+        child = np.empty(size, dtype=parent1.dtype)
         child[start:end] = parent1[start:end]
-        
-        remaining = [box for box in parent2 if box not in child[start:end]]
-        j = 0
-        for i in range(size):
-            if child[i] is None and j < len(remaining):
-                child[i] = remaining[j]
-                j += 1
-        
-        return [box for box in child if box is not None]
+        # Các gen còn lại theo thứ tự xuất hiện trong parent2
+        remaining = parent2[~np.isin(parent2, parent1[start:end])]
+        child[:start] = remaining[:start]
+        child[end:] = remaining[start:]
+        return child
     
-    def mutate(self, chromosome: List['Box']) -> List['Box']:
-        if random.random() < self.mutation_rate and len(chromosome) >= 2:
-            # Swap mutation
-            i, j = random.sample(range(len(chromosome)), 2)
+    def mutate(self, chromosome: np.ndarray) -> np.ndarray:
+        if self.rng.random() < self.mutation_rate and len(chromosome) >= 2:
+            # Swap mutation (trên bản sao để không ảnh hưởng cá thể khác dùng chung mảng)
+            i, j = self.rng.sample(range(len(chromosome)), 2)
+            chromosome = chromosome.copy()
             chromosome[i], chromosome[j] = chromosome[j], chromosome[i]
         
         return chromosome
     
-    def optimize(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def _evaluate_population(self, population: List[np.ndarray], container_dimensions: Dict,
+                             executor: Optional[ProcessPoolExecutor]) -> List[float]:
+        """Tính fitness cả thế hệ; kết quả giữ đúng thứ tự population nên không phụ thuộc lịch worker.
+
+        Chỉ các khoá SKU chưa có trong cache (mỗi khoá một lần) mới được giải mã.
+        """
+        keys = [self.canonical_key(chromosome) for chromosome in population]
+        known: Dict[bytes, float] = {}
+        pending: Dict[bytes, np.ndarray] = {}
+        for key, chromosome in zip(keys, population):
+            if key in known or key in pending:
+                continue
+            fitness = self._lookup_fitness(key)
+            if fitness is None:
+                pending[key] = chromosome
+            else:
+                known[key] = fitness
+        if executor is None:
+            computed = [self._compute_fitness(chromosome, container_dimensions) for chromosome in pending.values()]
+        else:
+            chunksize = max(1, len(pending) // (self._workers * 4))
+            computed = list(executor.map(_ga_worker_fitness, pending.values(), chunksize=chunksize))
+        for key, fitness in zip(pending, computed):
+            self._remember_fitness(key, fitness)
+            known[key] = fitness
+        return [known[key] for key in keys]
+    
+    def _create_executor(self, container_dimensions: Dict) -> Optional[ProcessPoolExecutor]:
+        workers = min(self.population_size, self.max_workers or os.cpu_count() or 1)
+        if workers <= 1:
+            return None
+        self._workers = workers
+        try:
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_ga_worker,
+                                       initargs=(self.goods, container_dimensions))
+        except (OSError, NotImplementedError):
+            return None
+    
+    def optimize(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+        # Chromosome là hoán vị chỉ số trên manifest gốc
+        self.set_goods(as_box_list(goods, Box))
         # Khởi tạo population
-        population = [self.create_chromosome(goods) for _ in range(self.population_size)]
+        population = [self.create_chromosome(len(self.goods)) for _ in range(self.population_size)]
         
         best_fitness = 0
         best_chromosome = None
         stagnation_counter = 0
         
-        for generation in range(self.generations):
-            # Đánh giá fitness
-            fitness_scores = []
-            for chromosome in population:
-                fitness = self.evaluate_fitness(chromosome, container_dimensions)
-                fitness_scores.append(fitness)
+        # Process pool dùng cho mọi thế hệ (worker giữ sẵn manifest, chỉ nhận hoán vị)
+        executor = self._create_executor(container_dimensions)
+        try:
+            for generation in range(self.generations):
+                # Đánh giá fitness
+                fitness_scores = self._evaluate_population(population, container_dimensions, executor)
+                for chromosome, fitness in zip(population, fitness_scores):
+                    if fitness > best_fitness:
+                        best_fitness = fitness
+                        best_chromosome = chromosome.copy()
+                        stagnation_counter = 0
+                    else:
+                        stagnation_counter += 1
                 
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_chromosome = chromosome.copy()
-                    stagnation_counter = 0
+                # Adaptive parameters
+                if stagnation_counter > 20:
+                    self.mutation_rate = min(0.3, self.mutation_rate * 1.1)
+                    self.crossover_rate = max(0.5, self.crossover_rate * 0.95)
                 else:
-                    stagnation_counter += 1
-            
-            # Adaptive parameters
-            if stagnation_counter > 20:
-                self.mutation_rate = min(0.3, self.mutation_rate * 1.1)
-                self.crossover_rate = max(0.5, self.crossover_rate * 0.95)
-            else:
-                self.mutation_rate = max(0.05, self.mutation_rate * 0.99)
-                self.crossover_rate = min(0.9, self.crossover_rate * 1.01)
-            
-            # Tạo population mới
-            new_population = []
-            
-            # Elitism: giữ lại best chromosomes
-            elite_indices = sorted(range(len(fitness_scores)), key=lambda i: fitness_scores[i], reverse=True)[:self.elite_size]
-            for idx in elite_indices:
-                new_population.append(population[idx])
-            
-            # Tạo chromosome mới bằng crossover và mutation
-            while len(new_population) < self.population_size:
-                if random.random() < self.crossover_rate:
-                    parent1 = self.tournament_selection(population, fitness_scores)
-                    parent2 = self.tournament_selection(population, fitness_scores)
-                    child = self.crossover(parent1, parent2)
-                else:
-                    parent = self.tournament_selection(population, fitness_scores)
-                    child = parent.copy()
+                    self.mutation_rate = max(0.05, self.mutation_rate * 0.99)
+                    self.crossover_rate = min(0.9, self.crossover_rate * 1.01)
                 
-                child = self.mutate(child)
-                new_population.append(child)
-            
-            population = new_population
+                # Tạo population mới
+                new_population = []
+                
+                # Elitism: giữ lại best chromosomes
+                elite_indices = sorted(range(len(fitness_scores)), key=lambda i: fitness_scores[i], reverse=True)[:self.elite_size]
+                for idx in elite_indices:
+                    new_population.append(population[idx])
+                
+                # Tạo chromosome mới bằng crossover và mutation
+                while len(new_population) < self.population_size:
+                    if self.rng.random() < self.crossover_rate:
+                        parent1 = self.tournament_selection(population, fitness_scores)
+                        parent2 = self.tournament_selection(population, fitness_scores)
+                        child = self.crossover(parent1, parent2)
+                    else:
+                        parent = self.tournament_selection(population, fitness_scores)
+                        child = parent.copy()
+                    
+                    child = self.mutate(child)
+                    new_population.append(child)
+                
+                population = new_population
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
-        return best_chromosome or [], best_fitness
+        if best_chromosome is None:
+            return [], best_fitness
+        return [self.goods[i].clone() for i in best_chromosome.tolist()], best_fitness
     
-    def tournament_selection(self, population: List[List['Box']], fitness_scores: List[float],
-                           tournament_size: int = 3) -> List['Box']:
-        tournament_indices = random.sample(range(len(population)), tournament_size)
+    def tournament_selection(self, population: List[np.ndarray], fitness_scores: List[float],
+                           tournament_size: int = 3) -> np.ndarray:
+        tournament_indices = self.rng.sample(range(len(population)), tournament_size)
         tournament_fitness = [fitness_scores[i] for i in tournament_indices]
         winner_index = tournament_indices[tournament_fitness.index(max(tournament_fitness))]
         return population[winner_index]
 
+# Trạng thái của mỗi worker GA: optimizer và manifest được gửi một lần khi khởi tạo pool
+_ga_worker_state: Dict = {}
+
+def _init_ga_worker(goods: List['Box'], container_dimensions: Dict) -> None:
+    # Mỗi worker giữ cache tiền tố riêng; cache fitness nằm ở tiến trình chính
+    optimizer = ImprovedGeneticPackingOptimizer()
+    optimizer.set_goods(goods)
+    _ga_worker_state["optimizer"] = optimizer
+    _ga_worker_state["container_dimensions"] = container_dimensions
+
+def _ga_worker_fitness(chromosome: np.ndarray) -> float:
+    return _ga_worker_state["optimizer"]._compute_fitness(chromosome, _ga_worker_state["container_dimensions"])
+
 class ExtremePointPackingOptimizer:
     """Thuật toán Extreme Point Heuristic cho 3D Bin Packing"""
     def __init__(self):
         pass
 
-    def pack(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
-        container = Container(**container_dimensions)
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+        table = as_sku_table(goods).sorted(key=lambda x: -x.volume)
+        container = create_container(table, container_dimensions)
+        prefilter(table, container_dimensions)
         placed_boxes = []
         extreme_points = [
             {"x": 0, "y": 0, "z": 0}
         ]
-        sorted_goods = sorted(goods, key=lambda x: -x.volume)
-        for box in sorted_goods:
-            best_point = None
-            best_util = -1
-            best_orientation = None
-            for ep in extreme_points:
-                for orientation in box.get_orientations():
-                    box.width, box.height, box.depth = orientation['width'], orientation['height'], orientation['depth']
-                    if container.can_place(box, ep['x'], ep['y'], ep['z']):
-                        # Ưu tiên điểm có utilization cao nhất
-                        util = self._estimate_utilization(container, box, ep)
-                        if util > best_util:
-                            best_util = util
-                            best_point = ep
-                            best_orientation = orientation
-            if best_point and best_orientation:
-                box.width, box.height, box.depth = best_orientation['width'], best_orientation['height'], best_orientation['depth']
+        for idx in range(len(table)):
+            while table.remaining[idx]:
+                box = table.take(idx, Box)
+                orientations = box.orientation_table()
+                best_point = None
+                best_util = -1
+                best_orientation = None
+                for ep in extreme_points:
+                    for orientation in orientations:
+                        box.width, box.height, box.depth = orientation[:3]
+                        if container.can_place(box, ep['x'], ep['y'], ep['z']):
+                            # Ưu tiên điểm có utilization cao nhất
+                            util = self._estimate_utilization(container, box, ep)
+                            if util > best_util:
+                                best_util = util
+                                best_point = ep
+                                best_orientation = orientation
+                if not (best_point and best_orientation):
+                    # Trạng thái container không đổi nên các đơn vị giống hệt còn lại cũng không đặt được
+                    table.discard(idx)
+                    break
+                box.width, box.height, box.depth = best_orientation[:3]
                 container.place_box(box, best_point['x'], best_point['y'], best_point['z'])
                 placed_boxes.append(box)
                 # Cập nhật extreme points
@@ -539,6 +714,8 @@ class ExtremePointPackingOptimizer:
                 for new_ep in new_eps:
                     if not self._is_point_covered(new_ep, extreme_points):
                         extreme_points.append(new_ep)
+                if residual_exhausted(container.free_volume(), table.skus, table.remaining):
+                    return placed_boxes, container.get_utilization()
         return placed_boxes, container.get_utilization()
 
     def _estimate_utilization(self, container, box, ep):
@@ -547,7 +724,7 @@ class ExtremePointPackingOptimizer:
 
     def _generate_new_extreme_points(self, box):
         # Sinh ra các điểm mới dựa trên box vừa đặt
-        x, y, z = box.position['x'], box.position['y'], box.position['z']
+        x, y, z = box.pos
         w, h, d = box.width, box.height, box.depth
         return [
             {"x": x + w, "y": y, "z": z},
@@ -563,47 +740,106 @@ class ExtremePointPackingOptimizer:
         return False
 
 class SimulatedAnnealingPackingOptimizer:
-    """Thuật toán Simulated Annealing cho 3D Bin Packing"""
-    def __init__(self, initial_temp=1000, cooling_rate=0.95, min_temp=1):
+    """Thuật toán Simulated Annealing cho 3D Bin Packing.
+
+    Giữ một container đã đóng gói theo giải pháp hiện tại, có checkpoint trước
+    mỗi vị trí. Láng giềng chỉ khác từ vị trí thay đổi sớm nhất nên được đánh
+    giá bằng cách rollback về checkpoint đó và đóng gói tiếp phần còn lại; nếu
+    không được chấp nhận, phần đuôi của giải pháp hiện tại được đặt lại theo
+    vị trí đã ghi (không phải tìm kiếm lại). Mọi lựa chọn ngẫu nhiên dùng
+    ``random.Random(seed)`` riêng nên cùng seed cho cùng kết quả.
+    """
+    def __init__(self, initial_temp=1000, cooling_rate=0.95, min_temp=1, seed: Optional[int] = None):
         self.initial_temp = initial_temp
         self.cooling_rate = cooling_rate
         self.min_temp = min_temp
+        self.seed = seed
+        self.rng = random.Random(seed)
 
-    def pack(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
         if not goods:
             return [], 0.0
+        # Láng giềng hoán đổi thứ tự từng kiện nên cần danh sách Box đầy đủ
+        goods = as_box_list(goods, Box)
         
         # Khởi tạo giải pháp ban đầu bằng Best Fit
         best_fit = BestFitPackingOptimizer()
         current_solution, current_utilization = best_fit.pack(goods, container_dimensions)
-        best_solution = current_solution.copy()
+        best_solution = [box.clone() for box in current_solution]
         best_utilization = current_utilization
         
+        # Container theo giải pháp hiện tại (cấu hình theo cả manifest để dùng chung cho mọi láng giềng)
+        container = create_container(goods, container_dimensions)
+        checkpoints: List[int] = []
+        placements: List[Optional[Tuple[float, float, float]]] = []
+        self._pack_from(container, current_solution, 0, checkpoints, placements)
+        
         temperature = self.initial_temp
         
         while temperature > self.min_temp:
             # Tạo giải pháp mới bằng cách hoán đổi thứ tự
             new_solution = self._generate_neighbor(current_solution, goods)
-            new_utilization = self._evaluate_solution(new_solution, container_dimensions)
+            start = self._first_difference(current_solution, new_solution)
+            
+            # Chỉ đóng gói lại từ vị trí thay đổi sớm nhất
+            checkpoint = checkpoints[start] if start < len(checkpoints) else container.checkpoint()
+            container.rollback(checkpoint)
+            new_checkpoints, new_placements = checkpoints[:start], placements[:start]
+            self._pack_from(container, new_solution, start, new_checkpoints, new_placements)
+            new_utilization = container.get_utilization()
             
             # Tính delta E
             delta_e = new_utilization - current_utilization
             
             # Chấp nhận giải pháp mới nếu tốt hơn hoặc theo xác suất
-            if delta_e > 0 or random.random() < np.exp(delta_e / temperature):
+            if delta_e > 0 or self.rng.random() < np.exp(delta_e / temperature):
                 current_solution = new_solution
                 current_utilization = new_utilization
+                checkpoints, placements = new_checkpoints, new_placements
                 
-                # Cập nhật giải pháp tốt nhất
+                # Cập nhật giải pháp tốt nhất (bản sao các box đã đặt cùng vị trí hiện tại)
                 if current_utilization > best_utilization:
-                    best_solution = current_solution.copy()
+                    best_solution = [box.clone() for box in container.boxes]
                     best_utilization = current_utilization
+            else:
+                # Quay lại giải pháp hiện tại
+                container.rollback(checkpoint)
+                self._replay_from(container, current_solution, start, placements)
             
             # Giảm nhiệt độ
             temperature *= self.cooling_rate
         
         return best_solution, best_utilization
 
+    def _pack_from(self, container: Container, solution: List['Box'], start: int,
+                   checkpoints: List[int], placements: List[Optional[Tuple[float, float, float]]]) -> None:
+        """Đóng gói solution[start:] tiếp từ trạng thái hiện tại, ghi checkpoint và vị trí từng box"""
+        suffix_min = suffix_min_volumes([box.volume for box in solution[start:]])
+        for i, box in enumerate(solution[start:]):
+            checkpoints.append(container.checkpoint())
+            # Phần trống không chứa nổi kiện nào còn lại: các kiện sau không cần tìm vị trí
+            position = self._find_best_position(container, box) if container.free_volume() >= suffix_min[i] else None
+            if position:
+                x, y, z = position
+                container.place_box(box, x, y, z)
+            placements.append(position)
+
+    def _replay_from(self, container: Container, solution: List['Box'], start: int,
+                     placements: List[Optional[Tuple[float, float, float]]]) -> None:
+        """Đặt lại solution[start:] theo các vị trí đã ghi"""
+        for box, position in zip(solution[start:], placements[start:]):
+            if position:
+                x, y, z = position
+                container.place_box(box, x, y, z)
+
+    @staticmethod
+    def _first_difference(current_solution: List['Box'], new_solution: List['Box']) -> int:
+        """Vị trí đầu tiên mà hai giải pháp đặt box khác nhau"""
+        for i, (box, other) in enumerate(zip(current_solution, new_solution)):
+            if box is not other:
+                return i
+        return min(len(current_solution), len(new_solution))
+
     def _generate_neighbor(self, current_solution: List['Box'], original_goods: List['Box']) -> List['Box']:
         """Tạo giải pháp láng giềng bằng cách hoán đổi thứ tự"""
         if len(current_solution) <= 1:
@@ -615,52 +851,30 @@ class SimulatedAnnealingPackingOptimizer:
         
         # Hoán đổi ngẫu nhiên 2 box trong giải pháp hiện tại
         if len(current_solution) >= 2:
-            i, j = random.sample(range(len(current_solution)), 2)
+            i, j = self.rng.sample(range(len(current_solution)), 2)
             new_solution = current_solution.copy()
             new_solution[i], new_solution[j] = new_solution[j], new_solution[i]
         else:
             new_solution = current_solution.copy()
         
         # Thêm ngẫu nhiên một box chưa sử dụng
-        if unused_boxes and random.random() < 0.3:
-            new_box = random.choice(unused_boxes).clone()
+        if unused_boxes and self.rng.random() < 0.3:
+            new_box = self.rng.choice(unused_boxes).clone()
             new_solution.append(new_box)
         
         return new_solution
 
-    def _evaluate_solution(self, solution: List['Box'], container_dimensions: Dict) -> float:
-        """Đánh giá giải pháp bằng cách thực hiện đóng gói"""
-        if not solution:
-            return 0.0
-        
-        container = Container(**container_dimensions)
-        placed_boxes = []
-        
-        for box in solution:
-            position = self._find_best_position(container, box)
-            if position:
-                x, y, z = position
-                container.place_box(box, x, y, z)
-                placed_boxes.append(box)
-        
-        return container.get_utilization()
-
     def _find_best_position(self, container: Container, box: 'Box') -> Optional[Tuple[float, float, float]]:
         """Tìm vị trí tốt nhất cho box trong container"""
         best_score = -1
         best_position = None
         
-        for _, _, space in container.space_heap:
-            for orientation in box.get_orientations():
-                if (space['width'] >= orientation['width'] and
-                    space['height'] >= orientation['height'] and
-                    space['depth'] >= orientation['depth']):
-                    
-                    if container.can_place(box, space['x'], space['y'], space['z']):
-                        score = self._calculate_placement_score(container, box, space['x'], space['y'], space['z'])
-                        if score > best_score:
-                            best_score = score
-                            best_position = (space['x'], space['y'], space['z'])
+        for space in container.spaces_fitting_any(box.orientation_table()):
+            if container.can_place(box, space['x'], space['y'], space['z']):
+                score = self._calculate_placement_score(container, box, space['x'], space['y'], space['z'])
+                if score > best_score:
+                    best_score = score
+                    best_position = (space['x'], space['y'], space['z'])
         
         return best_position
 
@@ -682,14 +896,14 @@ class SimulatedAnnealingPackingOptimizer:
         
         # Điểm cho việc sát với box khác
         for other_box in container.boxes:
-            if (abs(x - (other_box.position['x'] + other_box.width)) < 1 or
-                abs(other_box.position['x'] - (x + box.width)) < 1):
+            if (abs(x - (other_box.x + other_box.width)) < 1 or
+                abs(other_box.x - (x + box.width)) < 1):
                 score += 10
-            if (abs(y - (other_box.position['y'] + other_box.height)) < 1 or
-                abs(other_box.position['y'] - (y + box.height)) < 1):
+            if (abs(y - (other_box.y + other_box.height)) < 1 or
+                abs(other_box.y - (y + box.height)) < 1):
                 score += 10
-            if (abs(z - (other_box.position['z'] + other_box.depth)) < 1 or
-                abs(other_box.position['z'] - (z + box.depth)) < 1):
+            if (abs(z - (other_box.z + other_box.depth)) < 1 or
+                abs(other_box.z - (z + box.depth)) < 1):
                 score += 10
         
         return score
@@ -701,8 +915,9 @@ class PackingAlgorithm:
         self.best_fit_optimizer = BestFitPackingOptimizer()
         self.extreme_point_optimizer = ExtremePointPackingOptimizer()
         self.simulated_annealing_optimizer = SimulatedAnnealingPackingOptimizer()
+        self.wall_building_optimizer = WallBuildingPackingAlgorithm()
     
-    def pack(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[Sequence[BoxBase], float]:
         if self.algorithm == "genetic":
             return self.pack_with_genetic(goods, container_dimensions)
         elif self.algorithm == "best_fit":
@@ -711,60 +926,69 @@ class PackingAlgorithm:
             return self.pack_with_extreme_point(goods, container_dimensions)
         elif self.algorithm == "simulated_annealing":
             return self.pack_with_simulated_annealing(goods, container_dimensions)
+        elif self.algorithm == "wall_building":
+            return self.pack_with_wall_building(goods, container_dimensions)
         else:
             return self.pack_simple(goods, container_dimensions)
     
-    def pack_with_genetic(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack_with_genetic(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
         best_chromosome, best_fitness = self.genetic_optimizer.optimize(goods, container_dimensions)
         
         # Thực hiện đóng gói với chromosome tốt nhất
-        container = Container(**container_dimensions)
+        container = create_container(goods, container_dimensions)
         placed_boxes = self.genetic_optimizer.pack_chromosome(best_chromosome, container)
         
         return placed_boxes, container.get_utilization()
     
-    def pack_with_best_fit(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack_with_best_fit(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
         return self.best_fit_optimizer.pack(goods, container_dimensions)
     
-    def pack_with_extreme_point(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack_with_extreme_point(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
         return self.extreme_point_optimizer.pack(goods, container_dimensions)
     
-    def pack_with_simulated_annealing(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+    def pack_with_simulated_annealing(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
         return self.simulated_annealing_optimizer.pack(goods, container_dimensions)
     
-    def pack_simple(self, goods: List['Box'], container_dimensions: Dict) -> Tuple[List['Box'], float]:
-        container = Container(**container_dimensions)
+    def pack_with_wall_building(self, goods: Union[List['Box'], SkuTable],
+                                container_dimensions: Dict) -> Tuple[Sequence[BoxBase], float]:
+        # Xếp theo bức tường dựa trên container của thuật toán nâng cao (chỉ xoay quanh trục y)
+        return self.wall_building_optimizer.pack(as_sku_table(goods), container_dimensions, respect_groups=False)
+    
+    def pack_simple(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict) -> Tuple[List['Box'], float]:
+        # Sắp xếp theo thể tích giảm dần (trên bảng SKU)
+        table = as_sku_table(goods).sorted(key=lambda x: -x.volume)
+        container = create_container(table, container_dimensions)
+        prefilter(table, container_dimensions)
         placed_boxes = []
         
-        # Sắp xếp theo thể tích giảm dần
-        sorted_goods = sorted(goods, key=lambda x: x.volume, reverse=True)
-        
-        for box in sorted_goods:
-            position = self.find_best_position_simple(container, box)
-            if position:
+        for idx in range(len(table)):
+            while table.remaining[idx]:
+                box = table.take(idx, Box)
+                position = self.find_best_position_simple(container, box)
+                if not position:
+                    # Không gian trống chỉ thu hẹp dần nên các đơn vị giống hệt còn lại cũng không vừa
+                    table.discard(idx)
+                    break
                 x, y, z = position
                 container.place_box(box, x, y, z)
                 placed_boxes.append(box)
+                if residual_exhausted(container.free_volume(), table.skus, table.remaining):
+                    return placed_boxes, container.get_utilization()
         
         return placed_boxes, container.get_utilization()
     
     def find_best_position_simple(self, container: Container, box: 'Box') -> Optional[Tuple[float, float, float]]:
-        for _, _, space in container.space_heap:
-            for orientation in box.get_orientations():
-                if (space['width'] >= orientation['width'] and
-                    space['height'] >= orientation['height'] and
-                    space['depth'] >= orientation['depth']):
-                    
-                    if container.can_place(box, space['x'], space['y'], space['z']):
-                        return (space['x'], space['y'], space['z'])
+        for space in container.spaces_fitting_any(box.orientation_table()):
+            if container.can_place(box, space['x'], space['y'], space['z']):
+                return (space['x'], space['y'], space['z'])
         
         return None
     
     def set_algorithm(self, algorithm: str) -> None:
         self.algorithm = algorithm
     
-    def optimize_packing(self, goods: List['Box'], container_dimensions: Dict,
-                        iterations: int = 10) -> Tuple[List['Box'], float]:
+    def optimize_packing(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict,
+                        iterations: int = 10) -> Tuple[Sequence[BoxBase], float]:
         best_result = None
         best_utilization = 0
         for i in range(iterations):
@@ -0,0 +1,77 @@
+import itertools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Sự kiện tiến độ của một lần đóng gói (hiển thị trực tiếp qua WebSocket). Các thuật toán gọi
+# emit/plan tại các điểm có ý nghĩa: bắt đầu/kết thúc một pha, khi có phương án tốt nhất mới.
+# Không có listener thì các lời gọi không làm gì. Listener chỉ nhận sự kiện của tiến trình đã
+# cài nó: tiến trình con của process pool (kế thừa qua fork) bị bỏ qua vì tiến trình điều phối
+# đã báo kết quả của chúng.
+
+logger = logging.getLogger(__name__)
+
+PLACEMENT_CHUNK = 500  # Số box tối đa trong một sự kiện "placements"
+
+_listener: Optional[Callable[[Dict], None]] = None
+_owner_pid: Optional[int] = None
+_context: Dict[str, Any] = {}
+_muted = 0
+_plan_ids = itertools.count(1)
+
+
+def set_listener(listener: Optional[Callable[[Dict], None]]) -> None:
+    """Cài listener nhận sự kiện của tiến trình hiện tại (None để gỡ)"""
+    global _listener, _owner_pid
+    _listener = listener
+    _owner_pid = os.getpid() if listener is not None else None
+
+
+def enabled() -> bool:
+    return _listener is not None and not _muted and os.getpid() == _owner_pid
+
+
+def emit(event: str, **data: Any) -> None:
+    listener = _listener
+    if listener is None or not enabled():
+        return
+    try:
+        listener({"event": event, "time": time.time(), **_context, **data})
+    except Exception as e:
+        logger.warning(f"Không gửi được sự kiện tiến độ ({e})")
+
+
+def plan(boxes: List[Any], utilization: float, **data: Any) -> None:
+    """Báo một phương án mới: sự kiện "plan" rồi các box theo từng lô "placements" cùng mã phương án"""
+    if not enabled():
+        return
+    plan_id = next(_plan_ids)
+    emit("plan", plan=plan_id, utilization=utilization, boxes=len(boxes), **data)
+    for start in range(0, len(boxes), PLACEMENT_CHUNK):
+        emit("placements", plan=plan_id, boxes=[box.to_dict() for box in boxes[start:start + PLACEMENT_CHUNK]],
+             **data)
+
+
+@contextmanager
+def context(**values: Any) -> Iterator[None]:
+    """Gắn thêm các trường (vd. container) vào mọi sự kiện trong khối lệnh"""
+    previous = dict(_context)
+    _context.update(values)
+    try:
+        yield
+    finally:
+        _context.clear()
+        _context.update(previous)
+
+
+@contextmanager
+def muted() -> Iterator[None]:
+    """Tắt sự kiện trong khối lệnh (vd. các lần xếp thử không phải phương án thật)"""
+    global _muted
+    _muted += 1
+    try:
+        yield
+    finally:
+        _muted -= 1
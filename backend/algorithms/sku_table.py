@@ -0,0 +1,174 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+
+@dataclass
+class SkuType:
+    """Một loại hàng (SKU): kích thước, nhóm, khối lượng và danh sách đơn vị.
+
+    ``units`` giữ (id, name) của từng đơn vị theo đúng thứ tự đầu vào để kết quả
+    đóng gói vẫn trả về id của từng kiện như khi dùng danh sách Box.
+    """
+    width: float
+    height: float
+    depth: float
+    label: str
+    weight: float
+    units: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.volume = self.width * self.height * self.depth
+
+    @property
+    def quantity(self) -> int:
+        return len(self.units)
+
+    @property
+    def name(self) -> str:
+        return self.units[0][1] if self.units else ""
+
+    @property
+    def key(self) -> Tuple[float, float, float, str, float]:
+        return (self.width, self.height, self.depth, self.label, self.weight)
+
+
+class SkuTable:
+    """Bảng SKU (loại hàng + số lượng còn lại) thay cho danh sách Box từng đơn vị.
+
+    Các kiện giống hệt nhau được gom vào cùng một SKU nên vòng tìm ứng viên chỉ
+    duyệt các loại hàng khác nhau. Box chỉ được tạo (``take``) khi một đơn vị
+    thực sự được đặt. Mỗi bảng có bộ đếm ``remaining`` riêng; ``copy`` và
+    ``sorted`` trả về bảng mới với số lượng đầy đủ nên nhiều chiến lược có thể
+    dùng chung một bảng mà không ảnh hưởng nhau.
+    """
+
+    def __init__(self, skus: Iterable[SkuType]):
+        self.skus: List[SkuType] = list(skus)
+        self.remaining: List[int] = [sku.quantity for sku in self.skus]
+
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[Any]) -> 'SkuTable':
+        """Gom các Box giống nhau (kích thước, nhóm, khối lượng) thành SKU, giữ thứ tự xuất hiện"""
+        skus: Dict[Tuple, SkuType] = {}
+        for box in boxes:
+            key = (box.width, box.height, box.depth, box.label, box.weight)
+            sku = skus.get(key)
+            if sku is None:
+                sku = skus[key] = SkuType(box.width, box.height, box.depth, box.label, box.weight)
+            sku.units.append((box.id, box.name))
+        return cls(skus.values())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> 'SkuTable':
+        """Tạo bảng từ các dòng dạng dict có ``quantity`` (Excel, request API).
+
+        Nhóm lấy từ ``label`` hoặc ``group``; id lấy từ ``id`` hoặc ``name``.
+        Dòng có nhiều đơn vị được đánh id ``<id>-1``, ``<id>-2``...
+        """
+        skus: Dict[Tuple, SkuType] = {}
+        for row in rows:
+            quantity = int(row.get("quantity", 1))
+            if quantity <= 0:
+                continue
+            width, height, depth = float(row["width"]), float(row["height"]), float(row["depth"])
+            label = str(row.get("label", row.get("group", "")))
+            weight = float(row.get("weight", 0))
+            name = str(row["name"])
+            base_id = str(row.get("id", name))
+            key = (width, height, depth, label, weight)
+            sku = skus.get(key)
+            if sku is None:
+                sku = skus[key] = SkuType(width, height, depth, label, weight)
+            if quantity == 1:
+                sku.units.append((base_id, name))
+            else:
+                sku.units.extend((f"{base_id}-{j + 1}", name) for j in range(quantity))
+        return cls(skus.values())
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def __iter__(self) -> Iterator[SkuType]:
+        return iter(self.skus)
+
+    @property
+    def total_units(self) -> int:
+        return sum(sku.quantity for sku in self.skus)
+
+    @property
+    def remaining_units(self) -> int:
+        return sum(self.remaining)
+
+    @property
+    def total_volume(self) -> float:
+        return sum(sku.volume * sku.quantity for sku in self.skus)
+
+    def copy(self) -> 'SkuTable':
+        return SkuTable(self.skus)
+
+    def sorted(self, key: Callable[[SkuType], Any]) -> 'SkuTable':
+        """Bảng mới với các SKU sắp xếp theo key (số lượng đầy đủ)"""
+        return SkuTable(sorted(self.skus, key=key))
+
+    def take(self, index: int, box_cls: Callable[..., Any]) -> Any:
+        """Lấy đơn vị kế tiếp của SKU index và tạo Box tương ứng"""
+        sku = self.skus[index]
+        remaining = self.remaining[index]
+        if remaining <= 0:
+            raise ValueError(f"SKU {index} has no remaining units")
+        self.remaining[index] = remaining - 1
+        box_id, name = sku.units[sku.quantity - remaining]
+        return box_cls(box_id, sku.width, sku.height, sku.depth, name, sku.label, sku.weight)
+
+    def discard(self, index: int) -> int:
+        """Bỏ mọi đơn vị còn lại của SKU (không thể đặt thêm); trả về số đơn vị bị bỏ"""
+        dropped = self.remaining[index]
+        self.remaining[index] = 0
+        return dropped
+
+    def without(self, unit_ids: Iterable[str]) -> 'SkuTable':
+        """Bảng mới chỉ gồm các đơn vị không có trong unit_ids (vd. hàng chưa xếp sau một container)"""
+        excluded = set(unit_ids)
+        return self._filter_units(lambda box_id: box_id not in excluded)
+
+    def subset(self, unit_ids: Iterable[str]) -> 'SkuTable':
+        """Bảng mới chỉ gồm các đơn vị có trong unit_ids"""
+        included = set(unit_ids)
+        return self._filter_units(lambda box_id: box_id in included)
+
+    def _filter_units(self, keep: Callable[[str], bool]) -> 'SkuTable':
+        skus = []
+        for sku in self.skus:
+            units = [unit for unit in sku.units if keep(unit[0])]
+            if units:
+                skus.append(SkuType(sku.width, sku.height, sku.depth, sku.label, sku.weight, units))
+        return SkuTable(skus)
+
+    def unit_ids(self) -> List[str]:
+        return [box_id for sku in self.skus for box_id, _ in sku.units]
+
+    def expand(self, box_cls: Callable[..., Any]) -> List[Any]:
+        """Tạo danh sách Box cho mọi đơn vị (cho các thuật toán cần hoán vị từng kiện)"""
+        return [box_cls(box_id, sku.width, sku.height, sku.depth, name, sku.label, sku.weight)
+                for sku in self.skus for box_id, name in sku.units]
+
+
+def sku_indices(boxes: Iterable[Any]) -> List[int]:
+    """Chỉ số SKU của từng Box (cùng quy tắc gom nhóm với ``SkuTable.from_boxes``)"""
+    index: Dict[Tuple, int] = {}
+    return [index.setdefault((box.width, box.height, box.depth, box.label, box.weight), len(index))
+            for box in boxes]
+
+
+def as_sku_table(goods: Union[SkuTable, Iterable[Any]]) -> SkuTable:
+    """Nhận bảng SKU hoặc danh sách Box; luôn trả về bảng mới với số lượng đầy đủ"""
+    if isinstance(goods, SkuTable):
+        return goods.copy()
+    return SkuTable.from_boxes(goods)
+
+
+def as_box_list(goods: Union[SkuTable, List[Any]], box_cls: Callable[..., Any]) -> List[Any]:
+    """Nhận bảng SKU hoặc danh sách Box; trả về danh sách Box từng đơn vị"""
+    if isinstance(goods, SkuTable):
+        return goods.expand(box_cls)
+    return goods
@@ -0,0 +1,43 @@
+from typing import Any, List, Optional
+
+
+class UndoLog:
+    """Nhật ký hoàn tác cho việc đặt box vào container (checkpoint/rollback).
+
+    Mỗi lần ``place_box`` ghi một bản ghi chỉ chứa phần trạng thái bị thay đổi
+    (giá trị cũ, tham chiếu tới mảng cũ không bị sửa tại chỗ...), nên cả ghi lẫn
+    hoàn tác đều tốn O(số thay đổi) thay vì sao chép cả container. Chỉ ghi khi
+    đã mở checkpoint; ``release`` tắt ghi và giải phóng nhật ký.
+    """
+
+    def __init__(self):
+        self._records: Optional[List[Any]] = None
+
+    @property
+    def recording(self) -> bool:
+        return self._records is not None
+
+    def __len__(self) -> int:
+        return len(self._records) if self._records is not None else 0
+
+    def checkpoint(self) -> int:
+        """Bật ghi (nếu chưa) và trả về mã checkpoint là vị trí hiện tại trong nhật ký"""
+        if self._records is None:
+            self._records = []
+        return len(self._records)
+
+    def record(self, entry: Any) -> None:
+        if self._records is not None:
+            self._records.append(entry)
+
+    def pop_to(self, checkpoint: int) -> List[Any]:
+        """Lấy ra các bản ghi sau checkpoint, mới nhất trước"""
+        if self._records is None or not 0 <= checkpoint <= len(self._records):
+            raise ValueError(f"Invalid checkpoint: {checkpoint}")
+        popped = self._records[checkpoint:]
+        del self._records[checkpoint:]
+        popped.reverse()
+        return popped
+
+    def release(self) -> None:
+        self._records = None
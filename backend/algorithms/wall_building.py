@@ -0,0 +1,203 @@
+from typing import Dict, List, Optional, Tuple, Union
+from algorithms.bounds import compute_bounds, prefilter
+from algorithms.deadline import Deadline
+from algorithms.enhanced_packing_algorithm import Box, Container, EnhancedPackingAlgorithm
+from algorithms.layer_patterns import LayerPatternCache, flush_cache, layer_pattern
+from algorithms.occupancy_grid import choose_cell_size
+from algorithms.orientations import Orientation, orientation_table
+from algorithms.sku_table import SkuTable, SkuType, as_sku_table
+
+_EPS = 1e-3
+
+# Một box của bức tường: (chỉ số SKU, hướng xoay, x, y)
+WallPlacement = Tuple[int, Orientation, float, float]
+# Một khối lưới của bộ giải 2D: (chỉ số SKU, hướng xoay)
+Block = Tuple[int, Orientation]
+
+
+class WallBuildingPackingAlgorithm(EnhancedPackingAlgorithm):
+    """Xếp theo bức tường (kiểu George–Robinson) cho hàng ít SKU, số lượng lớn.
+
+    Container được lấp bằng các bức tường X–Y nối tiếp theo trục depth; chiều
+    sâu mỗi bức tường là depth của một SKU "định tường", chọn sao cho bức tường
+    được lấp đầy nhất. Mặt tường được lấp bằng bộ giải 2D guillotine: mỗi bước
+    đặt một khối lưới cột × hàng của một SKU, rồi lấp dải phía trên khối (chỉ
+    nhận box không sâu hơn khối nên luôn được đỡ toàn bộ) và dải bên phải (cùng
+    đáy). Khi SKU định tường đủ hàng cho cả một lớp, mẫu lớp tối ưu được lấy từ
+    cache ``layer_patterns`` thay vì tìm lại. Khi không còn bức tường nào đạt
+    ``min_wall_fill``, phần hàng còn lại được xếp bằng thuật toán extreme point
+    phía sau bức tường cuối.
+    """
+
+    def __init__(self, min_wall_fill: float = 0.8, pattern_cache: Optional[LayerPatternCache] = None):
+        super().__init__()
+        self.min_wall_fill = min_wall_fill  # Tỷ lệ lấp đầy tối thiểu để dựng một bức tường
+        self.pattern_cache = pattern_cache
+        self.walls: List[Dict] = []  # Các bức tường của lần chạy gần nhất
+
+    def pack(self, goods: Union[List['Box'], SkuTable], container_dimensions: Dict, respect_groups: bool = True,
+             time_limit: Optional[float] = 30, deadline: Optional[Deadline] = None) -> Tuple[List['Box'], float]:
+        if deadline is None:
+            deadline = Deadline(time_limit)
+        self.start_time = deadline.start
+        self.time_limit = time_limit
+        table = self._order_table(as_sku_table(goods), respect_groups)
+        self.bounds = compute_bounds(table, container_dimensions, Box.ROTATIONS)
+        container = Container(**container_dimensions, cell_size=choose_cell_size(table, container_dimensions))
+        prefilter(table, container_dimensions, Box.ROTATIONS)
+        sku_orientations = [orientation_table(sku.width, sku.height, sku.depth, Box.ROTATIONS) for sku in table.skus]
+
+        placed_boxes = []
+        self.walls = []
+        z = 0.0
+        while table.remaining_units and not deadline.expired():
+            wall = self._best_wall(table, sku_orientations, container, z, respect_groups)
+            if wall is None:
+                break
+            depth, placements, fill = wall
+            for idx, orientation, x, y in placements:
+                placed_boxes.append(self._place(table, idx, orientation, x, y, z, container))
+            self.walls.append({"z": z, "depth": depth, "boxes": len(placements), "fill": fill})
+            z += depth
+        utilization = container.get_utilization()
+        deadline.checkpoint("walls", utilization, utilization)
+
+        # Phần đuôi: hàng không dựng được bức tường đủ đầy
+        if table.remaining_units:
+            placed_boxes += self._pack_with_extreme_points(table, container, deadline, start_z=z)
+            utilization = container.get_utilization()
+            deadline.checkpoint("tail", utilization, utilization)
+        self.deadline_hit = deadline.hit
+        self.checkpoints = list(deadline.checkpoints)
+        flush_cache(self.pattern_cache)
+        return placed_boxes, utilization
+
+    def _best_wall(self, table: SkuTable, sku_orientations: List[Tuple[Orientation, ...]], container: Container,
+                   z: float, respect_groups: bool) -> Optional[Tuple[float, List[WallPlacement], float]]:
+        """Bức tường lấp đầy nhất bắt đầu tại z: (chiều sâu, các box, tỷ lệ lấp đầy), None nếu không đạt ngưỡng.
+
+        Với respect_groups, mỗi bức tường chỉ gồm hàng của một nhóm, xét các nhóm theo thứ tự của bảng.
+        """
+        available = [idx for idx, left in enumerate(table.remaining) if left]
+        if respect_groups:
+            labels = list(dict.fromkeys(table.skus[idx].label for idx in available))
+            groups = [[idx for idx in available if table.skus[idx].label == label] for label in labels]
+        else:
+            groups = [available]
+        face = container.width * container.height
+        for allowed in groups:
+            best = None
+            best_key = None
+            for idx in allowed:
+                for orientation in sku_orientations[idx]:
+                    w, h, depth, _ = orientation
+                    if (z + depth > container.depth + _EPS or w > container.width + _EPS
+                            or h > container.height + _EPS):
+                        continue
+                    # Dùng mẫu lớp có sẵn khi SKU đủ hàng, ngược lại tìm bằng bộ giải 2D
+                    counts = list(table.remaining)
+                    placements = self._pattern_wall(table.skus[idx], idx, depth, counts, allowed,
+                                                    sku_orientations, container)
+                    if placements is None:
+                        placements = self._fill_face(container.width, container.height, depth, counts, allowed,
+                                                     sku_orientations, (idx, orientation))
+                    volume = sum(o[0] * o[1] * o[2] for _, o, _, _ in placements)
+                    fill = volume / (face * depth)
+                    key = (round(fill, 9), volume)
+                    if best_key is None or key > best_key:
+                        best_key = key
+                        best = (depth, placements, fill)
+            if best is not None and best[2] >= self.min_wall_fill:
+                return best
+        return None
+
+    def _pattern_wall(self, sku: SkuType, idx: int, depth: float, counts: List[int], allowed: List[int],
+                      sku_orientations: List[Tuple[Orientation, ...]],
+                      container: Container) -> Optional[List[WallPlacement]]:
+        """Bức tường dựng từ mẫu lớp đã giải sẵn của SKU idx; None nếu SKU không đủ hàng cho cả mẫu.
+
+        Phần mặt tường mẫu không phủ (phía trên từng cột và dải bên phải) được
+        lấp tiếp bằng bộ giải 2D.
+        """
+        pattern = layer_pattern(container.width, container.height, sku.width, sku.height, sku.depth,
+                                Box.ROTATIONS, depth, self.pattern_cache)
+        if not pattern or len(pattern) > counts[idx]:
+            return None
+        counts[idx] -= len(pattern)
+        placements: List[WallPlacement] = []
+        columns: Dict[float, Tuple[float, float, float]] = {}  # x -> (rộng, đỉnh cột, sâu)
+        for x, y, w, h, d, index in pattern:
+            placements.append((idx, (w, h, d, index), x, y))
+            columns[x] = (w, max(columns.get(x, (w, 0.0, d))[1], y + h), d)
+        right = max(x + w for x, (w, _, _) in columns.items())
+        rects = [(x, top, w, container.height - top, d) for x, (w, top, d) in columns.items()
+                 if container.height - top >= _EPS]
+        if container.width - right >= _EPS:
+            rects.append((right, 0.0, container.width - right, container.height, depth))
+        return placements + self._fill_rects(rects, counts, allowed, sku_orientations)
+
+    def _fill_face(self, width: float, height: float, depth: float, counts: List[int], allowed: List[int],
+                   sku_orientations: List[Tuple[Orientation, ...]], first: Block) -> List[WallPlacement]:
+        """Bộ giải 2D: lấp mặt tường width × height (chiều sâu depth), khối đầu tiên là first"""
+        return self._fill_rects([(0.0, 0.0, width, height, depth)], counts, allowed, sku_orientations, first)
+
+    def _fill_rects(self, rects: List[Tuple[float, float, float, float, float]], counts: List[int],
+                    allowed: List[int], sku_orientations: List[Tuple[Orientation, ...]],
+                    first: Optional[Block] = None) -> List[WallPlacement]:
+        """Lấp các hình chữ nhật (x, y, rộng, cao, chiều sâu tối đa) của mặt tường bằng các khối lưới.
+
+        Dùng ngăn xếp thay cho đệ quy; first (nếu có) là khối của hình chữ nhật cuối danh sách.
+        """
+        placements: List[WallPlacement] = []
+        stack = list(rects)
+        block: Optional[Block] = first
+        while stack:
+            x, y, rect_width, rect_height, depth_limit = stack.pop()
+            if block is None:
+                block = self._best_block(rect_width, rect_height, depth_limit, counts, allowed, sku_orientations)
+                if block is None:
+                    continue
+            idx, orientation = block
+            block = None
+            w, h, d, _ = orientation
+            columns = min(int((rect_width + _EPS) // w), counts[idx])
+            rows = min(int((rect_height + _EPS) // h), counts[idx] // columns)
+            for row in range(rows):
+                for column in range(columns):
+                    placements.append((idx, orientation, x + column * w, y + row * h))
+            counts[idx] -= rows * columns
+            # Dải bên phải cùng đáy với hình chữ nhật; dải phía trên chỉ được khối đỡ nên không sâu hơn d
+            if rect_width - columns * w >= _EPS:
+                stack.append((x + columns * w, y, rect_width - columns * w, rect_height, depth_limit))
+            if rect_height - rows * h >= _EPS:
+                stack.append((x, y + rows * h, columns * w, rect_height - rows * h, d))
+        return placements
+
+    def _best_block(self, width: float, height: float, depth_limit: float, counts: List[int], allowed: List[int],
+                    sku_orientations: List[Tuple[Orientation, ...]]) -> Optional[Block]:
+        """Khối lưới có tổng thể tích lớn nhất vừa hình chữ nhật width × height"""
+        best = None
+        best_volume = 0.0
+        for idx in allowed:
+            if not counts[idx]:
+                continue
+            for orientation in sku_orientations[idx]:
+                w, h, d, _ = orientation
+                if w > width + _EPS or h > height + _EPS or d > depth_limit + _EPS:
+                    continue
+                columns = min(int((width + _EPS) // w), counts[idx])
+                rows = min(int((height + _EPS) // h), counts[idx] // columns)
+                volume = columns * rows * w * h * d
+                if volume > best_volume:
+                    best_volume = volume
+                    best = (idx, orientation)
+        return best
+
+    def _place(self, table: SkuTable, idx: int, orientation: Orientation, x: float, y: float, z: float,
+               container: Container) -> 'Box':
+        box = table.take(idx, Box)
+        box.width, box.height, box.depth, box.orientation = orientation
+        box.pos = (x, y, z)
+        box.placed = True
+        container.place_box(box, x, y, z)
+        return box
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import List, Optional
 
 class BoxRequest(BaseModel):
@@ -9,21 +9,61 @@ class BoxRequest(BaseModel):
     name: str
     label: str
     weight: float
+    quantity: int = 1  # Số đơn vị giống hệt của dòng hàng này
 
 class ContainerRequest(BaseModel):
     width: float
     height: float
     depth: float
 
+class ContainerTypeRequest(ContainerRequest):
+    name: str  # Vd. "20ft", "40ft", "40HC", "45HC"
+    cost: float = 1.0  # Chi phí mỗi container loại này
+
 class PackingRequest(BaseModel):
     goods: List[BoxRequest]
-    container: ContainerRequest
-    algorithm: str = "genetic"
+    container: Optional[ContainerRequest] = None  # Bỏ trống khi gửi container_catalog
+    container_catalog: List[ContainerTypeRequest] = []  # Danh mục loại container: chọn tổ hợp rẻ nhất chứa hết hàng
+    algorithm: str = "genetic"  # "beam": beam search; "wall": xếp theo bức tường; các giá trị khác dùng thuật toán nâng cao (tham lam)
     iterations: int = 5
+    time_limit: float = 90  # Giây; trả về phương án tốt nhất hiện có khi hết giờ
+    target_utilization: float = 0.8  # Dừng sớm khi đạt tỷ lệ sử dụng này
+    respect_groups: bool = True
+    beam_width: int = 4  # Số phương án giữ lại mỗi bước ở chế độ "beam" (lớn hơn: tốt hơn nhưng chậm hơn)
+    multi_container: bool = False  # Mở thêm container (cùng kích thước) cho tới khi xếp hết hàng
+    max_containers: int = 20  # Số container tối đa ở chế độ nhiều container
+    use_cache: bool = True  # False: luôn xếp lại, không dùng kết quả đã lưu của cùng lô hàng
+
+    @model_validator(mode="after")
+    def check_container(self):
+        if self.container is None and not self.container_catalog:
+            raise ValueError("Either container or container_catalog is required")
+        return self
 
 class PackingResponse(BaseModel):
     placed_boxes: List[dict]
     utilization: float
     total_volume: float
     used_volume: float
-    execution_time: float 
\ No newline at end of file
+    execution_time: float
+    deadline_hit: bool = False
+    target_utilization: Optional[float] = None
+    checkpoints: List[dict] = []  # Tỷ lệ sử dụng sau mỗi pha tìm kiếm
+    utilization_bound: Optional[float] = None  # Cận trên tỷ lệ sử dụng với một container
+    optimality_gap: Optional[float] = None  # utilization_bound - utilization: khoảng cách tối đa tới tối ưu
+    min_containers: Optional[int] = None  # Cận dưới số container cần để chứa hết hàng
+    unfit_units: int = 0  # Số kiện lớn hơn container theo mọi hướng xoay (bị loại trước khi xếp) 
+    containers: List[dict] = []  # Chế độ nhiều container: phương án từng container (index, placed_boxes, utilization, used_volume; type, dimensions, cost khi chọn từ danh mục)
+    container_count: int = 1
+    unplaced_boxes: List[str] = []  # Id các kiện không xếp được vào container nào
+    total_cost: Optional[float] = None  # Tổng chi phí các container khi chọn từ danh mục
+    container_candidates: List[dict] = []  # Kết quả đánh giá từng loại container trong danh mục
+    cache_hit: bool = False  # Kết quả lấy từ cache (cùng lô hàng, container và tham số đã được xếp trước đó)
+
+class JobResponse(BaseModel):
+    id: str
+    status: str  # "queued", "running", "done", "failed" hoặc "cancelled"
+    created_at: float
+    finished_at: Optional[float] = None
+    result: Optional[PackingResponse] = None  # Có khi status là "done"
+    error: Optional[str] = None  # Có khi status là "failed"
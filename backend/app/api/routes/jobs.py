@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from app.api.models.schemas import JobResponse, PackingRequest
+from app.services.job_service import PROGRESS_INTERVAL, JobQueueFull, ProgressStream, job_manager
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: PackingRequest):
+    """Đưa yêu cầu đóng gói vào hàng đợi, trả về id job ngay lập tức"""
+    try:
+        # submit tra cache (sha256 của request, đọc file): chạy ngoài event loop
+        job = await asyncio.to_thread(job_manager.submit, request, stream_progress=True)
+    except JobQueueFull as e:
+        logger.warning(f"Rejected packing job: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    logger.info(f"Created packing job {job.id} with {len(request.goods)} goods")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Trạng thái của job, kèm kết quả khi đã xong"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Huỷ job đang chờ; job đang chạy được dừng ở điểm kiểm tra kế tiếp và bị bỏ kết quả"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@router.websocket("/jobs/{job_id}/progress")
+async def job_progress(websocket: WebSocket, job_id: str):
+    """Gửi sự kiện tiến độ của job (pha, tỷ lệ sử dụng tốt nhất, các lô box) cho tới khi job kết thúc"""
+    await websocket.accept()
+    job = job_manager.get(job_id)
+    if job is None:
+        await websocket.close(code=4404, reason=f"Job {job_id} not found")
+        return
+    stream = ProgressStream(job)
+    try:
+        while True:
+            # Đọc queue tiến độ là lời gọi IPC chặn: chạy ngoài event loop
+            for message in await asyncio.to_thread(stream.next_messages):
+                await websocket.send_json(message)
+            if await asyncio.to_thread(lambda: stream.finished):
+                break
+            await asyncio.sleep(PROGRESS_INTERVAL)
+        status = job.to_dict()
+        await websocket.send_json({"event": "status", "status": status["status"], "error": status["error"],
+                                   "finished_at": status["finished_at"]})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Progress client of job {job_id} disconnected")
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.api.models.schemas import PackingRequest, PackingResponse
-from app.services.packing_service import pack_goods_service
+from app.services.job_service import JobQueueFull, job_manager
+import asyncio
 import logging
 import traceback
 
@@ -14,9 +15,15 @@ router = APIRouter()
 async def pack_goods(request: PackingRequest):
     try:
         logger.info(f"Received packing request with {len(request.goods)} goods")
-        result = pack_goods_service(request)
+        # Chạy trên process pool của hàng đợi job để không chặn event loop; không giữ job sau khi trả kết quả.
+        # submit tra cache (sha256 của request, đọc file) nên cũng chạy ngoài event loop
+        job = await asyncio.to_thread(job_manager.submit, request, keep_result=False)
+        result = await asyncio.wrap_future(job.future)
         logger.info("Packing completed successfully")
-        return result
+        return PackingResponse(**result)
+    except JobQueueFull as e:
+        logger.warning(f"Rejected packing request: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         # Log the full error with traceback
         error_msg = f"Error in pack_goods: {str(e)}"
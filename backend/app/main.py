@@ -1,8 +1,16 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import packing
+from app.api.routes import jobs, packing
+from app.services.job_service import job_manager
 
-app = FastAPI(title="Cargo Packing API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Dừng process pool của hàng đợi job khi tắt server
+    job_manager.shutdown()
+
+app = FastAPI(title="Cargo Packing API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware để frontend có thể gọi API
 app.add_middleware(
@@ -24,6 +32,7 @@ async def health_check():
 
 # Include API router
 app.include_router(packing.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,287 @@
+from app.api.models.schemas import PackingRequest
+from app.services.packing_service import pack_goods_service
+from app.services.result_cache import ResultCache, result_cache
+from algorithms import deadline, progress
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing.managers import SyncManager
+from queue import Empty
+from typing import Any, Dict, List, Optional
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Số tiến trình chạy job song song, số job tối đa đang chờ + đang chạy, thời gian giữ kết quả (giây)
+PACKING_WORKERS = int(os.getenv("PACKING_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PACKING_QUEUE_SIZE = int(os.getenv("PACKING_QUEUE_SIZE", "32"))
+PACKING_JOB_TTL = float(os.getenv("PACKING_JOB_TTL", "3600"))
+# Số tiến trình mỗi job được mở thêm cho thuật toán (0: chia đều số CPU cho các worker; 1: chạy tuần tự)
+PACKING_JOB_PROCESSES = int(os.getenv("PACKING_JOB_PROCESSES", "0"))
+# Luồng tiến độ qua WebSocket: khoảng cách tối thiểu giữa hai lượt gửi (giây), số box tối đa mỗi lượt
+PROGRESS_INTERVAL = float(os.getenv("PROGRESS_INTERVAL", "0.25"))
+PROGRESS_BATCH_SIZE = int(os.getenv("PROGRESS_BATCH_SIZE", "1000"))
+
+
+class JobQueueFull(Exception):
+    """Hàng đợi đã đầy: client nên thử lại sau"""
+
+
+@dataclass
+class PackingJob:
+    id: str
+    future: Future
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancelled: bool = False
+    progress_queue: Any = None  # Queue (proxy của manager) nhận sự kiện tiến độ từ tiến trình con
+    cancel_event: Any = None  # Event (proxy của manager): set để job đang chạy dừng ở điểm kiểm tra kế tiếp
+    events: List[Dict] = field(default_factory=list)  # Các sự kiện đã nhận, theo thứ tự
+    _events_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def status(self) -> str:
+        if self.cancelled or self.future.cancelled():
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def to_dict(self) -> Dict:
+        status = self.status
+        data = {"id": self.id, "status": status, "created_at": self.created_at, "finished_at": self.finished_at,
+                "result": None, "error": None}
+        if status == "done":
+            data["result"] = self.future.result()
+        elif status == "failed":
+            data["error"] = str(self.future.exception())
+        return data
+
+    def drain_events(self) -> int:
+        """Chuyển các sự kiện mới từ queue vào ``events``; trả về số sự kiện mới"""
+        if self.progress_queue is None:
+            return 0
+        with self._events_lock:
+            count = 0
+            while True:
+                try:
+                    self.events.append(self.progress_queue.get_nowait())
+                except (Empty, OSError, EOFError):
+                    return count
+                count += 1
+
+
+class ProgressStream:
+    """Đọc sự kiện tiến độ của một job theo từng lượt để gửi qua WebSocket.
+
+    Mỗi lượt trả về mọi sự kiện mới theo thứ tự, trong đó các lô box liên tiếp
+    của cùng một phương án được gộp thành một message và tổng số box mỗi lượt
+    không quá ``max_boxes``; phần còn lại để lượt sau. Gọi mỗi
+    ``PROGRESS_INTERVAL`` giây nên tải lớn không làm ngập socket.
+    """
+
+    def __init__(self, job: PackingJob, max_boxes: int = PROGRESS_BATCH_SIZE):
+        self.job = job
+        self.max_boxes = max_boxes
+        self._index = 0  # Sự kiện kế tiếp cần gửi
+        self._offset = 0  # Số box đã gửi của sự kiện placements đang dở
+
+    @property
+    def finished(self) -> bool:
+        """Job đã kết thúc và mọi sự kiện đã được gửi"""
+        return self.job.future.done() and self.job.drain_events() == 0 and self._index >= len(self.job.events)
+
+    def next_messages(self) -> List[Dict]:
+        self.job.drain_events()
+        events = self.job.events
+        messages: List[Dict] = []
+        batch: Optional[Dict] = None
+        budget = self.max_boxes
+        while self._index < len(events):
+            event = events[self._index]
+            if event["event"] != "placements":
+                if batch is not None:
+                    messages.append(batch)
+                    batch = None
+                messages.append(event)
+                self._index += 1
+                continue
+            if budget <= 0:
+                break
+            if batch is not None and batch["plan"] != event["plan"]:
+                messages.append(batch)
+                batch = None
+            if batch is None:
+                batch = dict(event, boxes=[])
+            boxes = event["boxes"][self._offset:self._offset + budget]
+            batch["boxes"].extend(boxes)
+            budget -= len(boxes)
+            self._offset += len(boxes)
+            if self._offset >= len(event["boxes"]):
+                self._index += 1
+                self._offset = 0
+        if batch is not None:
+            messages.append(batch)
+        return messages
+
+
+def _cached_events(result: Dict) -> List[Dict]:
+    """Sự kiện tiến độ của job lấy kết quả từ cache: phương án cuối cùng và các lô box của nó"""
+    now = time.time()
+    boxes = result["placed_boxes"]
+    events = [{"event": "started", "time": now, "cache_hit": True},
+              {"event": "plan", "time": now, "plan": 0, "utilization": result["utilization"], "boxes": len(boxes),
+               "final": True, "cache_hit": True}]
+    for start in range(0, len(boxes), progress.PLACEMENT_CHUNK):
+        events.append({"event": "placements", "time": now, "plan": 0,
+                       "boxes": boxes[start:start + progress.PLACEMENT_CHUNK], "final": True, "cache_hit": True})
+    return events
+
+
+def _run_job(payload: Dict, progress_queue: Any = None, max_workers: Optional[int] = None,
+             cancel_event: Any = None) -> Dict:
+    """Chạy một yêu cầu đóng gói trong tiến trình con (nhận/trả dict để truyền qua pickle).
+
+    max_workers giới hạn số tiến trình thuật toán mở thêm, để các worker chạy
+    đồng thời không cùng mở process pool cỡ số CPU. cancel_event được set thì
+    mọi hạn chót của lần đóng gói coi như đã hết và job kết thúc sớm.
+    """
+    if progress_queue is not None:
+        progress.set_listener(progress_queue.put)
+    deadline.set_cancel_token(cancel_event)
+    try:
+        progress.emit("started")
+        return pack_goods_service(PackingRequest(**payload), max_workers).model_dump()
+    finally:
+        progress.set_listener(None)  # Tiến trình của pool được dùng lại cho job khác
+        deadline.set_cancel_token(None)
+
+
+class JobManager:
+    """Hàng đợi job đóng gói chạy trên một process pool giới hạn.
+
+    Event loop của API chỉ gửi job vào pool và đọc trạng thái nên không bao giờ
+    bị một lần đóng gói dài chặn lại. Số job đang chờ + đang chạy bị giới hạn
+    bởi ``queue_size``; vượt quá thì ``submit`` ném ``JobQueueFull`` (API trả về
+    429). Job đang chờ được huỷ hẳn; job đang chạy nhận tín hiệu huỷ qua một
+    Event của manager, dừng ở điểm kiểm tra hạn chót kế tiếp và giải phóng
+    tiến trình ngay, kết quả dở dang bị bỏ. Có ``cache`` thì request
+    trùng nội dung với một job đã xong được trả kết quả ngay, không vào pool.
+    Mỗi job chỉ được mở ``job_processes`` tiến trình cho thuật toán (mặc định
+    chia đều số CPU cho các worker) nên tổng số tiến trình không vượt số CPU.
+    """
+
+    def __init__(self, workers: int = PACKING_WORKERS, queue_size: int = PACKING_QUEUE_SIZE,
+                 ttl: float = PACKING_JOB_TTL, cache: Optional[ResultCache] = None,
+                 job_processes: int = PACKING_JOB_PROCESSES):
+        self.workers = workers
+        self.job_processes = job_processes or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self.queue_size = queue_size
+        self.ttl = ttl  # Job đã xong quá lâu thì bị xoá khỏi bộ nhớ
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[SyncManager] = None  # Tạo queue tiến độ và event huỷ truyền được sang process pool
+        self._jobs: Dict[str, PackingJob] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    @property
+    def manager(self) -> SyncManager:
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager
+
+    def submit(self, request: PackingRequest, stream_progress: bool = False, keep_result: bool = True) -> PackingJob:
+        """Đưa request vào pool. keep_result=False (người gọi tự chờ future, vd. /api/pack): job chỉ nằm
+        trong danh sách khi đang chờ/chạy để tính vào giới hạn hàng đợi, xong là bị xoá ngay"""
+        self._purge()
+        cached = self.cache.get(request) if self.cache is not None and request.use_cache else None
+        if cached is not None:
+            return self._cached_job(cached, stream_progress, keep_result)
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.future.done())
+            if active >= self.queue_size:
+                raise JobQueueFull(f"{active} packing jobs queued or running (limit {self.queue_size})")
+            job_id = uuid.uuid4().hex
+            progress_queue = self.manager.Queue() if stream_progress else None
+            cancel_event = self.manager.Event()
+            args = (request.model_dump(), progress_queue, self.job_processes, cancel_event)
+            try:
+                future = self.executor.submit(_run_job, *args)
+            except BrokenProcessPool:
+                # Một tiến trình con đã chết (vd. hết bộ nhớ): tạo pool mới cho các job sau
+                logger.warning("Packing process pool is broken, restarting it")
+                self._executor = None
+                future = self.executor.submit(_run_job, *args)
+            job = PackingJob(job_id, future, progress_queue=progress_queue, cancel_event=cancel_event)
+            self._jobs[job_id] = job
+        future.add_done_callback(lambda _: self._finished(job, request, keep_result))
+        logger.info(f"Queued packing job {job_id} ({active + 1}/{self.queue_size} active)")
+        return job
+
+    def _cached_job(self, result: Dict, stream_progress: bool, keep_result: bool = True) -> PackingJob:
+        future: Future = Future()
+        future.set_result(result)
+        job = PackingJob(uuid.uuid4().hex, future, finished_at=time.time(),
+                         events=_cached_events(result) if stream_progress else [])
+        if keep_result:
+            with self._lock:
+                self._jobs[job.id] = job
+        logger.info(f"Packing job {job.id} served from result cache")
+        return job
+
+    def get(self, job_id: str) -> Optional[PackingJob]:
+        self._purge()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[PackingJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.future.done():
+                return job
+            if not job.future.cancel():
+                # Đang chạy: báo thuật toán dừng ở điểm kiểm tra kế tiếp, kết quả dở dang bị bỏ
+                logger.info(f"Packing job {job_id} is running, stopping it and discarding its result")
+                job.cancel_event.set()
+            job.cancelled = True
+            return job
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _finished(self, job: PackingJob, request: PackingRequest, keep_result: bool = True) -> None:
+        job.finished_at = time.time()
+        job.drain_events()
+        logger.info(f"Packing job {job.id} finished with status {job.status}")
+        if not keep_result:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+        if self.cache is not None and job.status == "done":
+            self.cache.put(request, job.future.result())
+
+    def _purge(self) -> None:
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and now - job.finished_at > self.ttl]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+job_manager = JobManager(cache=result_cache)
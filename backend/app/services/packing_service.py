@@ -1,44 +1,70 @@
 from app.api.models.schemas import PackingRequest, PackingResponse
-from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms import progress
+from algorithms.bounds import PackingBounds, compute_bounds
+from algorithms.container_selection import ContainerSelector, ContainerType
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.multi_container import MultiContainerPacker, create_algorithm, run_algorithm
+from algorithms.sku_table import SkuTable
+from typing import Optional
 import time
 import logging
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def pack_goods_service(request: PackingRequest):
+SUPPORT_THRESHOLD = 0.7  # Ngưỡng hỗ trợ tối ưu
+
+def pack_goods_service(request: PackingRequest, max_workers: Optional[int] = None):
+    """Xếp hàng theo request; max_workers giới hạn số tiến trình các thuật toán được mở (None: theo số CPU)"""
     try:
         logger.info("Starting packing service...")
-        goods = [Box(**box.model_dump()) for box in request.goods]
-        logger.info(f"Created {len(goods)} boxes from request")
+        # Gom các dòng hàng thành bảng SKU (loại hàng + số lượng) thay vì từng Box
+        goods = SkuTable.from_rows(box.model_dump() for box in request.goods)
+        logger.info(f"Created {len(goods)} SKUs ({goods.total_units} units) from request")
+        
+        if request.container_catalog or request.container is None:
+            return _pack_container_catalog(request, goods, max_workers)
         
         container = request.container.model_dump()
         logger.info(f"Container dimensions: {container}")
         
         # Lấy thông số từ request
-        time_limit = getattr(request, 'time_limit', 90)  # Tăng thời gian mặc định lên 90 giây
-        respect_groups = getattr(request, 'respect_groups', True)  # Mặc định tôn trọng nhóm
+        time_limit = request.time_limit  # Hạn chót cho toàn bộ quá trình tìm kiếm
+        respect_groups = request.respect_groups
+        target_utilization = request.target_utilization  # Đạt mức này thì dừng sớm
         
-        logger.info(f"Using time limit: {time_limit}s, respect_groups: {respect_groups}")
+        logger.info(f"Using time limit: {time_limit}s, respect_groups: {respect_groups}, "
+                    f"target utilization: {target_utilization:.2%}")
 
         # Sử dụng thuật toán đóng gói nâng cao
         start_time = time.time()
         
-        logger.info("Starting Enhanced Packing Algorithm...")
-        packing_algo = EnhancedPackingAlgorithm()
+        if request.multi_container:
+            return _pack_multi_container(request, goods, container, start_time, max_workers)
+        
+        if request.algorithm == "beam":
+            logger.info(f"Starting Beam Search (beam width {request.beam_width})...")
+        elif request.algorithm == "wall":
+            logger.info("Starting Wall Building Algorithm...")
+        else:
+            logger.info("Starting Enhanced Packing Algorithm...")
         
         # Sử dụng ngưỡng hỗ trợ tối ưu từ kết quả kiểm tra
-        packing_algo.support_threshold = 0.7  # Ngưỡng hỗ trợ tối ưu
+        packing_algo = create_algorithm(request.algorithm, request.beam_width, SUPPORT_THRESHOLD, max_workers)
         logger.info(f"Using support threshold: {packing_algo.support_threshold}")
         
-        placed_boxes, utilization = packing_algo.optimize_packing(
-            goods, 
-            container, 
+        # Beam search / xếp tường tự dừng theo hạn chót và trả về phương án tốt nhất đã gặp
+        placed_boxes, utilization = run_algorithm(
+            packing_algo,
+            goods,
+            container,
             respect_groups=respect_groups,
-            time_limit=time_limit
+            time_limit=time_limit,
+            target_utilization=target_utilization
         )
         
-        logger.info(f"Packing completed with {len(placed_boxes)}/{len(goods)} boxes placed")
+        progress.plan(placed_boxes, utilization, final=True)
+        logger.info(f"Packing completed with {len(placed_boxes)}/{goods.total_units} boxes placed")
         logger.info(f"Utilization: {utilization:.2%}")
         
         total_volume = container["width"] * container["height"] * container["depth"]
@@ -48,22 +74,158 @@ def pack_goods_service(request: PackingRequest):
         logger.info(f"Packing completed in {exec_time:.2f} seconds")
         logger.info(f"Total volume: {total_volume}, Used volume: {used_volume}")
         
-        # Kiểm tra xem đã đạt mục tiêu 80% chưa
-        target_utilization = 0.8
+        bounds = _run_bounds(packing_algo.bounds, goods, container)
+        logger.info(f"Utilization bound: {bounds.utilization_bound:.2%} (gap ≤ {bounds.gap(utilization):.2%}), "
+                    f"at least {bounds.min_containers} container(s) for all goods")
+        if bounds.unfit_units:
+            logger.warning(f"{bounds.unfit_units} units do not fit the container in any orientation")
+        
+        if packing_algo.deadline_hit:
+            logger.warning(f"Time limit of {time_limit}s reached, returning best plan found so far")
+        
+        # Kiểm tra xem đã đạt mục tiêu chưa
         if utilization < target_utilization:
             logger.warning(f"Utilization {utilization:.2%} is below target {target_utilization:.2%}")
         else:
             logger.info(f"Target utilization of {target_utilization:.2%} achieved ✓")
         
         return PackingResponse(
-            placed_boxes=[b.__dict__ for b in placed_boxes],
+            placed_boxes=[b.to_dict() for b in placed_boxes],
             utilization=utilization,
             total_volume=total_volume,
             used_volume=used_volume,
-            execution_time=exec_time
+            execution_time=exec_time,
+            deadline_hit=packing_algo.deadline_hit,
+            target_utilization=target_utilization,
+            checkpoints=packing_algo.checkpoints,
+            utilization_bound=bounds.utilization_bound,
+            optimality_gap=bounds.gap(utilization),
+            min_containers=bounds.min_containers,
+            unfit_units=bounds.unfit_units,
+            unplaced_boxes=sorted(set(goods.unit_ids()) - {b.id for b in placed_boxes})
         )
     except Exception as e:
         logger.error(f"Error in pack_goods_service: {str(e)}")
         import traceback
         logger.error(f"Full traceback: {traceback.format_exc()}")
-        raise 
\ No newline at end of file
+        raise
+
+def _run_bounds(bounds: Optional[PackingBounds], goods: SkuTable, container: dict) -> PackingBounds:
+    """Cận do thuật toán tính trong lần chạy; tính lại nếu thuật toán không báo"""
+    return bounds if bounds is not None else compute_bounds(goods, container, Box.ROTATIONS)
+
+def _pack_multi_container(request: PackingRequest, goods: SkuTable, container: dict, start_time: float,
+                          max_workers: Optional[int] = None):
+    """Chế độ nhiều container: mở thêm container cùng kích thước cho tới khi xếp hết hàng"""
+    logger.info(f"Starting multi-container packing ({request.algorithm}, at most {request.max_containers} containers)...")
+    packer = MultiContainerPacker(request.algorithm, request.beam_width, SUPPORT_THRESHOLD, request.max_containers,
+                                  max_workers)
+    plans, unplaced = packer.pack(
+        goods,
+        container,
+        respect_groups=request.respect_groups,
+        time_limit=request.time_limit,
+        target_utilization=request.target_utilization
+    )
+    
+    container_volume = container["width"] * container["height"] * container["depth"]
+    total_volume = container_volume * len(plans)
+    used_volume = sum(plan.used_volume for plan in plans)
+    utilization = used_volume / total_volume if total_volume > 0 else 0
+    exec_time = time.time() - start_time
+    
+    bounds = _run_bounds(packer.bounds, goods, container)
+    logger.info(f"Packed into {len(plans)} container(s) (lower bound {bounds.min_containers}) "
+                f"in {exec_time:.2f} seconds, overall utilization {utilization:.2%}")
+    if unplaced:
+        logger.warning(f"{len(unplaced)} units could not be placed in any container")
+    if packer.deadline_hit:
+        logger.warning(f"Time limit of {request.time_limit}s reached, returning best plan found so far")
+    
+    containers = []
+    placed_boxes = []
+    for index, plan in enumerate(plans):
+        boxes = [dict(b.to_dict(), container=index) for b in plan.boxes]
+        placed_boxes.extend(boxes)
+        containers.append({
+            "index": index,
+            "placed_boxes": boxes,
+            "utilization": plan.utilization,
+            "used_volume": plan.used_volume
+        })
+    
+    return PackingResponse(
+        placed_boxes=placed_boxes,
+        utilization=utilization,
+        total_volume=total_volume,
+        used_volume=used_volume,
+        execution_time=exec_time,
+        deadline_hit=packer.deadline_hit,
+        target_utilization=request.target_utilization,
+        checkpoints=packer.checkpoints,
+        min_containers=bounds.min_containers,
+        unfit_units=bounds.unfit_units,
+        containers=containers,
+        container_count=len(plans),
+        unplaced_boxes=unplaced
+    )
+
+def _pack_container_catalog(request: PackingRequest, goods: SkuTable, max_workers: Optional[int] = None):
+    """Chọn tổ hợp container rẻ nhất từ danh mục và xếp hàng vào từng container"""
+    catalog = [ContainerType(**item.model_dump()) for item in request.container_catalog]
+    logger.info(f"Selecting containers from catalog: {[(t.name, t.cost) for t in catalog]}")
+    start_time = time.time()
+    selector = ContainerSelector(request.algorithm, request.beam_width, SUPPORT_THRESHOLD, request.max_containers,
+                                 max_workers)
+    selection = selector.select(
+        goods,
+        catalog,
+        respect_groups=request.respect_groups,
+        time_limit=request.time_limit,
+        target_utilization=request.target_utilization
+    )
+    
+    total_volume = selection.volume
+    used_volume = sum(plan.used_volume for _, plan in selection.containers)
+    utilization = used_volume / total_volume if total_volume > 0 else 0
+    exec_time = time.time() - start_time
+    
+    for candidate in selector.candidates:
+        logger.info(f"Container type {candidate['name']}: {candidate['status']}, "
+                    f"cost bound {candidate['cost_bound']}, total cost {candidate.get('total_cost')}")
+    logger.info(f"Selected {[t.name for t, _ in selection.containers]} with total cost {selection.cost} "
+                f"in {exec_time:.2f} seconds, overall utilization {utilization:.2%}")
+    if selection.unplaced:
+        logger.warning(f"{len(selection.unplaced)} units could not be placed in any container")
+    if selector.deadline_hit:
+        logger.warning(f"Time limit of {request.time_limit}s reached, returning best plan found so far")
+    
+    containers = []
+    placed_boxes = []
+    for index, (container_type, plan) in enumerate(selection.containers):
+        boxes = [dict(b.to_dict(), container=index) for b in plan.boxes]
+        placed_boxes.extend(boxes)
+        containers.append({
+            "index": index,
+            "type": container_type.name,
+            "dimensions": container_type.dimensions,
+            "cost": container_type.cost,
+            "placed_boxes": boxes,
+            "utilization": plan.utilization,
+            "used_volume": plan.used_volume
+        })
+    
+    return PackingResponse(
+        placed_boxes=placed_boxes,
+        utilization=utilization,
+        total_volume=total_volume,
+        used_volume=used_volume,
+        execution_time=exec_time,
+        deadline_hit=selector.deadline_hit,
+        target_utilization=request.target_utilization,
+        containers=containers,
+        container_count=len(containers),
+        unplaced_boxes=selection.unplaced,
+        total_cost=selection.cost,
+        container_candidates=selector.candidates
+    )
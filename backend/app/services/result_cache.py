@@ -0,0 +1,196 @@
+from app.api.models.schemas import PackingRequest
+from algorithms.sku_table import SkuTable
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Số kết quả giữ trong bộ nhớ, thời gian sống (giây, <= 0 để tắt cache), thư mục lưu xuống đĩa
+# (rỗng: chỉ giữ trong bộ nhớ) và số file tối đa trong thư mục đó
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "128"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "")
+RESULT_CACHE_DISK_SIZE = int(os.getenv("RESULT_CACHE_DISK_SIZE", "1024"))
+# Tăng khi thuật toán thay đổi kết quả để bỏ các kết quả cũ đã lưu trên đĩa
+RESULT_CACHE_VERSION = 1
+
+# Đơn vị hàng của từng SKU (theo thứ tự của khoá): [(id, name), ...]
+SkuUnits = List[List[Tuple[str, str]]]
+
+
+def request_key(request: PackingRequest) -> Tuple[str, SkuUnits]:
+    """Khoá cache (sha256 của dạng chuẩn của request) và đơn vị hàng của từng SKU.
+
+    Các dòng hàng giống nhau được gom thành SKU và sắp xếp, id/tên từng kiện
+    không thuộc khoá: cùng một lô hàng gửi lại với thứ tự dòng hoặc id khác vẫn
+    trùng khoá, kết quả được đổi id theo ``SkuUnits``.
+    """
+    goods = SkuTable.from_rows(box.model_dump() for box in request.goods)
+    skus = sorted(goods, key=lambda sku: sku.key)
+    params = request.model_dump(exclude={"goods", "use_cache"})
+    params["container_catalog"] = sorted(params["container_catalog"], key=lambda t: json.dumps(t, sort_keys=True))
+    canonical = {
+        "version": RESULT_CACHE_VERSION,
+        "goods": [[*sku.key, sku.quantity] for sku in skus],
+        "params": params
+    }
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest, [list(sku.units) for sku in skus]
+
+
+def _remap_units(result: Dict, stored: SkuUnits, units: SkuUnits) -> Dict:
+    """Đổi id/tên kiện trong kết quả đã lưu sang các kiện (cùng SKU, cùng vị trí) của request mới"""
+    if stored == units:
+        return result
+    mapping = {old[0]: new for old_units, new_units in zip(stored, units)
+               for old, new in zip(old_units, new_units)}
+
+    def remap_box(box: Dict) -> Dict:
+        box_id, name = mapping.get(box["id"], (box["id"], box.get("name")))
+        return dict(box, id=box_id, name=name)
+
+    result = dict(result)
+    result["placed_boxes"] = [remap_box(box) for box in result["placed_boxes"]]
+    result["containers"] = [dict(container, placed_boxes=[remap_box(box) for box in container["placed_boxes"]])
+                            for container in result.get("containers", [])]
+    result["unplaced_boxes"] = [mapping.get(box_id, (box_id,))[0] for box_id in result.get("unplaced_boxes", [])]
+    return result
+
+
+class ResultCache:
+    """Cache kết quả đóng gói theo nội dung request (LRU trong bộ nhớ + thư mục JSON tuỳ chọn).
+
+    Mỗi kết quả được lưu kèm đơn vị hàng của request đã tạo ra nó để trả lại
+    cho request khác có cùng khoá. Tầng đĩa lưu mỗi kết quả một file
+    ``<khoá>.json`` nên dùng chung được giữa các lần khởi động và nhiều tiến
+    trình; quá ``max_disk_entries`` file thì xoá các file cũ nhất.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL,
+                 path: Optional[str] = None, max_disk_entries: int = RESULT_CACHE_DISK_SIZE):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = os.path.expanduser(path) if path else None
+        self.max_disk_entries = max_disk_entries
+        # khoá -> (thời điểm lưu, kết quả, đơn vị hàng)
+        self._entries: 'OrderedDict[str, Tuple[float, Dict, SkuUnits]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and (self.max_entries > 0 or self.path is not None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, request: PackingRequest) -> Optional[Dict]:
+        """Kết quả đã lưu cho request (đã đổi sang id kiện của request, ``cache_hit`` = True) hoặc None"""
+        if not self.enabled:
+            return None
+        key, units = request_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            else:
+                self._entries.move_to_end(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+        _, result, stored = entry
+        result = _remap_units(copy.deepcopy(result), stored, units)
+        result["cache_hit"] = True
+        return result
+
+    def put(self, request: PackingRequest, result: Dict) -> None:
+        if not self.enabled:
+            return
+        key, units = request_key(request)
+        entry = (time.time(), dict(result, cache_hit=False), units)
+        with self._lock:
+            self._remember(key, entry)
+            self._save(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                for name in self._disk_files(self.path):
+                    self._remove(self.path, name)
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl
+
+    def _remember(self, key: str, entry: Tuple[float, Dict, SkuUnits]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _file(self, path: str, key: str) -> str:
+        return os.path.join(path, f"{key}.json")
+
+    def _disk_files(self, path: str) -> List[str]:
+        if not os.path.isdir(path):
+            return []
+        return [name for name in os.listdir(path) if name.endswith(".json")]
+
+    def _remove(self, path: str, name: str) -> None:
+        try:
+            os.remove(os.path.join(path, name))
+        except OSError:
+            pass
+
+    def _load(self, key: str) -> Optional[Tuple[float, Dict, SkuUnits]]:
+        path = self.path
+        if not path:
+            return None
+        try:
+            with open(self._file(path, key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = (float(data["stored_at"]), data["result"], [[tuple(unit) for unit in sku] for sku in data["units"]])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # Chưa có, hỏng hoặc không đọc được: coi như chưa lưu
+        if self._expired(entry[0]):
+            self._remove(path, f"{key}.json")
+            return None
+        return entry
+
+    def _save(self, key: str, entry: Tuple[float, Dict, SkuUnits]) -> None:
+        path = self.path
+        if not path:
+            return
+        stored_at, result, units = entry
+        try:
+            os.makedirs(path, exist_ok=True)
+            temporary = f"{self._file(path, key)}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "result": result, "units": units}, f)
+            os.replace(temporary, self._file(path, key))
+            files = self._disk_files(path)
+            if len(files) > self.max_disk_entries:
+                files.sort(key=lambda name: os.path.getmtime(os.path.join(path, name)))
+                for name in files[:len(files) - self.max_disk_entries]:
+                    self._remove(path, name)
+        except OSError as e:
+            logger.warning(f"Could not write result cache file ({e}), keeping it in memory only")
+
+
+result_cache = ResultCache(path=RESULT_CACHE_DIR)
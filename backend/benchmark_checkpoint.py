@@ -0,0 +1,83 @@
+import time
+from typing import Dict
+from algorithms import enhanced_packing_algorithm as enhanced
+from algorithms import packing_algorithm as legacy
+from algorithms.occupancy_grid import choose_cell_size
+from benchmark_spatial_index import CONTAINER, build_boxes
+
+ROUNDS = 20
+TAIL = 10  # Số box được đặt rồi hoàn tác trong mỗi vòng
+MAX_LOG_OVERHEAD = 2.0  # Ghi nhật ký chỉ được làm chậm place_box tối đa bấy nhiêu lần
+
+
+def place_all(container, boxes):
+    for box in boxes:
+        x, y, z = box.pos
+        container.place_box(box.clone(), x, y, z)
+
+
+def bench(make_container, boxes):
+    """Đặt sẵn các box trừ TAIL box cuối, rồi đo các cách thử đặt TAIL box và quay lại"""
+    prefix, tail = boxes[:-TAIL], boxes[-TAIL:]
+    timings: Dict[str, float] = {"place": 0.0, "place+log": 0.0, "rollback": 0.0, "rebuild": 0.0}
+
+    # Không ghi nhật ký: dựng lại phần đã đặt mỗi vòng
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        container = make_container()
+        place_all(container, prefix)
+        timings["rebuild"] += time.perf_counter() - start
+        start = time.perf_counter()
+        place_all(container, tail)
+        timings["place"] += time.perf_counter() - start
+
+    # Ghi nhật ký: checkpoint → đặt → rollback trên cùng một container
+    container = make_container()
+    place_all(container, prefix)
+    for _ in range(ROUNDS):
+        checkpoint = container.checkpoint()
+        start = time.perf_counter()
+        place_all(container, tail)
+        timings["place+log"] += time.perf_counter() - start
+        start = time.perf_counter()
+        container.rollback(checkpoint)
+        timings["rollback"] += time.perf_counter() - start
+
+    # Cách cũ của legacy Container: sao chép cả container trước khi thử (không có "clone" nếu không hỗ trợ)
+    if hasattr(container, "clone"):
+        timings["clone"] = 0.0
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            container.clone()
+            timings["clone"] += time.perf_counter() - start
+    return timings
+
+
+def main():
+    boxes = build_boxes(400)
+    cell_size = choose_cell_size(boxes, CONTAINER)
+    variants = {
+        "enhanced": lambda: enhanced.Container(CONTAINER["width"], CONTAINER["height"], CONTAINER["depth"],
+                                               cell_size=cell_size),
+        "legacy": lambda: legacy.Container(CONTAINER["width"], CONTAINER["height"], CONTAINER["depth"],
+                                           cell_size=cell_size),
+    }
+    print(f"📦 {len(boxes)} box, mỗi vòng đặt rồi hoàn tác {TAIL} box cuối × {ROUNDS} vòng")
+    print("place/place+log/rollback: µs mỗi box; rebuild/clone: µs mỗi lần khôi phục trạng thái")
+    print(f'{"Container":<10} {"place":>9} {"place+log":>10} {"rollback":>9} {"rebuild":>10} {"clone":>10}')
+    print('-' * 63)
+    for name, make_container in variants.items():
+        t = bench(make_container, boxes)
+        per_box = ROUNDS * TAIL
+        clone = f"{t['clone'] / ROUNDS * 1e6:>10.0f}" if "clone" in t else f'{"-":>10}'
+        print(f"{name:<10} {t['place'] / per_box * 1e6:>9.0f} {t['place+log'] / per_box * 1e6:>10.0f} "
+              f"{t['rollback'] / per_box * 1e6:>9.0f} {t['rebuild'] / ROUNDS * 1e6:>10.0f} {clone}")
+        # Bản ghi hoàn tác chỉ chứa phần thay đổi của box vừa đặt nên chi phí ghi không phụ thuộc số box đã đặt
+        assert t["place+log"] <= MAX_LOG_OVERHEAD * t["place"], \
+            f"{name}: place+log chậm hơn place {t['place+log'] / t['place']:.1f} lần"
+    # Chi phí rollback tỷ lệ với số box được hoàn tác; rebuild và clone tỷ lệ với cả container
+    # (clone của legacy sao chép nguyên lưới chiếm chỗ nên đắt dần khi cell nhỏ/container lớn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import random
+import time
+import numpy as np
+from algorithms.enhanced_packing_algorithm import Box, Container, EnhancedPackingAlgorithm
+
+CONTAINER = {"width": 2340, "height": 2694, "depth": 12117}  # 40ft
+SKUS = [(200, 150, 100, "1"), (100, 100, 100, "2"), (150, 120, 80, "3"), (120, 90, 110, "1")]
+CANDIDATES = 64
+
+
+def build_container(count: int) -> Container:
+    """Xếp count box thành các hàng/lớp đặt sát nhau (có box kề, cùng lớp, nhiều nhóm)"""
+    container = Container(CONTAINER["width"], CONTAINER["height"], CONTAINER["depth"], cell_size=50)
+    x = y = z = 0.0
+    row_height = layer_depth = 0.0
+    for i in range(count):
+        w, h, d, label = SKUS[i % len(SKUS)]
+        if x + w > CONTAINER["width"]:
+            x, y = 0.0, y + row_height
+            row_height = 0.0
+        if y + h > CONTAINER["height"]:
+            x, y, z = 0.0, 0.0, z + layer_depth
+            layer_depth = 0.0
+        container.place_box(Box(str(i), w, h, d, f"Box {i}", label, 10), x, y, z)
+        x += w
+        row_height = max(row_height, h)
+        layer_depth = max(layer_depth, d)
+    return container
+
+
+def build_candidates(container: Container, prototypes):
+    """Ứng viên tại các góc của box đã đặt (nhiều cặp kề nhau) và một số vị trí ngẫu nhiên"""
+    candidates = []
+    for _ in range(CANDIDATES):
+        index = random.randrange(len(prototypes))
+        orientation = random.choice(prototypes[index].orientation_table())
+        other = random.choice(container.boxes)
+        if random.random() < 0.8:
+            x, y, z = other.x + other.width, other.y, other.z
+        else:
+            x, y, z = (random.uniform(0, CONTAINER["width"]), random.uniform(0, CONTAINER["height"]),
+                       random.uniform(0, CONTAINER["depth"]))
+        candidates.append((index, orientation, x, y, z))
+    return candidates
+
+
+def main():
+    random.seed(7)
+    algorithm = EnhancedPackingAlgorithm()
+    prototypes = [Box("", w, h, d, f"SKU {label}", label, 10) for w, h, d, label in SKUS]
+    print(f"🎯 {CANDIDATES} ứng viên mỗi lần chấm điểm")
+    print(f'{"Box đã đặt":>10} {"vô hướng":>12} {"theo lô":>10} {"tăng tốc":>9} {"lệch tối đa":>12}')
+    print('-' * 58)
+    for count in (500, 2000, 5000):
+        container = build_container(count)
+        candidates = build_candidates(container, prototypes)
+
+        start = time.perf_counter()
+        scalar = []
+        for index, orientation, x, y, z in candidates:
+            box = prototypes[index].clone()
+            box.width, box.height, box.depth, box.orientation = orientation
+            scalar.append(algorithm._calculate_position_score(box, x, y, z, container))
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = algorithm._calculate_position_scores(prototypes, candidates, container)
+        batched_time = time.perf_counter() - start
+
+        difference = float(np.max(np.abs(np.array(scalar) - batched)))
+        print(f"{len(container.boxes):>10} {scalar_time * 1000:>10.1f}ms {batched_time * 1000:>8.1f}ms "
+              f"{scalar_time / batched_time:>8.1f}x {difference:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import random
+import time
+from algorithms.enhanced_packing_algorithm import Box, OptimizedSpatialIndex
+from algorithms.occupancy_grid import choose_cell_size
+
+CONTAINER = {"width": 2340, "height": 2694, "depth": 12117}  # 40ft
+SKUS = [(700, 960, 690), (500, 500, 500), (800, 400, 600), (300, 250, 420)]
+
+
+def build_boxes(count: int):
+    """Xếp các box thành lưới đơn giản theo từng hàng để có tập vị trí không giao nhau.
+
+    Dừng khi container đầy nên có thể trả về ít hơn count box.
+    """
+    boxes = []
+    x = y = z = 0.0
+    row_height = layer_depth = 0.0
+    for i in range(count):
+        w, h, d = SKUS[i % len(SKUS)]
+        if x + w > CONTAINER["width"]:
+            x, y = 0.0, y + row_height
+            row_height = 0.0
+        if y + h > CONTAINER["height"]:
+            x, y, z = 0.0, 0.0, z + layer_depth
+            layer_depth = 0.0
+        if z + d > CONTAINER["depth"]:
+            break
+        box = Box(str(i), w, h, d, f"Box {i}", str(i % len(SKUS)), 10)
+        box.position = {"x": x, "y": y, "z": z}
+        boxes.append(box)
+        x += w
+        row_height = max(row_height, h)
+        layer_depth = max(layer_depth, d)
+    return boxes
+
+
+def run(mode: str, boxes, queries, cell_size=None):
+    index = OptimizedSpatialIndex(CONTAINER["width"], CONTAINER["height"], CONTAINER["depth"],
+                                  cell_size=cell_size, mode=mode)
+    start = time.perf_counter()
+    for box in boxes:
+        index.add_box(box)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = 0
+    for w, h, d, x, y, z in queries:
+        hits += index.check_collision(w, h, d, x, y, z)
+    query_time = time.perf_counter() - start
+    return add_time, query_time, hits, index.cell_size
+
+
+def main():
+    random.seed(42)
+    requested = 400
+    boxes = build_boxes(requested)
+    queries = []
+    for _ in range(5000):
+        w, h, d = random.choice(SKUS)
+        queries.append((w, h, d,
+                        random.uniform(0, CONTAINER["width"] - w),
+                        random.uniform(0, CONTAINER["height"] - h),
+                        random.uniform(0, CONTAINER["depth"] - d)))
+
+    print(f"📦 {len(boxes)}/{requested} box đã đặt (container đầy), {len(queries)} truy vấn va chạm"
+          if len(boxes) < requested else f"📦 {len(boxes)} box đã đặt, {len(queries)} truy vấn va chạm")
+    auto_cell = choose_cell_size(boxes, CONTAINER)
+    results = {
+        "dict (cell=50)": run("dict", boxes, queries),
+        f"dense (auto cell={auto_cell:g})": run("dense", boxes, queries, auto_cell),
+    }
+    print(f'{"Chế độ":<28} {"add_box":>10} {"check_collision":>16} {"va chạm":>8} {"cell":>7}')
+    print('-' * 73)
+    for name, (add_time, query_time, hits, cell) in results.items():
+        print(f"{name:<28} {add_time * 1000:>8.1f}ms {query_time * 1000:>14.1f}ms {hits:>8} {cell:>7g}")
+    # Lưới dict là bảo thủ (đếm cả cell chỉ chạm biên) nên số va chạm có thể lớn hơn lưới dense (chính xác)
+
+
+if __name__ == "__main__":
+    main()
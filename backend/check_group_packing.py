@@ -134,7 +134,8 @@ def check_group_packing():
     # Phân tích các box theo tầng (layer)
     print("\nPhân tích các box theo tầng (y):")
     from algorithms.enhanced_packing_algorithm import Container
-    container = Container(**container_dimensions)
+    container = Container(container_dimensions['width'], container_dimensions['height'],
+                          container_dimensions['depth'])
     for box in placed_boxes:
         container.place_box(box, box.position['x'], box.position['y'], box.position['z'])
     
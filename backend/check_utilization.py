@@ -1,6 +1,7 @@
 import pandas as pd
 import time
-from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.enhanced_packing_algorithm import EnhancedPackingAlgorithm
+from algorithms.sku_table import SkuTable
 
 def test_configuration(goods, container_dimensions, support_threshold, time_limit, respect_groups=True):
     """Kiểm tra một cấu hình cụ thể và trả về kết quả"""
@@ -68,7 +69,7 @@ def test_configuration(goods, container_dimensions, support_threshold, time_limi
     
     # In kết quả
     print(f"Thời gian thực thi: {execution_time:.2f} giây")
-    print(f"Đã đặt được {len(placed_boxes)}/{len(goods)} box ({len(placed_boxes)/len(goods)*100:.1f}%)")
+    print(f"Đã đặt được {len(placed_boxes)}/{goods.total_units} box ({len(placed_boxes)/goods.total_units*100:.1f}%)")
     print(f"Tỷ lệ sử dụng không gian: {utilization:.2%}")
     print(f"Kiểm tra va chạm: {'❌ Có' if collision_count > 0 else '✅ Không'} ({collision_count} va chạm)")
     print(f"Kiểm tra vượt biên: {'❌ Có' if out_of_bounds_count > 0 else '✅ Không'} ({out_of_bounds_count} vượt biên)")
@@ -80,7 +81,7 @@ def test_configuration(goods, container_dimensions, support_threshold, time_limi
         'respect_groups': respect_groups,
         'execution_time': execution_time,
         'placed_boxes': len(placed_boxes),
-        'total_boxes': len(goods),
+        'total_boxes': goods.total_units,
         'utilization': utilization,
         'collisions': collision_count,
         'out_of_bounds': out_of_bounds_count,
@@ -101,23 +102,11 @@ def main():
         print(f'Lỗi khi đọc file Excel: {str(e)}')
         return
     
-    # Tạo danh sách hàng hóa
-    print('\nTạo danh sách hàng hóa...')
-    goods = []
-    for i, row in df.iterrows():
-        for j in range(int(row['quantity'])):
-            box = Box(
-                id=f"{row['name']}-{j+1}",
-                width=row['width'],
-                height=row['height'],
-                depth=row['depth'],
-                weight=row['weight'],
-                name=row['name'],
-                label=row['group']
-            )
-            goods.append(box)
-    
-    print(f'Đã tạo {len(goods)} kiện hàng từ {len(df)} loại')
+    # Tạo bảng SKU (loại hàng + số lượng), không tách thành từng Box
+    print('\nTạo bảng SKU...')
+    goods = SkuTable.from_rows(row.to_dict() for _, row in df.iterrows())
+    
+    print(f'Đã tạo {len(goods)} SKU ({goods.total_units} kiện hàng) từ {len(df)} dòng')
     
     # Thông tin container
     container_dimensions = {
@@ -127,7 +116,7 @@ def main():
     }
     
     container_volume = container_dimensions["width"] * container_dimensions["height"] * container_dimensions["depth"]
-    total_box_volume = sum(box.volume for box in goods)
+    total_box_volume = goods.total_volume
     min_utilization = total_box_volume / container_volume
     
     print('\nThông tin container:')
@@ -153,7 +142,7 @@ def main():
     # Chạy kiểm tra với các cấu hình khác nhau
     for support_threshold, time_limit, respect_groups in configs:
         result = test_configuration(
-            goods.copy(),  # Tạo bản sao để tránh ảnh hưởng giữa các lần chạy
+            goods,  # Mỗi lần pack tạo Box mới từ bảng SKU nên không ảnh hưởng giữa các lần chạy
             container_dimensions,
             support_threshold,
             time_limit,
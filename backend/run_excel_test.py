@@ -1,6 +1,7 @@
 import pandas as pd # type: ignore
 import time
-from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.enhanced_packing_algorithm import EnhancedPackingAlgorithm
+from algorithms.sku_table import SkuTable
 
 def main():
     print("\n===== KIỂM TRA THUẬT TOÁN ĐÓNG GÓI NÂNG CAO =====")
@@ -14,36 +15,25 @@ def main():
         print(f'Lỗi khi đọc file Excel: {str(e)}')
         return
     
-    # Tạo danh sách hàng hóa
-    print('\nTạo danh sách hàng hóa...')
-    goods = []
-    for i, row in df.iterrows():
-        for j in range(int(row['quantity'])):
-            box = Box(
-                id=f"{row['name']}-{j+1}",
-                width=row['width'],
-                height=row['height'],
-                depth=row['depth'],
-                weight=row['weight'],
-                name=row['name'],
-                label=row['group']
-            )
-            goods.append(box)
-    
-    print(f'Đã tạo {len(goods)} kiện hàng từ {len(df)} loại')
-    
-    # In thông tin chi tiết về các kiện hàng
-    print('\nThông tin chi tiết về các kiện hàng:')
-    print(f'{"ID":<15} {"Kích thước (W×H×D)":<25} {"Thể tích":<15} {"Nhóm":<10}')
-    print('-' * 65)
-    for box in goods[:10]:  # Chỉ hiển thị 10 box đầu tiên
-        print(f'{box.id:<15} {box.width:.1f}×{box.height:.1f}×{box.depth:.1f} mm{"":<10} {box.volume:.1f} mm³{"":<5} {box.label:<10}')
+    # Tạo bảng SKU (loại hàng + số lượng), không tách thành từng Box
+    print('\nTạo bảng SKU...')
+    goods = SkuTable.from_rows(row.to_dict() for _, row in df.iterrows())
+    total_units = goods.total_units
+    
+    print(f'Đã tạo {len(goods)} SKU ({total_units} kiện hàng) từ {len(df)} dòng')
+    
+    # In thông tin chi tiết về các SKU
+    print('\nThông tin chi tiết về các SKU:')
+    print(f'{"Tên":<15} {"Kích thước (W×H×D)":<25} {"Thể tích":<15} {"Nhóm":<10} {"SL":>5}')
+    print('-' * 71)
+    for sku in goods.skus[:10]:  # Chỉ hiển thị 10 SKU đầu tiên
+        print(f'{sku.name:<15} {sku.width:.1f}×{sku.height:.1f}×{sku.depth:.1f} mm{"":<10} {sku.volume:.1f} mm³{"":<5} {sku.label:<10} {sku.quantity:>5}')
     if len(goods) > 10:
-        print(f'... và {len(goods) - 10} kiện hàng khác')
+        print(f'... và {len(goods) - 10} SKU khác')
     
     # Tính tổng thể tích
-    total_box_volume = sum(box.volume for box in goods)
-    print(f'\nTổng số kiện hàng: {len(goods)}')
+    total_box_volume = goods.total_volume
+    print(f'\nTổng số kiện hàng: {total_units}')
     print(f'Tổng thể tích hàng hóa: {total_box_volume:,.0f} mm³')
     
     # Thông tin container
@@ -75,7 +65,7 @@ def main():
     
     execution_time = time.time() - start_time
     print(f'Thời gian thực thi: {execution_time:.2f} giây')
-    print(f'Đã đặt được {len(placed_boxes)}/{len(goods)} box ({len(placed_boxes)/len(goods)*100:.1f}%)')
+    print(f'Đã đặt được {len(placed_boxes)}/{total_units} box ({len(placed_boxes)/total_units*100:.1f}%)')
     print(f'Tỷ lệ sử dụng không gian: {utilization:.2%}')
     
     # In thông tin chi tiết về các box đã đặt
@@ -97,19 +87,18 @@ def main():
         groups[box.label] += 1
     
     for group, count in groups.items():
-        total_in_group = sum(1 for box in goods if box.label == group)
+        total_in_group = sum(sku.quantity for sku in goods if sku.label == group)
         print(f'Nhóm {group}: {count}/{total_in_group} ({count/total_in_group*100:.1f}%)')
     
     # Liệt kê các box chưa đặt được
-    unplaced_boxes = [box for box in goods if box.id not in [b.id for b in placed_boxes]]
-    if unplaced_boxes:
-        print(f'\nCó {len(unplaced_boxes)} box chưa đặt được:')
-        groups_unplaced = {}
-        for box in unplaced_boxes:
-            if box.label not in groups_unplaced:
-                groups_unplaced[box.label] = 0
-            groups_unplaced[box.label] += 1
-        
+    placed_ids = {b.id for b in placed_boxes}
+    groups_unplaced = {}
+    for sku in goods:
+        unplaced = sum(1 for box_id, _ in sku.units if box_id not in placed_ids)
+        if unplaced:
+            groups_unplaced[sku.label] = groups_unplaced.get(sku.label, 0) + unplaced
+    if groups_unplaced:
+        print(f'\nCó {sum(groups_unplaced.values())} box chưa đặt được:')
         for group, count in groups_unplaced.items():
             print(f'Nhóm {group}: {count} box')
     
@@ -168,7 +157,8 @@ def main():
     
     # Tạo container để kiểm tra
     from algorithms.enhanced_packing_algorithm import Container
-    test_container = Container(**container_dimensions)
+    test_container = Container(container_dimensions['width'], container_dimensions['height'],
+                               container_dimensions['depth'])
     for box in placed_boxes:
         test_container.place_box(box, box.position['x'], box.position['y'], box.position['z'])
     
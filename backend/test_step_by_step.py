@@ -17,11 +17,11 @@ def test_step_by_step():
     )
     print("✅ Request created")
     
-    # Step 2: Convert to Box objects
-    print("Step 2: Converting to Box objects...")
-    from algorithms.packing_algorithm import Box
-    goods = [Box(**box.dict()) for box in request.goods]
-    print(f"✅ Created {len(goods)} boxes")
+    # Step 2: Convert to SKU table
+    print("Step 2: Converting to SKU table...")
+    from algorithms.sku_table import SkuTable
+    goods = SkuTable.from_rows(box.dict() for box in request.goods)
+    print(f"✅ Created {len(goods)} SKUs ({goods.total_units} boxes)")
     
     # Step 3: Test each algorithm individually
     print("Step 3: Testing algorithms individually...")
@@ -30,6 +30,7 @@ def test_step_by_step():
     print("Testing GA...")
     from algorithms.packing_algorithm import ImprovedGeneticPackingOptimizer
     ga = ImprovedGeneticPackingOptimizer(population_size=10, generations=5)
+    assert request.container is not None
     container = request.container.dict()
     try:
         best_chromosome, fitness = ga.optimize(goods, container)
@@ -0,0 +1,40 @@
+import random
+from typing import Optional
+
+import pytest
+
+from algorithms.enhanced_packing_algorithm import Box, Container
+
+CONTAINER = (100.0, 60.0, 80.0)
+SIZES = [(20, 10, 20), (10, 10, 10), (30, 20, 10), (15, 25, 5)]
+
+
+def fits(boxes, x, y, z, w, h, d):
+    """Kiểm tra chính xác (vét cạn) hộp (x, y, z, w, h, d) có nằm trong container và không giao box nào"""
+    width, height, depth = CONTAINER
+    if x < 0 or y < 0 or z < 0 or x + w > width or y + h > height or z + d > depth:
+        return False
+    return not any(x < b.x + b.width and x + w > b.x and y < b.y + b.height and y + h > b.y and
+                   z < b.z + b.depth and z + d > b.z for b in boxes)
+
+
+@pytest.fixture
+def random_layout():
+    """Tạo container với các box đặt ngẫu nhiên (tọa độ bội số 5, không giao nhau)"""
+    def build(seed: int, count: int = 40, index_mode: str = "dense", cell_size: float = 10,
+              checkpoint_after: Optional[int] = None):
+        rng = random.Random(seed)
+        container = Container(*CONTAINER, cell_size=cell_size, index_mode=index_mode)
+        for i in range(count * 20):
+            if len(container.boxes) >= count:
+                break
+            if checkpoint_after is not None and len(container.boxes) == checkpoint_after and \
+                    not container.undo_log.recording:
+                container.checkpoint()
+            w, h, d = rng.choice(SIZES)
+            x, y, z = (rng.randrange(0, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                       rng.randrange(0, int(CONTAINER[2]), 5))
+            if fits(container.boxes, x, y, z, w, h, d):
+                container.place_box(Box(f"b{i}", w, h, d, "n", str(i % 3), 1.0), x, y, z)
+        return container
+    return build
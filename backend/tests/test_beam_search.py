@@ -0,0 +1,60 @@
+from algorithms.beam_search import BeamSearchPackingAlgorithm
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+
+
+def _sample_goods():
+    goods = [Box(f"A{i}", 50, 40, 30, "Box A", "1", 5) for i in range(12)]
+    goods += [Box(f"B{i}", 35, 20, 25, "Box B", "2", 3) for i in range(16)]
+    return goods, {"width": 130, "height": 90, "depth": 80}
+
+
+def test_beam_search_beats_greedy_with_valid_plan():
+    """Beam search không kém thuật toán tham lam và trả về phương án hợp lệ"""
+    goods, container = _sample_goods()
+    greedy_boxes, greedy_util = EnhancedPackingAlgorithm().pack(goods, container)
+    beam = BeamSearchPackingAlgorithm(beam_width=3)
+    beam_boxes, beam_util = beam.pack(goods, container, time_limit=30)
+
+    assert beam_util >= greedy_util
+    assert len({box.id for box in beam_boxes}) == len(beam_boxes)
+    for i, a in enumerate(beam_boxes):
+        assert a.x + a.width <= container["width"] + 1e-6
+        assert a.y + a.height <= container["height"] + 1e-6
+        assert a.z + a.depth <= container["depth"] + 1e-6
+        for b in beam_boxes[i + 1:]:
+            assert not (a.x < b.x + b.width and b.x < a.x + a.width and
+                        a.y < b.y + b.height and b.y < a.y + a.height and
+                        a.z < b.z + b.depth and b.z < a.z + a.depth), f"{a.id} overlaps {b.id}"
+
+
+def test_beam_search_zero_time_limit_hits_deadline():
+    goods, container = _sample_goods()
+    beam = BeamSearchPackingAlgorithm(beam_width=3)
+    beam.pack(goods, container, time_limit=0)
+    assert beam.deadline_hit  # Hạn chót 0: chỉ còn phương án tham lam
+
+
+def test_beam_search_workers_match_in_process():
+    """Mở rộng trên worker (chỉ gửi phần khác nhau của dãy bước) cho đúng kết quả như mở rộng tại chỗ"""
+    goods, container = _sample_goods()
+    local = BeamSearchPackingAlgorithm(beam_width=3)
+    local.max_workers = 1
+    pooled = BeamSearchPackingAlgorithm(beam_width=3)
+    pooled.max_workers = 3
+    pooled.parallel_min_units = 0
+    local_boxes, local_util = local.pack(goods, container)
+    pooled_boxes, pooled_util = pooled.pack(goods, container)
+
+    assert pooled_util == local_util
+    assert ([(b.id, b.pos, b.width, b.height, b.depth) for b in pooled_boxes] ==
+            [(b.id, b.pos, b.width, b.height, b.depth) for b in local_boxes])
+
+
+def test_beam_search_stops_at_target():
+    """Phương án tham lam đã đạt target_utilization thì không mở rộng beam"""
+    goods, container = _sample_goods()
+    greedy_boxes, greedy_util = EnhancedPackingAlgorithm().pack(goods, container)
+    beam = BeamSearchPackingAlgorithm(beam_width=3)
+    beam_boxes, beam_util = beam.pack(goods, container, target_utilization=greedy_util)
+    assert beam_util == greedy_util and len(beam_boxes) == len(greedy_boxes)
+    assert beam.pack(goods, container)[1] > greedy_util
@@ -0,0 +1,39 @@
+from algorithms.bounds import FIT_TOLERANCE, compute_bounds, martello_toth_l2, prefilter
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.sku_table import SkuTable
+
+CONTAINER = {"width": 100, "height": 80, "depth": 130}
+
+
+def test_bounds_upper_bound_and_oversize_units():
+    """Cận trên tỷ lệ sử dụng không nhỏ hơn kết quả thật; kiện quá khổ bị loại trước khi xếp"""
+    # Rộng hơn nửa container theo cả width và height: chỉ xếp nối tiếp theo depth, tối đa 2 kiện
+    goods = [Box(f"L{i}", 60, 50, 60, "Large", "1", 5) for i in range(5)]
+    goods += [Box(f"X{i}", 120, 90, 30, "Oversize", "2", 5) for i in range(2)]
+
+    bounds = compute_bounds(goods, CONTAINER, Box.ROTATIONS)
+    assert bounds.unfit_units == 2
+    assert bounds.min_containers == 3
+    # Nới lỏng phân số: 2 kiện trọn vẹn + 10/60 kiện thứ ba theo depth
+    assert abs(bounds.utilization_bound - (2 + 10 / 60) * 60 * 50 * 60 / (100 * 80 * 130)) < 1e-9
+
+    placed, utilization = EnhancedPackingAlgorithm().pack(goods, CONTAINER)
+    assert utilization <= bounds.utilization_bound + 1e-9
+    assert all(box.id.startswith("L") for box in placed)
+
+
+def test_martello_toth_l2():
+    # 3 kiện > C/2 cần 3 bin, phần nhỏ lấp vào chỗ trống
+    assert martello_toth_l2([(60, 3), (30, 2)], 100) == 3
+    assert martello_toth_l2([(40, 5)], 100) == 2
+
+
+def test_prefilter_and_bounds_share_tolerance():
+    """Kiện lớn hơn container trong phạm vi dung sai được coi là vừa ở cả prefilter lẫn compute_bounds"""
+    goods = SkuTable.from_boxes([Box("near", 100 + FIT_TOLERANCE / 2, 10, 10, "Near", "1", 1),
+                                 Box("over", 100 + FIT_TOLERANCE * 2, 10, 10, "Over", "1", 1)])
+    small = {"width": 100, "height": 10, "depth": 10}
+    assert compute_bounds(goods, small, Box.ROTATIONS).unfit_units == 1
+    table = goods.copy()
+    assert prefilter(table, small, Box.ROTATIONS) == 1
+    assert table.remaining == [1, 0]
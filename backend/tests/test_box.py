@@ -0,0 +1,16 @@
+import pickle
+
+from algorithms.enhanced_packing_algorithm import Box
+
+
+def test_clone_is_independent_and_pickle_round_trips():
+    box = Box("a", 10, 20, 30, "Box A", "1", 2.5, position={"x": 1, "y": 2, "z": 3})
+    clone = box.clone()
+    assert clone == box and clone is not box
+    clone.pos = (5, 5, 5)
+    clone.width = 30
+    assert box.pos == (1, 2, 3) and box.width == 10
+    assert pickle.loads(pickle.dumps(box)) == box
+    data = box.to_dict()
+    assert data["position"] == {"x": 1, "y": 2, "z": 3} and data["volume"] == 6000
+    assert not hasattr(box, "__dict__")
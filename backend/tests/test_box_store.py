@@ -0,0 +1,55 @@
+import random
+
+import numpy as np  # type: ignore
+
+from algorithms.box_store import ColumnarBoxStore
+
+
+def _random_boxes(seed, count):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, 90), rng.uniform(0, 50), rng.uniform(0, 70),
+             rng.uniform(1, 20), rng.uniform(1, 20), rng.uniform(1, 20)) for _ in range(count)]
+
+
+def _overlap(a, b):
+    return all(a[i] < b[i] + b[i + 3] and a[i] + a[i + 3] > b[i] for i in range(3))
+
+
+def test_append_grows_and_truncate_drops_tail():
+    store = ColumnarBoxStore(capacity=2)
+    boxes = _random_boxes(0, 10)
+    for i, box in enumerate(boxes):
+        assert store.append(*box) == i
+    assert len(store) == 10
+    np.testing.assert_allclose(store.x, [b[0] for b in boxes])
+    np.testing.assert_allclose(store.column(ColumnarBoxStore.Z2), [b[2] + b[5] for b in boxes])
+    store.truncate(4)
+    assert len(store) == 4 and len(store.w) == 4
+    assert store.append(*boxes[9]) == 4
+
+
+def test_queries_match_brute_force():
+    boxes = _random_boxes(1, 30)
+    store = ColumnarBoxStore()
+    for box in boxes:
+        store.append(*box)
+    rng = random.Random(2)
+    for query in _random_boxes(3, 200):
+        expected = [_overlap(query, box) for box in boxes]
+        assert store.overlap_mask(*query).tolist() == expected
+        assert store.overlaps(*query) == any(expected)
+        assert store.overlaps(*query, start=10) == any(expected[10:])
+    points = np.array([[rng.uniform(0, 100), rng.uniform(0, 60), rng.uniform(0, 80)] for _ in range(200)])
+    inside = [any(b[0] <= p[0] < b[0] + b[3] and b[1] <= p[1] < b[1] + b[4] and b[2] <= p[2] < b[2] + b[5]
+                  for b in boxes) for p in points]
+    assert store.contains_points(points).tolist() == inside
+    assert [store.contains_point(*p) for p in points] == inside
+
+
+def test_support_area_counts_only_tops_at_level():
+    store = ColumnarBoxStore()
+    store.append(0, 0, 0, 10, 5, 10)
+    store.append(10, 0, 0, 10, 8, 10)
+    store.append(4, 5, 4, 4, 3, 4)  # Nằm trên box đầu, mặt trên ở y = 8
+    assert store.support_area(5, 5, 5, 10, 10) == 25  # Chỉ box đầu có mặt trên ở y = 5
+    assert store.support_area(5, 8, 5, 10, 10) == 25 + 9  # Box thứ hai + phần giao 3 × 3 với box nhỏ
@@ -0,0 +1,50 @@
+from algorithms.collision_cache import CollisionCache
+from algorithms.packing_algorithm import Box, OptimizedSpatialIndex
+
+
+def _placed(box_id, x, y, z, w=20, h=20, d=20):
+    box = Box(box_id, w, h, d, box_id, "0", 1.0)
+    box.pos = (x, y, z)
+    return box
+
+
+def test_free_result_is_revalidated_after_add():
+    index = OptimizedSpatialIndex(100, 100, 100, cell_size=10)
+    assert index.check_collision_fast(20, 20, 20, 10, 0, 0) is False
+    index.add_box(_placed("a", 20, 0, 0))
+    # Kết quả "trống" của epoch cũ phải được kiểm tra lại với box mới
+    assert index.check_collision_fast(20, 20, 20, 10, 0, 0) is True
+    assert index.collision_cache.revalidations == 1
+    assert index.check_collision_fast(20, 20, 20, 10, 0, 0) is True
+    assert index.collision_cache.hits == 1
+
+
+def test_collision_result_is_dropped_after_remove():
+    index = OptimizedSpatialIndex(100, 100, 100, cell_size=10)
+    box = _placed("a", 20, 0, 0)
+    index.add_box(box)
+    assert index.check_collision_fast(20, 20, 20, 10, 0, 0) is True
+    index.remove_last_box(box)
+    # Sau khi gỡ box, kết quả "va chạm" đã cache không còn đúng
+    assert index.check_collision_fast(20, 20, 20, 10, 0, 0) is False
+    assert index.collision_cache.invalidations == 1
+
+
+def test_same_epoch_count_after_remove_and_add_is_not_stale():
+    """Gỡ rồi thêm box khác đưa số box về epoch cũ: kết quả cũ không được dùng lại"""
+    index = OptimizedSpatialIndex(100, 100, 100, cell_size=10)
+    first = _placed("a", 0, 0, 0)
+    index.add_box(first)
+    assert index.check_collision_fast(20, 20, 20, 60, 0, 0) is False
+    index.remove_last_box(first)
+    index.add_box(_placed("b", 60, 0, 0))
+    assert index.check_collision_fast(20, 20, 20, 60, 0, 0) is True
+
+
+def test_lru_is_bounded():
+    cache = CollisionCache(maxsize=3)
+    for key in range(5):
+        cache.lookup(key, 0, lambda: False)
+    assert len(cache) == 3 and cache.evictions == 2
+    cache.lookup(0, 0, lambda: True)  # Đã bị đẩy ra: tính lại
+    assert cache.misses == 6
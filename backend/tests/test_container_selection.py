@@ -0,0 +1,38 @@
+from algorithms.container_selection import ContainerSelector, ContainerType, prune_dominated
+from algorithms.enhanced_packing_algorithm import Box
+
+CATALOG = [
+    ContainerType("big", 100, 60, 80, 10),
+    ContainerType("small", 100, 60, 40, 6),
+    ContainerType("small-expensive", 100, 60, 40, 7),  # Bị "small" trội
+    ContainerType("narrow", 50, 60, 80, 6),  # Không chứa được kiện X
+]
+
+
+def test_prune_dominated():
+    kept, dominated = prune_dominated(CATALOG)
+    assert [t.name for t in dominated] == ["small-expensive"]
+    assert [t.name for t in kept] == ["big", "small", "narrow"]
+
+
+def test_container_selection_picks_cheapest_combination():
+    """Chọn tổ hợp container rẻ nhất từ danh mục, loại bị trội không được xếp thử"""
+    goods = [Box(f"A{i}", 40, 30, 25, "Box A", "1", 5) for i in range(60)]
+    goods.append(Box("X0", 100, 60, 45, "Pallet", "1", 5))
+
+    selector = ContainerSelector(max_workers=2)
+    selection = selector.select(goods, CATALOG, time_limit=20)
+    statuses = {c["name"]: c["status"] for c in selector.candidates}
+
+    assert statuses["small-expensive"] == "dominated"
+    assert statuses["narrow"] == statuses["small"] == "too_small"
+    assert not selection.unplaced
+    ids = [box.id for _, plan in selection.containers for box in plan.boxes]
+    assert len(ids) == len(set(ids)) == len(goods)
+    # Chỉ loại "big" chứa được mọi kiện; container ít hàng nhất được đổi sang loại nhỏ rẻ hơn
+    assert selection.cost < 5 * 10
+    for container_type, plan in selection.containers:
+        for box in plan.boxes:
+            assert box.x + box.width <= container_type.width + 1e-6
+            assert box.y + box.height <= container_type.height + 1e-6
+            assert box.z + box.depth <= container_type.depth + 1e-6
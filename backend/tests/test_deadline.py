@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+from algorithms import enhanced_packing_algorithm as enhanced
+from algorithms.deadline import Deadline
+from algorithms.enhanced_packing_algorithm import EnhancedPackingAlgorithm
+from algorithms.layer_patterns import LayerPatternCache
+from algorithms.sku_table import SkuTable
+
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+ROWS = [
+    {"id": "A", "width": 20, "height": 10, "depth": 20, "name": "A", "label": "1", "weight": 1, "quantity": 40},
+    {"id": "B", "width": 10, "height": 10, "depth": 10, "name": "B", "label": "2", "weight": 1, "quantity": 60},
+    {"id": "C", "width": 30, "height": 20, "depth": 10, "name": "C", "label": "1", "weight": 1, "quantity": 20},
+]
+
+
+class CountingDeadline(Deadline):
+    """Hạn chót hết sau một số lần kiểm tra cố định (không phụ thuộc tốc độ máy)"""
+
+    def __init__(self, time_limit=None, start=None, checks: int = 10):
+        super().__init__(time_limit, start)
+        self.checks = checks
+
+    def expired(self) -> bool:
+        self.checks -= 1
+        if self.checks < 0:
+            self.hit = True
+            return True
+        return super().expired()
+
+
+def _algorithm() -> EnhancedPackingAlgorithm:
+    algorithm = EnhancedPackingAlgorithm()
+    algorithm.max_workers = 1
+    algorithm.pattern_cache = LayerPatternCache()
+    return algorithm
+
+
+def _assert_valid(boxes, container=CONTAINER):
+    for box in boxes:
+        assert box.x >= 0 and box.y >= 0 and box.z >= 0
+        assert box.x + box.width <= container["width"] + 1e-6
+        assert box.y + box.height <= container["height"] + 1e-6
+        assert box.z + box.depth <= container["depth"] + 1e-6
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert not (a.x < b.x + b.width and a.x + a.width > b.x and a.y < b.y + b.height and
+                        a.y + a.height > b.y and a.z < b.z + b.depth and a.z + a.depth > b.z)
+    assert len({box.id for box in boxes}) == len(boxes)
+
+
+def test_remaining_and_expired():
+    deadline = Deadline(10, start=time.time() - 4)
+    remaining = deadline.remaining()
+    assert remaining is not None and 5.5 < remaining <= 6
+    assert not deadline.expired() and not deadline.hit
+    past = Deadline(1, start=time.time() - 2)
+    assert past.remaining() == 0 and past.expired() and past.hit
+    unlimited = Deadline(None)
+    assert unlimited.remaining() is None and not unlimited.expired()
+    negative = Deadline(-5)
+    assert negative.end == negative.start  # Giới hạn âm coi như 0
+
+
+def test_checkpoints_are_recorded_in_order():
+    deadline = Deadline(None)
+    deadline.checkpoint("first", 0.4, 0.4)
+    record = deadline.checkpoint("second", 0.3, 0.4)
+    assert [c["phase"] for c in deadline.checkpoints] == ["first", "second"]
+    assert record == deadline.checkpoints[-1]
+    assert record["utilization"] == 0.3 and record["best_utilization"] == 0.4
+    assert record["elapsed"] >= deadline.checkpoints[0]["elapsed"]
+
+
+def test_pack_returns_valid_partial_plan_when_deadline_hits():
+    algorithm = _algorithm()
+    table = SkuTable.from_rows(ROWS)
+    full, _ = _algorithm().pack(table, CONTAINER)
+    boxes, utilization = algorithm.pack(table, CONTAINER, deadline=CountingDeadline(checks=10))
+    assert algorithm.deadline_hit
+    assert 0 < len(boxes) < len(full)
+    assert utilization > 0
+    _assert_valid(boxes)
+
+
+def test_optimize_packing_returns_valid_partial_plan_when_deadline_hits(monkeypatch):
+    monkeypatch.setattr(enhanced, "Deadline", lambda time_limit=None: CountingDeadline(time_limit, checks=30))
+    algorithm = _algorithm()
+    boxes, utilization = algorithm.optimize_packing(SkuTable.from_rows(ROWS), CONTAINER, time_limit=30,
+                                                    target_utilization=1.0)
+    assert algorithm.deadline_hit
+    assert boxes and utilization > 0
+    _assert_valid(boxes)
+
+
+def test_optimize_packing_with_zero_time_limit_returns_empty_plan():
+    algorithm = _algorithm()
+    boxes, utilization = algorithm.optimize_packing(SkuTable.from_rows(ROWS), CONTAINER, time_limit=0)
+    assert algorithm.deadline_hit
+    assert boxes == [] and utilization == 0
+
+
+def test_optimize_packing_stops_early_at_target_utilization():
+    algorithm = _algorithm()
+    table = SkuTable.from_rows(ROWS)
+    strategies = algorithm._build_strategies(table, True)
+    boxes, utilization = algorithm.optimize_packing(table, CONTAINER, time_limit=None, target_utilization=0.1)
+    assert not algorithm.deadline_hit
+    assert utilization >= 0.1
+    _assert_valid(boxes)
+    searched = [c for c in algorithm.checkpoints if c["phase"] != "Kiểm tra ổn định"]
+    assert len(searched) == 1 < len(strategies)
+    assert searched[0]["best_utilization"] == pytest.approx(utilization)
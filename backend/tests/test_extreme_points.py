@@ -0,0 +1,50 @@
+import numpy as np  # type: ignore
+
+from algorithms.extreme_points import ExtremePointSet
+
+
+def test_duplicates_are_stored_once():
+    points = ExtremePointSet(quantum=1e-3)
+    assert points.add(10, 0, 0)
+    assert not points.add(10.0001, 0, 0)  # Trùng sau khi lượng tử hóa
+    assert points.add(10.01, 0, 0)
+    assert len(points) == 2 and points.duplicates == 1
+
+
+def test_add_many_skips_invalid_points():
+    points = ExtremePointSet()
+    added = []
+    count = points.add_many(np.array([[0, 0, 0], [5, 0, 0], [0, 0, 0]], dtype=float),
+                            np.array([True, False, True]), added)
+    assert count == 1 and len(added) == 1 and points.rejected == 1 and points.duplicates == 1
+
+
+def test_prune_and_restore_keep_order():
+    points = ExtremePointSet()
+    for x in range(6):
+        points.add(x * 10, 0, 0)
+    before = points.points()
+    added, removed = [], []
+    # Box [10, 40) × [0, 10) × [0, 10) che các điểm x = 10, 20, 30
+    assert points.prune_inside(10, 0, 0, 30, 10, 10, removed) == 3
+    points.add_many(np.array([[40.0, 10.0, 0.0]]), np.array([True]), added)
+    assert [p["x"] for p in points] == [0, 40, 50, 40]
+    points.restore(added, removed)
+    assert points.points() == before
+
+
+def test_container_points_are_free_and_cover_box_corners(random_layout):
+    for seed in range(4):
+        container = random_layout(seed)
+        points = container.extreme_points
+        coords = np.array([[p["x"], p["y"], p["z"]] for p in points])
+        assert len({tuple(c) for c in coords}) == len(coords)
+        assert not container.store.contains_points(coords).any()
+        # Các điểm cực của mỗi box (nếu còn trống) đều có trong tập
+        free = {tuple(c) for c in coords}
+        for b in container.boxes:
+            for corner in ((b.x + b.width, b.y, b.z), (b.x, b.y + b.height, b.z), (b.x, b.y, b.z + b.depth)):
+                inside_container = (corner[0] <= container.width and corner[1] <= container.height and
+                                    corner[2] <= container.depth)
+                if inside_container and not container.store.contains_point(*corner):
+                    assert tuple(float(v) for v in corner) in free
@@ -0,0 +1,56 @@
+from algorithms import packing_algorithm as legacy
+from algorithms.sku_table import SkuTable
+
+ROWS = [
+    {"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5, "quantity": 5},
+    {"id": "B", "width": 20, "height": 20, "depth": 20, "name": "Box B", "label": "2", "weight": 2, "quantity": 6},
+    {"id": "C", "width": 30, "height": 10, "depth": 15, "name": "Box C", "label": "3", "weight": 1, "quantity": 6},
+]
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+
+
+def _goods():
+    return SkuTable.from_rows(ROWS).expand(legacy.Box)
+
+
+def _signature(boxes):
+    return [(box.id, box.x, box.y, box.z, box.width, box.height, box.depth) for box in boxes]
+
+
+def _optimize(seed, max_workers):
+    optimizer = legacy.ImprovedGeneticPackingOptimizer(population_size=12, generations=4,
+                                                        seed=seed, max_workers=max_workers)
+    order, fitness = optimizer.optimize(_goods(), CONTAINER)
+    return [box.id for box in order], fitness
+
+
+def test_same_seed_gives_same_result_sequential_and_pooled():
+    sequential = _optimize(3, 1)
+    assert _optimize(3, 1) == sequential
+    assert _optimize(3, 2) == sequential  # Fitness giữ đúng thứ tự population, không phụ thuộc worker
+
+
+def test_prefix_replay_and_memoized_fitness_match_full_decode():
+    goods = _goods()
+    cached = legacy.ImprovedGeneticPackingOptimizer(seed=5)
+    cached.set_goods(goods)
+    fresh = legacy.ImprovedGeneticPackingOptimizer()
+    fresh.set_goods(goods)
+    fresh.prefix_cache_size = 0  # Luôn giải mã từ đầu
+    population = [cached.create_chromosome(len(goods)) for _ in range(6)]
+    for _ in range(40):
+        child = cached.mutate(cached.crossover(cached.rng.choice(population), cached.rng.choice(population)))
+        population.append(child)
+        container, placed = cached.decode(child, CONTAINER)
+        expected_container, expected = fresh.decode(child, CONTAINER)
+        assert _signature(placed) == _signature(expected)
+        assert container.get_utilization() == expected_container.get_utilization()
+        assert cached.evaluate_fitness(child, CONTAINER) == fresh._compute_fitness(child, CONTAINER)
+    assert cached.cache_stats["genes_replayed"] > 0 and fresh.cache_stats["genes_replayed"] == 0
+    # Hoán đổi hai kiện cùng SKU cho cùng khoá, fitness lấy từ cache bằng fitness giải mã lại
+    chromosome = population[-1].copy()
+    a, b = [i for i in range(len(chromosome)) if goods[chromosome[i]].id.startswith("B")][:2]
+    chromosome[a], chromosome[b] = chromosome[b], chromosome[a]
+    hits = cached.cache_stats["fitness_hits"]
+    assert cached.evaluate_fitness(chromosome, CONTAINER) == fresh._compute_fitness(chromosome, CONTAINER)
+    assert cached.cache_stats["fitness_hits"] == hits + 1
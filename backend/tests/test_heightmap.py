@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from algorithms.heightmap import HeightMap
+from tests.conftest import CONTAINER, SIZES
+
+
+def _brute_resting_height(boxes, x, z, w, d):
+    tops = [b.y + b.height for b in boxes
+            if x < b.x + b.width and x + w > b.x and z < b.z + b.depth and z + d > b.z]
+    return max(tops, default=0.0)
+
+
+def _brute_support_area(boxes, x, y, z, w, d):
+    area = 0.0
+    for b in boxes:
+        if abs(b.y + b.height - y) < 1e-3:
+            dx = min(x + w, b.x + b.width) - max(x, b.x)
+            dz = min(z + d, b.z + b.depth) - max(z, b.z)
+            if dx > 0 and dz > 0:
+                area += dx * dz
+    return area
+
+
+def test_heightmap_matches_brute_force(random_layout):
+    """Với các box xếp chồng không có khe hở phía dưới, heightmap trả lời như khi duyệt mọi box"""
+    rng = random.Random(5)
+    for seed in range(4):
+        container = random_layout(seed)
+        # Chỉ giữ các box đặt ở mặt trên cao nhất của footprint (không có box lơ lửng bên dưới box khác)
+        heightmap = HeightMap(CONTAINER[0], CONTAINER[2])
+        stacked = []
+        for b in sorted(container.boxes, key=lambda b: b.y):
+            if heightmap.resting_height(b.x, b.z, b.width, b.depth) <= b.y:
+                heightmap.place(b.x, b.z, b.width, b.depth, b.y + b.height)
+                stacked.append(b)
+        for _ in range(200):
+            w, _, d = rng.choice(SIZES)
+            x, z = rng.uniform(0, CONTAINER[0] - w), rng.uniform(0, CONTAINER[2] - d)
+            top = _brute_resting_height(stacked, x, z, w, d)
+            assert heightmap.resting_height(x, z, w, d) == pytest.approx(top)
+            assert heightmap.support_area(x, z, w, d, top) == pytest.approx(
+                _brute_support_area(stacked, x, top, z, w, d) if top > 0 else w * d)
+
+
+def test_place_and_restore():
+    heightmap = HeightMap(100, 80)
+    first = heightmap.place(10, 10, 20, 20, 5)
+    second = heightmap.place(15, 15, 10, 10, 12)
+    assert heightmap.resting_height(0, 0, 100, 80) == 12
+    assert heightmap.support_ratio(15, 15, 10, 10, 12) == 1.0
+    assert heightmap.support_ratio(10, 10, 20, 20, 5) == pytest.approx(0.75)
+    heightmap.restore(second)
+    assert heightmap.resting_height(0, 0, 100, 80) == 5
+    heightmap.restore(first)
+    assert heightmap.resting_height(0, 0, 100, 80) == 0
+    assert heightmap.heights.shape == (1, 1)
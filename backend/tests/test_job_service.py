@@ -0,0 +1,103 @@
+import random
+import time
+
+import pytest
+
+from algorithms import deadline
+from algorithms.deadline import Deadline
+from app.api.models.schemas import PackingRequest
+from app.services.job_service import JobManager, JobQueueFull
+
+REQUEST = PackingRequest.model_validate({
+    "goods": [{"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5,
+               "quantity": 10}],
+    "container": {"width": 100, "height": 60, "depth": 80},
+    "algorithm": "enhanced",
+    "time_limit": 5,
+})
+
+
+def _slow_request(time_limit: float) -> PackingRequest:
+    """Nhiều SKU khác nhau, mục tiêu 100%: thuật toán chạy tới hạn chót"""
+    rng = random.Random(1)
+    goods = [{"id": f"G{i}", "width": rng.randint(10, 40), "height": rng.randint(10, 40),
+              "depth": rng.randint(10, 40), "name": "g", "label": "1", "weight": 1, "quantity": 5} for i in range(400)]
+    return PackingRequest.model_validate({"goods": goods, "container": {"width": 235, "height": 239, "depth": 1203},
+                                          "algorithm": "enhanced", "time_limit": time_limit,
+                                          "target_utilization": 1.0, "use_cache": False})
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers=1, queue_size=3)
+    yield manager
+    manager.shutdown()
+
+
+def test_jobs_run_on_pool_and_queue_is_bounded(manager):
+    """Job chạy trên process pool, hàng đợi đầy thì từ chối, job đang chờ huỷ được"""
+    jobs = [manager.submit(REQUEST) for _ in range(3)]
+    with pytest.raises(JobQueueFull):
+        manager.submit(REQUEST)
+
+    cancelled = manager.cancel(jobs[-1].id)
+    assert cancelled is not None and cancelled.status == "cancelled"
+    assert manager.get("missing") is None
+
+    result = jobs[0].future.result(timeout=60)
+    job = manager.get(jobs[0].id)
+    assert job is not None
+    data = job.to_dict()
+    assert data["status"] == "done" and data["finished_at"] is not None
+    assert len(result["placed_boxes"]) == 10
+
+
+def test_sync_job_is_dropped_when_done(manager):
+    """Job của /api/pack (keep_result=False): tính vào hàng đợi khi đang chạy, xong là bị xoá"""
+    sync = manager.submit(REQUEST, keep_result=False)
+    assert manager.get(sync.id) is sync
+    sync.future.result(timeout=60)
+    wait_until = time.time() + 5
+    while manager.get(sync.id) is not None and time.time() < wait_until:
+        time.sleep(0.01)
+    assert manager.get(sync.id) is None
+
+
+def test_cancelled_running_job_frees_its_slot(manager):
+    """Huỷ job đang chạy: thuật toán dừng ở điểm kiểm tra kế tiếp, worker nhận job sau mà không chờ hết time_limit"""
+    time_limit = 30
+    running = manager.submit(_slow_request(time_limit))
+    queued = manager.submit(REQUEST)
+    wait_until = time.time() + 10
+    while not running.future.running() and time.time() < wait_until:
+        time.sleep(0.01)
+    time.sleep(0.5)  # Đang ở giữa lần đóng gói
+    start = time.time()
+    manager.cancel(running.id)
+    assert running.status == "cancelled"
+
+    queued.future.result(timeout=time_limit)
+    assert queued.status == "done"
+    assert time.time() - start < time_limit / 3
+    assert running.future.done() and running.status == "cancelled"
+
+
+def test_cancel_token_expires_every_deadline():
+    class Token:
+        flag = False
+
+        def is_set(self):
+            return self.flag
+
+    token = Token()
+    deadline.set_cancel_token(token)
+    try:
+        limited, unlimited = Deadline(60), Deadline(None)
+        assert not limited.expired() and not unlimited.expired()
+        token.flag = True
+        time.sleep(deadline.CANCEL_CHECK_INTERVAL)
+        assert unlimited.expired() and unlimited.hit
+        assert limited.expired() and limited.remaining() == 0
+    finally:
+        deadline.set_cancel_token(None)
+    assert not Deadline(None).expired()
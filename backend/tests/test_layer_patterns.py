@@ -0,0 +1,57 @@
+import os
+
+from algorithms.layer_patterns import LayerPatternCache, layer_pattern, solve_layer
+from algorithms.orientations import ALL_ROTATIONS, Y_AXIS_ROTATIONS
+
+
+def test_layer_patterns(tmp_path):
+    """Mẫu lớp hợp lệ, được cache và đọc lại từ đĩa"""
+    # Chỉ xoay quanh trục y: 4 dải (600 + 3 × 500) × 6 hàng
+    pattern = solve_layer(2340, 2694, 600, 400, 500, Y_AXIS_ROTATIONS)
+    assert len(pattern) == 24
+    # Đủ 6 hướng xoay: không ít box hơn
+    assert len(solve_layer(2340, 2694, 600, 400, 500, ALL_ROTATIONS)) >= 24
+    for i, (x, y, w, h, d, _) in enumerate(pattern):
+        assert x + w <= 2340 + 1e-6 and y + h <= 2694 + 1e-6
+        for x2, y2, w2, h2, _, _ in pattern[i + 1:]:
+            assert not (x < x2 + w2 and x2 < x + w and y < y2 + h2 and y2 < y + h)
+
+    path = str(tmp_path / "patterns.json")
+    cache = LayerPatternCache(path, max_entries=2)
+    # depth_limit 500 chỉ cho hướng (600, 400, 500): 3 dải × 6 hàng
+    assert len(layer_pattern(2340, 2694, 600, 400, 500, Y_AXIS_ROTATIONS, 500, cache)) == 18
+    assert layer_pattern(2340, 2694, 600, 400, 500, Y_AXIS_ROTATIONS, 600, cache) == pattern
+    assert cache.stats == {"hits": 0, "misses": 2}
+    # Mẫu mới chỉ được ghi xuống file khi flush
+    assert not os.path.exists(path)
+    assert cache.flush() and not cache.flush()
+
+    reloaded = LayerPatternCache(path, max_entries=2)
+    assert layer_pattern(2340, 2694, 600, 400, 500, Y_AXIS_ROTATIONS, 600, reloaded) == pattern
+    assert reloaded.stats == {"hits": 1, "misses": 0}
+    # LRU: mẫu thứ ba đẩy mẫu ít dùng nhất ra
+    layer_pattern(2340, 2694, 300, 200, 100, Y_AXIS_ROTATIONS, cache=reloaded)
+    reloaded.flush()
+    assert len(LayerPatternCache(path)) == 2
+    assert not os.path.exists(path + ".lock")
+
+
+def test_layer_pattern_flush_merges_workers(tmp_path):
+    """Hai worker dùng chung một file: flush gộp mẫu của nhau thay vì ghi đè"""
+    path = str(tmp_path / "patterns.json")
+    first, second = LayerPatternCache(path), LayerPatternCache(path)
+    layer_pattern(2340, 2694, 600, 400, 500, Y_AXIS_ROTATIONS, cache=first)
+    layer_pattern(2340, 2694, 300, 200, 100, Y_AXIS_ROTATIONS, cache=second)
+    assert len(first) == 1 and len(second) == 1
+    first.flush()
+    second.flush()
+    assert len(LayerPatternCache(path)) == 2
+    # File khoá bị bỏ lại (tiến trình chết giữa chừng) không chặn mãi
+    layer_pattern(2340, 2694, 200, 200, 200, Y_AXIS_ROTATIONS, cache=first)
+    with open(path + ".lock", "w"):
+        pass
+    os.utime(path + ".lock", (0, 0))
+    assert first.flush()
+    assert len(LayerPatternCache(path)) == 3
+    # Cache mặc định chỉ nằm trong bộ nhớ
+    assert LayerPatternCache().flush() is False
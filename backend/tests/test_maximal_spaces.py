@@ -0,0 +1,56 @@
+import random
+
+import numpy as np  # type: ignore
+
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.maximal_spaces import MaximalSpaceManager
+from tests.conftest import CONTAINER, SIZES, fits
+
+
+def _place_random(manager, seed, count=30):
+    rng = random.Random(seed)
+    boxes = []
+    for i in range(count * 20):
+        if len(boxes) >= count:
+            break
+        w, h, d = rng.choice(SIZES)
+        x, y, z = (rng.randrange(0, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                   rng.randrange(0, int(CONTAINER[2]), 5))
+        if fits(boxes, x, y, z, w, h, d):
+            box = Box(f"b{i}", w, h, d, "n", "0", 1.0)
+            box.pos = (x, y, z)
+            boxes.append(box)
+            manager.place(x, y, z, w, h, d)
+    return boxes
+
+
+def test_spaces_are_free_maximal_and_cover_free_volume():
+    rng = random.Random(1)
+    for seed in range(4):
+        manager = MaximalSpaceManager(*CONTAINER)
+        boxes = _place_random(manager, seed)
+        spaces = manager.array
+        for x1, y1, z1, x2, y2, z2 in spaces.tolist():
+            assert fits(boxes, x1, y1, z1, x2 - x1, y2 - y1, z2 - z1)  # Không giao box nào
+        # Không không gian nào nằm trong không gian khác
+        inside = np.asarray((spaces[None, :, :3] <= spaces[:, None, :3]).all(axis=2) &
+                            (spaces[None, :, 3:] >= spaces[:, None, 3:]).all(axis=2))
+        np.fill_diagonal(inside, False)
+        assert not inside.any()
+        # Mọi điểm trống đều thuộc ít nhất một không gian
+        for _ in range(300):
+            p = (rng.uniform(0, CONTAINER[0]), rng.uniform(0, CONTAINER[1]), rng.uniform(0, CONTAINER[2]))
+            if fits(boxes, p[0], p[1], p[2], 1e-6, 1e-6, 1e-6):
+                assert ((spaces[:, :3] <= p) & (spaces[:, 3:] > p)).all(axis=1).any()
+
+
+def test_fitting_orders_by_volume_and_min_dimension_drops_slivers():
+    manager = MaximalSpaceManager(100, 60, 80, min_dimension=10)
+    manager.place(0, 0, 0, 95, 60, 80)  # Chỉ còn khe rộng 5 < min_dimension
+    assert len(manager) == 0 and manager.too_small > 0
+    manager = MaximalSpaceManager(100, 60, 80)
+    manager.place(0, 0, 0, 40, 60, 80)
+    manager.place(40, 0, 0, 60, 60, 30)
+    volumes = [space["volume"] for space in manager.fitting(10, 10, 10)]
+    assert volumes == sorted(volumes, reverse=True)
+    assert manager.fitting(70, 10, 10) == []
@@ -0,0 +1,72 @@
+import time
+
+from algorithms import multi_container
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.multi_container import MultiContainerPacker
+
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+
+
+def test_multi_container_packs_whole_manifest():
+    """Chế độ nhiều container xếp hết manifest, mỗi kiện đúng một lần và không vượt quá cận dưới quá xa"""
+    goods = [Box(f"A{i}", 40, 30, 25, "Box A", "1", 5) for i in range(30)]
+    goods += [Box(f"B{i}", 20, 20, 15, "Box B", "2", 3) for i in range(25)]
+    goods.append(Box("X0", 200, 30, 30, "Oversize", "3", 5))
+
+    packer = MultiContainerPacker(max_workers=2)
+    plans, unplaced = packer.pack(goods, CONTAINER, time_limit=10)
+
+    assert unplaced == ["X0"]
+    ids = [box.id for plan in plans for box in plan.boxes]
+    assert len(ids) == len(set(ids)) == len(goods) - 1
+    bounds = packer.bounds
+    assert bounds is not None
+    assert bounds.min_containers <= len(plans) <= bounds.min_containers + 1
+    for plan in plans:
+        boxes = plan.boxes
+        for i, a in enumerate(boxes):
+            assert a.x + a.width <= CONTAINER["width"] + 1e-6
+            assert a.y + a.height <= CONTAINER["height"] + 1e-6
+            assert a.z + a.depth <= CONTAINER["depth"] + 1e-6
+            for b in boxes[i + 1:]:
+                assert not (a.x < b.x + b.width and b.x < a.x + a.width and
+                            a.y < b.y + b.height and b.y < a.y + a.height and
+                            a.z < b.z + b.depth and b.z < a.z + a.depth), f"{a.id} overlaps {b.id}"
+
+
+def test_multi_container_deadline():
+    """Hết giờ thì dừng chia container: hàng chưa chia được báo là không xếp được"""
+    goods = [Box(f"A{i}", 40, 30, 25, "Box A", "1", 5) for i in range(30)]
+    packer = MultiContainerPacker(max_workers=1)
+    plans, unplaced = packer.pack(goods, CONTAINER, time_limit=0)
+
+    assert packer.deadline_hit and len(plans) == 1
+    ids = [box.id for plan in plans for box in plan.boxes]
+    assert unplaced and sorted(ids + unplaced) == sorted(box.id for box in goods)
+
+
+def test_queued_shares_respect_run_deadline(monkeypatch):
+    """Nhiều phần hơn số tiến trình: phần phải chờ chỉ nhận thời gian còn lại, cả lần chạy không vượt time_limit"""
+    real_run = multi_container.run_algorithm
+
+    def slow_run(algorithm, goods, container_dimensions, respect_groups=True, time_limit=30,
+                 target_utilization=None):
+        # Thuật toán dùng gần hết thời gian được giao rồi mới trả kết quả
+        if time_limit:
+            time.sleep(max(0.0, time_limit - 0.1))
+        return real_run(algorithm, goods, container_dimensions, respect_groups, None, target_utilization)
+
+    # Tiến trình con được fork sau khi thay hàm nên cũng dùng slow_run
+    monkeypatch.setattr(multi_container, "run_algorithm", slow_run)
+    goods = [Box(f"A{i}", 40, 30, 25, "Box A", "1", 5) for i in range(60)]
+    workers = 2
+    packer = MultiContainerPacker(max_workers=workers)
+    time_limit = 1.0
+    start = time.time()
+    plans, unplaced = packer.pack(goods, CONTAINER, time_limit=time_limit)
+    elapsed = time.time() - start
+
+    assert len(plans) - 1 > workers  # Có phần phải chờ tiến trình rảnh
+    assert elapsed <= time_limit
+    ids = [box.id for plan in plans for box in plan.boxes]
+    assert sorted(ids + unplaced) == sorted(box.id for box in goods)
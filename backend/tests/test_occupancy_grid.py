@@ -0,0 +1,70 @@
+import random
+
+import numpy as np  # type: ignore
+
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.occupancy_grid import DenseOccupancyGrid
+from tests.conftest import CONTAINER, SIZES, fits
+
+
+def test_aligned_box_marks_full_cells():
+    """Box nằm đúng lưới, cạnh 2·cell_size, phủ kín đúng 2 cell theo mỗi trục"""
+    grid = DenseOccupancyGrid(100, 100, 100, 10)
+    grid.add(20, 0, 40, 20, 20, 20)
+    cells = np.argwhere(grid.full)
+    assert len(cells) == 8
+    assert sorted(set(cells[:, 0])) == [2, 3]
+    assert sorted(set(cells[:, 1])) == [0, 1]
+    assert sorted(set(cells[:, 2])) == [4, 5]
+    assert grid.query(20, 0, 40, 20, 20, 20) is True  # Trả lời ngay trên lưới
+    assert grid.query(40, 0, 40, 20, 20, 20) is False  # Chạm mặt, không giao
+
+
+def test_unaligned_box_marks_only_covered_cells():
+    grid = DenseOccupancyGrid(100, 100, 100, 10)
+    grid.add(5, 5, 5, 20, 20, 20)
+    assert [sorted(set(axis)) for axis in np.argwhere(grid.full).T] == [[1], [1], [1]]
+    grid.remove(5, 5, 5, 20, 20, 20)
+    assert not grid.full.any() and not grid.touched.any()
+
+
+def test_can_place_matches_exact_check(random_layout):
+    rng = random.Random(7)
+    for seed in range(5):
+        container = random_layout(seed)
+        for _ in range(400):
+            w, h, d = rng.choice(SIZES)
+            x, y, z = (rng.randrange(-5, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                       rng.randrange(0, int(CONTAINER[2]), 5))
+            box = Box("q", w, h, d, "q", "0", 1.0)
+            assert container.can_place(box, x, y, z) == fits(container.boxes, x, y, z, w, h, d)
+
+
+def test_dense_and_dict_index_agree(random_layout):
+    rng = random.Random(11)
+    for seed in range(5):
+        dense = random_layout(seed, index_mode="dense")
+        legacy = random_layout(seed, index_mode="dict")
+        assert [b.pos for b in dense.boxes] == [b.pos for b in legacy.boxes]
+        for _ in range(400):
+            w, h, d = rng.choice(SIZES)
+            x, y, z = (rng.randrange(0, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                       rng.randrange(0, int(CONTAINER[2]), 5))
+            box = Box("q", w, h, d, "q", "0", 1.0)
+            assert dense.can_place(box, x, y, z) == legacy.can_place(box, x, y, z)
+
+
+def test_can_place_many_matches_can_place(random_layout):
+    rng = random.Random(13)
+    for seed in range(5):
+        container = random_layout(seed)
+        candidates = []
+        for _ in range(400):
+            w, h, d = rng.choice(SIZES)
+            candidates.append((rng.randrange(-5, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                               rng.randrange(0, int(CONTAINER[2]), 5), w, h, d))
+        expected = [container.can_place(Box("q", w, h, d, "q", "0", 1.0), x, y, z)
+                    for x, y, z, w, h, d in candidates]
+        assert container.can_place_many(np.array(candidates)).tolist() == expected
+        assert container.store.overlaps_many(np.array(candidates)).tolist() == \
+            [container.store.overlaps(*c) for c in candidates]
@@ -0,0 +1,20 @@
+from algorithms import packing_algorithm as legacy
+from algorithms.enhanced_packing_algorithm import Box
+from algorithms.orientations import ALL_ROTATIONS, Y_AXIS_ROTATIONS, orientation_table
+
+
+def test_orientation_table_drops_duplicate_shapes():
+    assert len(orientation_table(10, 20, 30)) == 6
+    assert len(orientation_table(10, 10, 10)) == 1
+    assert len(orientation_table(10, 20, 10, Y_AXIS_ROTATIONS)) == 1
+    assert orientation_table(10, 20, 30, Y_AXIS_ROTATIONS) == ((10, 20, 30, 0), (30, 20, 10, 1))
+    # Mỗi hướng là một hoán vị của kích thước gốc, chỉ số trỏ đúng vào danh sách rotations
+    for w, h, d, index in orientation_table(10, 20, 30):
+        i, j, k = ALL_ROTATIONS[index]
+        assert (w, h, d) == ((10, 20, 30)[i], (10, 20, 30)[j], (10, 20, 30)[k])
+    assert orientation_table(10, 20, 30) is orientation_table(10, 20, 30)  # Dùng chung theo SKU
+
+
+def test_box_orientations_follow_allowed_rotations():
+    assert len(Box("a", 10, 20, 30, "a", "0", 1).orientation_table()) == 2
+    assert len(legacy.Box("a", 10, 20, 30, "a", "0", 1).orientation_table()) == 6
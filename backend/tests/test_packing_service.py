@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from algorithms import beam_search, container_selection, enhanced_packing_algorithm, multi_container
+from app.api.models.schemas import PackingRequest
+from app.services.job_service import JobManager
+from app.services.packing_service import pack_goods_service
+
+GOODS = [
+    {"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5, "quantity": 120},
+    {"id": "B", "width": 20, "height": 20, "depth": 15, "name": "Box B", "label": "2", "weight": 2, "quantity": 120},
+]
+CONTAINER = {"width": 200, "height": 120, "depth": 160}
+
+
+@pytest.mark.parametrize("options", [
+    {"algorithm": "enhanced"},
+    {"algorithm": "beam", "beam_width": 2},
+    {"algorithm": "enhanced", "multi_container": True},
+    {"algorithm": "enhanced", "container": None,
+     "container_catalog": [dict(CONTAINER, name="big", cost=2.0), dict(CONTAINER, depth=80, name="small", cost=1.0)]},
+])
+def test_single_worker_budget_opens_no_process_pool(monkeypatch, options):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool opened with max_workers=1")
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)  # Không giới hạn thì mọi chế độ đều mở pool
+    for module in (beam_search, container_selection, enhanced_packing_algorithm, multi_container):
+        monkeypatch.setattr(module, "ProcessPoolExecutor", no_pool)
+    request = PackingRequest.model_validate(dict({"goods": GOODS, "container": CONTAINER, "time_limit": 5,
+                                                  "target_utilization": 0.5}, **options))
+    response = pack_goods_service(request, max_workers=1)
+    assert response.placed_boxes
+
+
+def test_job_processes_split_cpus_between_workers(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert JobManager(workers=2).job_processes == 4
+    assert JobManager(workers=16).job_processes == 1
+    assert JobManager(workers=2, job_processes=1).job_processes == 1
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np  # type: ignore
+import pytest
+
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from tests.conftest import CONTAINER, SIZES
+
+
+def test_batched_scores_match_scalar_scores(random_layout):
+    algorithm = EnhancedPackingAlgorithm()
+    prototypes = [Box("", w, h, d, "n", str(i % 3), 1.0) for i, (w, h, d) in enumerate(SIZES)]
+    rng = random.Random(11)
+    for seed in range(4):
+        container = random_layout(seed)
+        candidates = []
+        for _ in range(150):
+            index = rng.randrange(len(prototypes))
+            orientation = rng.choice(prototypes[index].orientation_table())
+            if rng.random() < 0.7:
+                # Góc của box đã đặt: có box kề, cùng lớp, cùng nhóm và mặt đỡ
+                other = rng.choice(container.boxes)
+                x, y, z = rng.choice([(other.x + other.width, other.y, other.z),
+                                      (other.x, other.y + other.height, other.z),
+                                      (other.x, other.y, other.z + other.depth)])
+            else:
+                x, y, z = (rng.randrange(0, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                           rng.randrange(0, int(CONTAINER[2]), 5))
+            candidates.append((index, orientation, float(x), float(y), float(z)))
+        scalar = []
+        for index, orientation, x, y, z in candidates:
+            box = prototypes[index].clone()
+            box.width, box.height, box.depth, box.orientation = orientation
+            scalar.append(algorithm._calculate_position_score(box, x, y, z, container))
+        batched = algorithm._calculate_position_scores(prototypes, candidates, container)
+        assert batched.tolist() == pytest.approx(scalar, abs=1e-6)
+    assert algorithm._calculate_position_scores(prototypes, [], container).shape == (0,)
+
+
+def test_columns_is_a_read_only_view(random_layout):
+    store = random_layout(0).store
+    columns = store.columns()
+    assert columns.shape == (9, len(store))
+    np.testing.assert_array_equal(columns[store.X2], store.x + store.w)
+    with pytest.raises(ValueError):
+        columns[0, 0] = 1.0
@@ -0,0 +1,34 @@
+from app.api.models.schemas import PackingRequest
+from app.services.job_service import JobManager, ProgressStream
+
+
+def test_progress_stream():
+    """Job gửi sự kiện tiến độ; mỗi lượt đọc không quá max_boxes box và đủ mọi box của phương án"""
+    request = PackingRequest.model_validate({
+        "goods": [{"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5,
+                   "quantity": 10}],
+        "container": {"width": 100, "height": 60, "depth": 80},
+        "algorithm": "enhanced",
+        "time_limit": 5,
+    })
+    manager = JobManager(workers=1, queue_size=2)
+    try:
+        job = manager.submit(request, stream_progress=True)
+        job.future.result(timeout=60)
+        stream = ProgressStream(job, max_boxes=4)
+        messages = []
+        while not stream.finished:
+            batch = stream.next_messages()
+            assert sum(len(m["boxes"]) for m in batch if m["event"] == "placements") <= 4
+            messages.extend(batch)
+
+        events = [m["event"] for m in messages]
+        assert events[0] == "started"
+        assert "phase_started" in events and "checkpoint" in events
+        final = [m for m in messages if m["event"] == "plan" and m.get("final")]
+        assert len(final) == 1 and final[0]["boxes"] == 10
+        placed = [b for m in messages if m["event"] == "placements" and m["plan"] == final[0]["plan"]
+                  for b in m["boxes"]]
+        assert len(placed) == 10
+    finally:
+        manager.shutdown()
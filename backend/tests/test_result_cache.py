@@ -0,0 +1,84 @@
+import time
+
+from app.api.models.schemas import PackingRequest
+from app.services.job_service import JobManager
+from app.services.result_cache import ResultCache, request_key
+
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+BOX_A = {"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5, "quantity": 3}
+BOX_B = {"id": "B", "width": 20, "height": 20, "depth": 20, "name": "Box B", "label": "2", "weight": 2, "quantity": 2}
+
+
+def _request(goods, multi_container=True, width=100):
+    return PackingRequest.model_validate({"goods": goods, "container": dict(CONTAINER, width=width),
+                                          "algorithm": "enhanced", "time_limit": 5,
+                                          "multi_container": multi_container})
+
+
+def _box(box_id, name, x, container=None):
+    box = {"id": box_id, "name": name, "position": {"x": x, "y": 0, "z": 0}}
+    if container is not None:
+        box["container"] = container
+    return box
+
+
+def test_cache_hit_remaps_ids_to_the_new_request():
+    cache = ResultCache(max_entries=4, ttl=60)
+    first = [_box("A-1", "Box A", 0, 0), _box("B-2", "Box B", 40, 0), _box("A-3", "Box A", 0, 1)]
+    result = {"placed_boxes": first, "utilization": 0.5, "unplaced_boxes": ["A-2", "B-1"],
+              "containers": [{"index": 0, "placed_boxes": first[:2]}, {"index": 1, "placed_boxes": first[2:]}]}
+    cache.put(_request([BOX_A, BOX_B]), result)
+
+    # Cùng lô hàng: đảo thứ tự dòng, tách dòng A, đổi id và tên
+    resubmitted = _request([dict(BOX_B, id="P", name="Pallet"), dict(BOX_A, id="Q", quantity=1, name="Crate"),
+                            dict(BOX_A, id="R", quantity=2, name="Crate")])
+    cached = cache.get(resubmitted)
+    assert cached is not None and cached["cache_hit"] and cached["utilization"] == 0.5
+    # Đơn vị thứ j của mỗi SKU nhận đúng vị trí của đơn vị thứ j trong kết quả đã lưu
+    assert [(b["id"], b["name"], b["position"]["x"], b["container"]) for b in cached["placed_boxes"]] == [
+        ("Q", "Crate", 0, 0), ("P-2", "Pallet", 40, 0), ("R-2", "Crate", 0, 1)]
+    assert [[b["id"] for b in c["placed_boxes"]] for c in cached["containers"]] == [["Q", "P-2"], ["R-2"]]
+    assert cached["unplaced_boxes"] == ["R-1", "P-1"]
+    # Kết quả đã lưu không bị đổi theo request mới
+    stored = cache.get(_request([BOX_A, BOX_B]))
+    assert stored is not None and stored["placed_boxes"][0]["id"] == "A-1"
+    assert result["placed_boxes"][0]["id"] == "A-1"
+
+
+def test_request_key_ignores_row_order_and_ids():
+    """Cùng lô hàng (đảo thứ tự dòng, tách dòng, đổi id) trùng khoá; khác container thì khác khoá"""
+    request = _request([BOX_A, BOX_B])
+    resubmitted = _request([dict(BOX_B, id="X"), dict(BOX_A, id="Y", quantity=1), dict(BOX_A, id="Z", quantity=2)])
+    assert request_key(request)[0] == request_key(resubmitted)[0]
+    assert request_key(request)[0] != request_key(_request([BOX_A, BOX_B], width=120))[0]
+
+
+def test_job_manager_serves_resubmitted_request_from_cache(tmp_path):
+    """Request trùng nội dung (kể cả khác thứ tự dòng, khác id) lấy kết quả từ cache, kể cả sau khi khởi động lại"""
+    request = _request([BOX_A, BOX_B], multi_container=False)
+    resubmitted = _request([dict(BOX_B, id="X"), dict(BOX_A, id="Y", quantity=1), dict(BOX_A, id="Z", quantity=2)],
+                           multi_container=False)
+    path = str(tmp_path)
+    cache = ResultCache(max_entries=8, ttl=60, path=path)
+    manager = JobManager(workers=1, queue_size=2, cache=cache)
+    try:
+        first = manager.submit(request).future.result(timeout=60)
+        assert not first["cache_hit"]
+        deadline = time.time() + 5
+        while not len(cache) and time.time() < deadline:
+            time.sleep(0.01)  # Kết quả được lưu trong callback khi job xong
+        job = manager.submit(resubmitted, stream_progress=True)
+        cached = job.future.result(timeout=1)
+        assert cached["cache_hit"] and job.status == "done"
+        assert cached["utilization"] == first["utilization"]
+        expected_ids = {"X-1", "X-2", "Y", "Z-1", "Z-2"}
+        assert {b["id"] for b in cached["placed_boxes"]} | set(cached["unplaced_boxes"]) == expected_ids
+        assert [e["event"] for e in job.events[:2]] == ["started", "plan"]
+        assert cache.stats["hits"] == 1
+    finally:
+        manager.shutdown()
+
+    # Tầng đĩa dùng lại được sau khi khởi động lại; hết thời gian sống thì bỏ
+    reloaded = ResultCache(max_entries=8, ttl=60, path=path).get(request)
+    assert reloaded is not None and reloaded["cache_hit"]
+    assert ResultCache(max_entries=8, ttl=1e-9, path=path).get(request) is None
@@ -0,0 +1,67 @@
+import random
+
+from algorithms import packing_algorithm as legacy
+from algorithms.sku_table import SkuTable
+
+ROWS = [
+    {"id": "A", "width": 20, "height": 35, "depth": 45, "name": "Box A", "label": "1", "weight": 1, "quantity": 7},
+    {"id": "B", "width": 25, "height": 35, "depth": 20, "name": "Box B", "label": "1", "weight": 1, "quantity": 8},
+    {"id": "C", "width": 30, "height": 20, "depth": 20, "name": "Box C", "label": "1", "weight": 1, "quantity": 8},
+    {"id": "D", "width": 15, "height": 10, "depth": 30, "name": "Box D", "label": "1", "weight": 1, "quantity": 6},
+]
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+
+
+def _goods():
+    return SkuTable.from_rows(ROWS).expand(legacy.Box)
+
+
+def _state(container):
+    return [(box.id, box.x, box.y, box.z, box.width, box.height, box.depth) for box in container.boxes]
+
+
+def _fresh(sa, goods, solution):
+    """Đóng gói lại solution từ container rỗng (bản sao box, không dùng checkpoint)"""
+    container = legacy.create_container(goods, CONTAINER)
+    sa._pack_from(container, [box.clone() for box in solution], 0, [], [])
+    return container
+
+
+def test_incremental_neighbor_and_rollback_match_fresh_pack():
+    goods = _goods()
+    sa = legacy.SimulatedAnnealingPackingOptimizer(seed=2)
+    rng = random.Random(4)
+    solution = [box.clone() for box in goods[::2]]
+    container = legacy.create_container(goods, CONTAINER)
+    checkpoints, placements = [], []
+    sa._pack_from(container, solution, 0, checkpoints, placements)
+    for _ in range(60):
+        neighbor = sa._generate_neighbor(solution, goods)
+        start = sa._first_difference(solution, neighbor)
+        checkpoint = checkpoints[start] if start < len(checkpoints) else container.checkpoint()
+        container.rollback(checkpoint)
+        new_checkpoints, new_placements = checkpoints[:start], placements[:start]
+        sa._pack_from(container, neighbor, start, new_checkpoints, new_placements)
+        expected = _fresh(sa, goods, neighbor)
+        assert _state(container) == _state(expected)
+        assert container.get_utilization() == expected.get_utilization()
+        if rng.random() < 0.5:
+            solution, checkpoints, placements = neighbor, new_checkpoints, new_placements
+        else:
+            # Không chấp nhận: quay về giải pháp hiện tại bằng các vị trí đã ghi
+            container.rollback(checkpoint)
+            sa._replay_from(container, solution, start, placements)
+            assert _state(container) == _state(_fresh(sa, goods, solution))
+
+
+def test_pack_is_reproducible_and_best_solution_repacks_exactly():
+    goods = _goods()
+    best, utilization = legacy.SimulatedAnnealingPackingOptimizer(cooling_rate=0.8, seed=2).pack(goods, CONTAINER)
+    again, again_utilization = legacy.SimulatedAnnealingPackingOptimizer(cooling_rate=0.8, seed=2).pack(goods, CONTAINER)
+    assert [(b.id, b.x, b.y, b.z) for b in again] == [(b.id, b.x, b.y, b.z) for b in best]
+    assert again_utilization == utilization
+    # Giải pháp tốt nhất tìm được bằng rollback (không phải kết quả Best Fit ban đầu) đóng gói lại y hệt
+    assert utilization > legacy.BestFitPackingOptimizer().pack(goods, CONTAINER)[1]
+    repacked = _fresh(legacy.SimulatedAnnealingPackingOptimizer(), goods, best)
+    assert [(b.id, b.x, b.y, b.z) for b in repacked.boxes] == [(b.id, b.x, b.y, b.z) for b in best]
+    assert repacked.get_utilization() == utilization
@@ -0,0 +1,59 @@
+import pytest
+
+from algorithms import packing_algorithm as legacy
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.layer_patterns import LayerPatternCache
+from algorithms.sku_table import SkuTable, as_box_list, sku_indices
+
+ROWS = [
+    {"id": "A", "width": 40, "height": 30, "depth": 25, "name": "Box A", "label": "1", "weight": 5, "quantity": 6},
+    {"id": "B", "width": 20, "height": 20, "depth": 20, "name": "Box B", "label": "2", "weight": 2, "quantity": 4},
+    {"id": "C", "width": 40, "height": 30, "depth": 25, "name": "Box C", "label": "1", "weight": 5},
+    {"id": "D", "width": 10, "height": 10, "depth": 10, "name": "Box D", "label": "2", "weight": 1, "quantity": 0},
+]
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+
+
+def test_from_rows_merges_identical_rows_and_keeps_unit_ids():
+    table = SkuTable.from_rows(ROWS)
+    assert len(table) == 2 and table.total_units == 11
+    assert table.skus[0].units[-1] == ("C", "Box C")
+    assert table.unit_ids() == [f"A-{j}" for j in range(1, 7)] + ["C"] + [f"B-{j}" for j in range(1, 5)]
+    assert SkuTable.from_boxes(table.expand(Box)).unit_ids() == table.unit_ids()
+    assert sku_indices(table.expand(Box)) == [0] * 7 + [1] * 4
+
+
+def test_take_discard_and_filters():
+    table = SkuTable.from_rows(ROWS)
+    box = table.take(1, Box)
+    assert (box.id, box.name, box.width) == ("B-1", "Box B", 20)
+    assert table.remaining == [7, 3]
+    assert table.discard(1) == 3 and table.remaining_units == 7
+    with pytest.raises(ValueError):
+        table.take(1, Box)
+    assert table.copy().remaining == [7, 4]  # Bảng mới có số lượng đầy đủ
+    assert table.without(["A-1", "B-2"]).unit_ids() == [f"A-{j}" for j in range(2, 7)] + ["C", "B-1", "B-3", "B-4"]
+    assert table.subset(["C", "B-4"]).unit_ids() == ["C", "B-4"]
+
+
+@pytest.mark.parametrize("pack", [
+    lambda goods: legacy.BestFitPackingOptimizer().pack(goods, CONTAINER),
+    lambda goods: legacy.ExtremePointPackingOptimizer().pack(goods, CONTAINER),
+    lambda goods: _enhanced().pack(goods, CONTAINER, respect_groups=True),
+])
+def test_sku_table_input_matches_box_list(pack):
+    """Đầu vào là bảng SKU hay danh sách Box từng đơn vị cho cùng một phương án"""
+    table = SkuTable.from_rows(ROWS)
+    from_table, utilization = pack(table)
+    from_boxes, utilization_boxes = pack(as_box_list(SkuTable.from_rows(ROWS), Box))
+    assert utilization == pytest.approx(utilization_boxes)
+    assert [(b.id, b.pos, b.width, b.height, b.depth) for b in from_table] == \
+        [(b.id, b.pos, b.width, b.height, b.depth) for b in from_boxes]
+    assert {b.id for b in from_table} <= set(table.unit_ids())
+    assert table.remaining == [sku.quantity for sku in table]  # Bảng của bên gọi không bị tiêu thụ
+
+
+def _enhanced() -> EnhancedPackingAlgorithm:
+    algorithm = EnhancedPackingAlgorithm()
+    algorithm.pattern_cache = LayerPatternCache()
+    return algorithm
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from algorithms import enhanced_packing_algorithm as enhanced
+from algorithms.deadline import Deadline, set_cancel_token
+from algorithms.enhanced_packing_algorithm import EnhancedPackingAlgorithm
+from algorithms.sku_table import SkuTable
+
+CONTAINER = {"width": 100, "height": 60, "depth": 80}
+ROWS = [
+    {"id": "A", "width": 20, "height": 10, "depth": 20, "name": "A", "label": "1", "weight": 1, "quantity": 40},
+    {"id": "B", "width": 10, "height": 10, "depth": 10, "name": "B", "label": "2", "weight": 1, "quantity": 60},
+    {"id": "C", "width": 30, "height": 20, "depth": 10, "name": "C", "label": "1", "weight": 1, "quantity": 20},
+    {"id": "D", "width": 25, "height": 15, "depth": 35, "name": "D", "label": "3", "weight": 1, "quantity": 30},
+]
+BIG_CONTAINER = {"width": 1000, "height": 600, "depth": 1600}
+
+
+def _algorithm(max_workers):
+    algorithm = EnhancedPackingAlgorithm()
+    algorithm.max_workers = max_workers
+    algorithm.parallel_min_units = 0
+    return algorithm
+
+
+def _plan(boxes):
+    return [(box.id, box.pos, box.width, box.height, box.depth) for box in boxes]
+
+
+def test_parallel_strategies_match_sequential():
+    table = SkuTable.from_rows(ROWS)
+    runs = {}
+    for workers in (1, 2):
+        algorithm = _algorithm(workers)
+        strategies = algorithm._build_strategies(table, True)
+        results = dict(algorithm._run_strategies(strategies, CONTAINER, Deadline(None)))
+        # Mỗi chiến lược cho đúng kết quả khi chạy riêng: các chiến lược không đổi box của nhau
+        for index, (_, strategy_table, groups) in enumerate(strategies):
+            alone, utilization = _algorithm(1).pack(strategy_table, CONTAINER, groups)
+            assert _plan(results[index][0]) == _plan(alone) and results[index][1] == utilization
+        assert table.remaining == [row["quantity"] for row in ROWS]
+        boxes, utilization = algorithm.optimize_packing(table, CONTAINER, time_limit=None, target_utilization=1.0)
+        runs[workers] = (_plan(boxes), utilization)
+    assert runs[1] == runs[2]
+    pool = enhanced._strategy_pool
+    assert pool is not None
+    # Lần chạy sau dùng lại pool
+    _algorithm(2).optimize_packing(table, CONTAINER, time_limit=None, target_utilization=1.0)
+    assert enhanced._strategy_pool is pool
+
+
+def test_cancelled_run_stops_running_strategies():
+    """Job bị huỷ khi các chiến lược đang chạy (không giới hạn thời gian): worker dừng ngay, pool rảnh lại"""
+    table = SkuTable.from_rows([dict(row, quantity=row["quantity"] * 800) for row in ROWS])
+    algorithm = _algorithm(2)
+    token = threading.Event()
+    set_cancel_token(token)
+    timer = threading.Timer(0.5, token.set)
+    timer.start()
+    try:
+        start = time.time()
+        algorithm.optimize_packing(table, BIG_CONTAINER, time_limit=None)
+        assert time.time() - start < 3
+        assert algorithm.deadline_hit
+    finally:
+        timer.cancel()
+        set_cancel_token(None)
+    executor, _ = enhanced._strategy_executor(2)
+    futures = [executor.submit(time.sleep, 0.1) for _ in range(2)]
+    for future in futures:
+        future.result(timeout=3)
+
+
+def test_worker_deadline_hit_is_reported():
+    """Hạn chót hết trong tiến trình con vẫn được báo trong deadline_hit"""
+    table = SkuTable.from_rows([dict(row, quantity=row["quantity"] * 800) for row in ROWS])
+    algorithm = _algorithm(2)
+    boxes, _ = algorithm.optimize_packing(table, BIG_CONTAINER, time_limit=0.5)
+    assert algorithm.deadline_hit
+    assert algorithm._is_valid_plan(boxes, BIG_CONTAINER)
@@ -0,0 +1,124 @@
+import random
+
+import numpy as np  # type: ignore
+import pytest
+
+from algorithms import packing_algorithm as legacy
+from algorithms.enhanced_packing_algorithm import Box, Container
+from tests.conftest import CONTAINER, SIZES, fits
+
+
+def _place_random(container, box_cls, seed, count):
+    rng = random.Random(seed)
+    placed = 0
+    for i in range(count * 20):
+        if placed >= count:
+            break
+        w, h, d = rng.choice(SIZES)
+        x, y, z = (rng.randrange(0, int(CONTAINER[0]), 5), rng.randrange(0, int(CONTAINER[1]), 5),
+                   rng.randrange(0, int(CONTAINER[2]), 5))
+        if fits(container.boxes, x, y, z, w, h, d):
+            container.place_box(box_cls(f"extra{seed}-{i}", w, h, d, "n", "9", 1.0), x, y, z)
+            placed += 1
+
+
+def _rebuild(container):
+    """Container mới với cùng các box, đặt theo cùng thứ tự và không hoàn tác lần nào"""
+    fresh = Container(*CONTAINER, cell_size=10)
+    for b in container.boxes:
+        fresh.place_box(Box(b.id, b.width, b.height, b.depth, b.name, b.label, b.weight), *b.pos)
+    return fresh
+
+
+def _state(container):
+    store = container.store
+    return {
+        "boxes": [(b.id, b.pos) for b in container.boxes],
+        "box_dict": sorted(container.box_dict),
+        "used_volume": container.used_volume,
+        "store": np.vstack([store.column(i).copy() for i in range(9)]),
+        "labels": container.labels.copy(),
+        "heightmap": (container.heightmap.xs.copy(), container.heightmap.zs.copy(),
+                      container.heightmap.heights.copy()),
+        "points": container.extreme_points,
+        "layers": [(layer["z"], layer["depth"], list(layer["boxes"])) for layer in container.layers],
+        "touched": container.spatial_index.occupancy.touched.copy(),
+        "full": container.spatial_index.occupancy.full.copy(),
+    }
+
+
+def _assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        if key == "heightmap":
+            for a, e in zip(actual[key], expected[key]):
+                np.testing.assert_array_equal(a, e)
+        elif isinstance(expected[key], np.ndarray):
+            np.testing.assert_array_equal(actual[key], expected[key], err_msg=key)
+        else:
+            assert actual[key] == expected[key], key
+
+
+@pytest.mark.parametrize("read_points_first", [True, False])
+def test_rollback_restores_exact_state(random_layout, read_points_first):
+    """read_points_first=False: extreme point còn đang hoãn cập nhật khi mở checkpoint"""
+    for seed in range(4):
+        container = random_layout(seed, count=20)
+        expected = _state(container) if read_points_first else None
+        checkpoint = container.checkpoint()
+        _place_random(container, Box, seed + 100, 15)
+        removed = container.rollback(checkpoint)
+        assert len(removed) == 15 and not any(box.placed for box in removed)
+        if expected is not None:
+            _assert_same(_state(container), expected)
+        # Heightmap và tập extreme point giống hệt khi dựng lại từ đầu với các box còn lại
+        _assert_same(_state(container), _state(_rebuild(container)))
+
+
+def test_undo_last_and_nested_checkpoints(random_layout):
+    container = random_layout(1, count=10)
+    outer = container.checkpoint()
+    _place_random(container, Box, 7, 5)
+    middle = _state(container)
+    inner = container.checkpoint()
+    _place_random(container, Box, 8, 5)
+    last = container.boxes[-1]
+    assert container.undo_last() is last
+    container.rollback(inner)
+    _assert_same(_state(container), middle)
+    container.rollback(outer)
+    assert len(container.boxes) == 10
+    with pytest.raises(ValueError):
+        container.rollback(outer + 1)
+
+
+def test_rollback_past_points_read_while_recording(random_layout):
+    """Tập điểm được đọc (cập nhật muộn) giữa lúc ghi nhật ký vẫn hoàn tác đúng từng box"""
+    for seed in range(3):
+        container = random_layout(seed, count=15)
+        expected = _state(container)
+        checkpoint = container.checkpoint()
+        _place_random(container, Box, seed + 200, 6)
+        container.extreme_points  # Cập nhật 6 box mới trong khi đang ghi nhật ký
+        _place_random(container, Box, seed + 300, 6)
+        undone = container.undo_last()
+        assert not undone.placed
+        _assert_same(_state(container), _state(_rebuild(container)))
+        container.rollback(checkpoint)
+        _assert_same(_state(container), expected)
+
+
+def test_legacy_container_rollback_matches_rebuild():
+    container = legacy.Container(*CONTAINER, cell_size=10)
+    _place_random(container, legacy.Box, 3, 15)
+    checkpoint = container.checkpoint()
+    _place_random(container, legacy.Box, 4, 10)
+    container.rollback(checkpoint)
+
+    fresh = legacy.Container(*CONTAINER, cell_size=10)
+    for b in container.boxes:
+        fresh.place_box(legacy.Box(b.id, b.width, b.height, b.depth, b.name, b.label, b.weight), *b.pos)
+    np.testing.assert_array_equal(container.spaces.array, fresh.spaces.array)
+    assert container.used_volume == fresh.used_volume
+    for i in range(9):
+        np.testing.assert_array_equal(container.spatial_index.store.column(i), fresh.spatial_index.store.column(i))
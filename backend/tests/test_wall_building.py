@@ -0,0 +1,43 @@
+from algorithms.enhanced_packing_algorithm import Box, EnhancedPackingAlgorithm
+from algorithms.wall_building import WallBuildingPackingAlgorithm
+
+CONTAINER = {"width": 130, "height": 90, "depth": 80}
+
+
+def _goods():
+    goods = [Box(f"A{i}", 40, 30, 25, "Box A", "1", 5) for i in range(60)]
+    goods += [Box(f"B{i}", 20, 20, 15, "Box B", "2", 3) for i in range(20)]
+    return goods
+
+
+def test_wall_building_beats_greedy_with_valid_plan():
+    """Xếp theo bức tường lấp đầy hơn thuật toán tham lam với hàng đồng nhất số lượng lớn"""
+    goods = _goods()
+    # So với vòng lặp tham lam tìm từng ô (tắt mẫu lớp có sẵn)
+    greedy = EnhancedPackingAlgorithm()
+    greedy.layer_pattern_min_fill = None
+    _, greedy_util = greedy.pack(goods, CONTAINER)
+    _, pattern_util = EnhancedPackingAlgorithm().pack(goods, CONTAINER)
+
+    wall = WallBuildingPackingAlgorithm()
+    wall_boxes, wall_util = wall.pack(goods, CONTAINER)
+
+    assert wall_util > greedy_util
+    assert wall_util >= pattern_util
+    assert wall.walls and all(w["fill"] >= wall.min_wall_fill for w in wall.walls)
+    assert len({box.id for box in wall_boxes}) == len(wall_boxes)
+    for i, a in enumerate(wall_boxes):
+        assert a.x + a.width <= CONTAINER["width"] + 1e-6
+        assert a.y + a.height <= CONTAINER["height"] + 1e-6
+        assert a.z + a.depth <= CONTAINER["depth"] + 1e-6
+        for b in wall_boxes[i + 1:]:
+            assert not (a.x < b.x + b.width and b.x < a.x + a.width and
+                        a.y < b.y + b.height and b.y < a.y + a.height and
+                        a.z < b.z + b.depth and b.z < a.z + a.depth), f"{a.id} overlaps {b.id}"
+
+
+def test_wall_building_without_time_limit():
+    wall = WallBuildingPackingAlgorithm()
+    boxes, utilization = wall.pack(_goods(), CONTAINER, time_limit=None)
+    assert not wall.deadline_hit
+    assert utilization == WallBuildingPackingAlgorithm().pack(_goods(), CONTAINER)[1]